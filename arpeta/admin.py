@@ -1,9 +1,43 @@
 from django.contrib import admin
-from .models import Operador, Marca, Modelo, Vehiculo, TipoMaterial, Asignacion
+from .models import Operador, Marca, Modelo, Vehiculo, TipoMaterial, TarifaMaterial, Asignacion, Vuelta, Correo
 
 admin.site.register(Operador)
 admin.site.register(Marca)
 admin.site.register(Modelo)
 admin.site.register(Vehiculo)
 admin.site.register(TipoMaterial)
-admin.site.register(Asignacion)
\ No newline at end of file
+admin.site.register(TarifaMaterial)
+admin.site.register(Asignacion)
+
+
+# Admin de solo lectura del registro de vueltas. Las vueltas solo se agregan al escanear: editarlas o borrarlas
+# aquí dejaría desfasados los resúmenes y el total de vueltas de la asignación.
+@admin.register(Vuelta)
+class VueltaAdmin(admin.ModelAdmin):
+    list_display = ('asignacion', 'registrada_en')
+    list_select_related = ('asignacion',)
+    date_hierarchy = 'registrada_en'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+# Admin de solo lectura de la cola de correos, para revisar envíos y errores. No muestra el cuerpo: los correos
+# de restablecer contraseña llevan un enlace de acceso a la cuenta.
+@admin.register(Correo)
+class CorreoAdmin(admin.ModelAdmin):
+    list_display = ('asunto', 'estado', 'intentos', 'proximo_intento', 'enviado_en')
+    list_filter = ('estado',)
+    exclude = ('cuerpo', 'cuerpo_html')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 class ArpetaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'arpeta'
\ No newline at end of file
+    name = 'arpeta'
+
+    # Conecta las señales de la aplicación al iniciar
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,71 @@
+from django.db.models import Q
+
+
+# Capa de búsqueda y filtros compartida por los listados. Las búsquedas de texto usan condiciones
+# que los índices pueden aprovechar: prefijo para placa y cédula (índices varchar_pattern_ops que
+# PostgreSQL crea para las claves primarias) y contiene para nombres (índices trigram, ver migración 0004)
+# y para la placa en la búsqueda general de asignaciones (índice trigram, ver migración 0008).
+
+
+# Función para filtrar por nombre o apellido del operador (prefijo de la relación opcional)
+def _condicion_nombre(texto, prefijo=''):
+    return Q(**{f'{prefijo}nombre__icontains': texto}) | Q(**{f'{prefijo}apellido__icontains': texto})
+
+
+# Función para aplicar los filtros a un queryset de asignaciones. La búsqueda general encuentra la placa
+# por cualquier parte (no solo el inicio), el operador y el modelo o la marca del vehículo.
+def filtrar_asignaciones(queryset, filtros):
+    if 'q' in filtros:
+        texto = filtros['q'].strip()
+        queryset = queryset.filter(
+            Q(vehiculo__placa__icontains=texto) |
+            Q(operador__cedula__startswith=texto) |
+            _condicion_nombre(texto, 'operador__') |
+            Q(vehiculo__modelo__nombre__icontains=texto) |
+            Q(vehiculo__modelo__marca__nombre__icontains=texto)
+        )
+    if 'fecha_desde' in filtros:
+        queryset = queryset.filter(fecha_asignacion__gte=filtros['fecha_desde'])
+    if 'fecha_hasta' in filtros:
+        queryset = queryset.filter(fecha_asignacion__lte=filtros['fecha_hasta'])
+    if 'estado' in filtros:
+        queryset = queryset.filter(estado=(filtros['estado'] == 'activo'))
+    if 'placa' in filtros:
+        queryset = queryset.filter(vehiculo__placa__startswith=filtros['placa'].strip().upper())
+    if 'cedula' in filtros:
+        queryset = queryset.filter(operador__cedula__startswith=filtros['cedula'].strip())
+    if 'operador' in filtros:
+        queryset = queryset.filter(_condicion_nombre(filtros['operador'].strip(), 'operador__'))
+    if 'tipo_material' in filtros:
+        queryset = queryset.filter(tipo_material=filtros['tipo_material'])
+    return queryset
+
+
+# Función para aplicar los filtros a un queryset de vehículos
+def filtrar_vehiculos(queryset, filtros):
+    if 'q' in filtros:
+        texto = filtros['q'].strip()
+        queryset = queryset.filter(
+            Q(placa__startswith=texto.upper()) |
+            Q(modelo__nombre__icontains=texto) |
+            Q(modelo__marca__nombre__icontains=texto)
+        )
+    if 'estado' in filtros:
+        queryset = queryset.filter(activo=(filtros['estado'] == 'activo'))
+    if 'placa' in filtros:
+        queryset = queryset.filter(placa__startswith=filtros['placa'].strip().upper())
+    return queryset
+
+
+# Función para aplicar los filtros a un queryset de operadores
+def filtrar_operadores(queryset, filtros):
+    if 'q' in filtros:
+        texto = filtros['q'].strip()
+        queryset = queryset.filter(Q(cedula__startswith=texto) | _condicion_nombre(texto))
+    if 'estado' in filtros:
+        queryset = queryset.filter(activo=(filtros['estado'] == 'activo'))
+    if 'cedula' in filtros:
+        queryset = queryset.filter(cedula__startswith=filtros['cedula'].strip())
+    if 'operador' in filtros:
+        queryset = queryset.filter(_condicion_nombre(filtros['operador'].strip()))
+    return queryset
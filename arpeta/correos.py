@@ -0,0 +1,149 @@
+import logging
+import os
+from contextlib import suppress
+from datetime import timedelta
+from django.core.files.storage import default_storage
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.template.loader import render_to_string
+from django.utils import timezone
+from .models import Correo
+from .trabajos import obtener_backend
+
+
+logger = logging.getLogger(__name__)
+
+# Intentos de envío de un correo antes de marcarlo con error
+MAX_INTENTOS_CORREO = 6
+
+# Espera antes del primer reintento; se duplica en cada intento fallido hasta ESPERA_MAXIMA_CORREO
+ESPERA_BASE_CORREO = timedelta(minutes=1)
+ESPERA_MAXIMA_CORREO = timedelta(hours=1)
+
+# Tiempo que un proceso se reserva los correos que está enviando. Si el proceso muere a mitad del envío,
+# los correos vuelven a estar disponibles al terminar la reserva (pueden llegar repetidos, nunca se pierden).
+RESERVA_CORREO = timedelta(minutes=5)
+
+# Correos que se reservan por consulta
+LOTE_CORREOS = 50
+
+
+# Función que guarda los correos (instancias sin guardar de Correo) en la cola y, al confirmar la transacción,
+# encola un trabajo que los envía. La petición no espera al servidor SMTP.
+def encolar_correos(correos):
+    correos = Correo.objects.bulk_create(correos)
+    transaction.on_commit(lambda: obtener_backend().encolar(enviar_pendientes))
+    return correos
+
+
+# Función que encola un solo correo. Los confidenciales no quedan guardados después de enviarse.
+def encolar_correo(asunto, cuerpo, destinatarios, cuerpo_html='', adjuntos=(), remitente='', confidencial=False):
+    return encolar_correos([Correo(
+        asunto=asunto, cuerpo=cuerpo, cuerpo_html=cuerpo_html, remitente=remitente,
+        destinatarios=list(destinatarios), adjuntos=list(adjuntos), confidencial=confidencial,
+    )])[0]
+
+
+# Función que arma (sin guardar) el correo con el código QR de un vehículo adjunto
+def correo_qr(vehiculo, destinatario, nombre_operador="Operador"):
+    return Correo(
+        asunto=f"Código QR del vehículo {vehiculo.placa} - ARPETA",
+        cuerpo=render_to_string('administracion/correo_qr.html', {
+            'vehiculo': vehiculo,
+            'nombre_operador': nombre_operador,
+        }),
+        destinatarios=[destinatario],
+        adjuntos=[vehiculo.codigo_qr.name],
+    )
+
+
+# Función que reserva el siguiente lote de correos pendientes cuyo próximo intento ya llegó.
+# En PostgreSQL, SKIP LOCKED permite que varios procesos vacíen la cola a la vez sin tomar los mismos correos.
+def reservar_lote(ahora, lote=LOTE_CORREOS):
+    with transaction.atomic():
+        correos = list(
+            Correo.objects.select_for_update(skip_locked=True)
+            .filter(estado=Correo.PENDIENTE, proximo_intento__lte=ahora)
+            .order_by('proximo_intento')[:lote]
+        )
+        Correo.objects.filter(pk__in=[correo.pk for correo in correos]).update(proximo_intento=ahora + RESERVA_CORREO)
+    return correos
+
+
+# Función que arma el mensaje de Django de un correo de la cola, con sus adjuntos leídos del almacenamiento
+def armar_mensaje(correo, conexion):
+    mensaje = EmailMultiAlternatives(
+        correo.asunto, correo.cuerpo, correo.remitente or None, correo.destinatarios, connection=conexion
+    )
+    if correo.cuerpo_html:
+        mensaje.attach_alternative(correo.cuerpo_html, 'text/html')
+    elif correo.cuerpo.lstrip().startswith('<'):
+        mensaje.content_subtype = 'html'
+    for ruta in correo.adjuntos:
+        with default_storage.open(ruta, 'rb') as archivo:
+            mensaje.attach(os.path.basename(ruta), archivo.read())
+    return mensaje
+
+
+# Función que calcula la espera antes del siguiente intento de un correo que ya falló `intentos` veces
+def espera_reintento(intentos):
+    return min(ESPERA_BASE_CORREO * 2 ** (intentos - 1), ESPERA_MAXIMA_CORREO)
+
+
+# Función que registra un envío fallido: programa el reintento o, si se agotaron, marca el correo con error
+# (y vacía el cuerpo de los confidenciales, que ya no se van a enviar)
+def registrar_fallo(correo, error, ahora):
+    intentos = correo.intentos + 1
+    if intentos >= MAX_INTENTOS_CORREO:
+        logger.error("El correo %s no se pudo enviar después de %s intentos: %s", correo.pk, intentos, error)
+        cambios = {'estado': Correo.ERROR}
+        if correo.confidencial:
+            cambios.update(cuerpo='', cuerpo_html='')
+    else:
+        logger.warning("Error al enviar el correo %s (intento %s): %s", correo.pk, intentos, error)
+        cambios = {'proximo_intento': ahora + espera_reintento(intentos)}
+    Correo.objects.filter(pk=correo.pk).update(intentos=intentos, ultimo_error=str(error)[:1000], **cambios)
+
+
+# Trabajo que vacía la cola de correos por lotes con una sola conexión SMTP, que se abre una vez y se reutiliza
+# para todos los mensajes (solo se vuelve a abrir después de un error). Los correos confidenciales enviados se
+# borran de la cola. Devuelve (enviados, fallidos).
+def enviar_pendientes(lote=LOTE_CORREOS):
+    enviados = fallidos = 0
+    conexion = get_connection(fail_silently=False)
+    try:
+        while correos := reservar_lote(timezone.now(), lote):
+            try:
+                conexion.open()
+            except Exception as error:
+                # Sin servidor no se intenta correo por correo: todo el lote espera su reintento
+                for correo in correos:
+                    registrar_fallo(correo, error, timezone.now())
+                return enviados, fallidos + len(correos)
+            listos = []
+            for correo in correos:
+                try:
+                    conexion.open()
+                    conexion.send_messages([armar_mensaje(correo, conexion)])
+                except Exception as error:
+                    registrar_fallo(correo, error, timezone.now())
+                    fallidos += 1
+                    with suppress(Exception):
+                        conexion.close()
+                else:
+                    listos.append(correo.pk)
+            Correo.objects.filter(pk__in=listos, confidencial=True).delete()
+            Correo.objects.filter(pk__in=listos).update(
+                estado=Correo.ENVIADO, enviado_en=timezone.now(), intentos=F('intentos') + 1, ultimo_error=''
+            )
+            enviados += len(listos)
+    finally:
+        with suppress(Exception):
+            conexion.close()
+    return enviados, fallidos
+
+
+# Función que borra los correos enviados hace más de `dias` días
+def purgar_enviados(dias):
+    return Correo.objects.filter(estado=Correo.ENVIADO, enviado_en__lt=timezone.now() - timedelta(days=dias)).delete()[0]
@@ -0,0 +1,89 @@
+import hashlib
+import mimetypes
+import posixpath
+from urllib.parse import quote
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date
+
+
+# Duración en caché del nombre de los archivos descargables y del hash de cada versión de su contenido.
+# El hash se guarda con la fecha y el tamaño del archivo en la clave, así que un archivo regenerado en otro
+# proceso nunca se sirve con el ETag de la versión anterior.
+DURACION_CACHE_DESCARGAS = 60 * 60 * 24 * 7
+
+# Tamaño de los bloques con los que se calcula el hash de un archivo
+TAMANO_BLOQUE_HASH = 64 * 1024
+
+
+# Función que arma la clave de caché de los metadatos de una descarga (por ejemplo 'qr:ABC123')
+def clave_descarga(identificador):
+    return f"descargas:{identificador}"
+
+
+# Función para olvidar el nombre guardado de las descargas indicadas (cuando se regenera o se borra el archivo)
+def olvidar_descarga(*identificadores):
+    cache.delete_many([clave_descarga(identificador) for identificador in identificadores])
+
+
+# Función que devuelve {'nombre', 'etag', 'modificado'} de un archivo descargable, o None si no existe.
+# `obtener_nombre` solo se llama si el nombre no está en caché, así la revalidación de una descarga repetida no
+# consulta la base de datos; la fecha y el tamaño se leen siempre del almacenamiento (una llamada a stat).
+# El ETag es fuerte: el que se indique o el SHA-256 del contenido, que se calcula una vez por versión.
+def metadatos_descarga(identificador, obtener_nombre, etag=None):
+    clave = clave_descarga(identificador)
+    nombre = cache.get(clave)
+    if nombre is None:
+        nombre = obtener_nombre()
+        if not nombre:
+            return None
+        cache.set(clave, nombre, DURACION_CACHE_DESCARGAS)
+    try:
+        modificado = default_storage.get_modified_time(nombre)
+        tamano = default_storage.size(nombre)
+    except FileNotFoundError:
+        cache.delete(clave)
+        return None
+    if etag is None:
+        clave_hash = f"{clave}:{modificado.timestamp()}:{tamano}"
+        etag = cache.get(clave_hash)
+        if etag is None:
+            resumen = hashlib.sha256()
+            with default_storage.open(nombre, 'rb') as archivo:
+                for bloque in iter(lambda: archivo.read(TAMANO_BLOQUE_HASH), b''):
+                    resumen.update(bloque)
+            etag = resumen.hexdigest()
+            cache.set(clave_hash, etag, DURACION_CACHE_DESCARGAS)
+    return {'nombre': nombre, 'etag': f'"{etag}"', 'modificado': int(modificado.timestamp())}
+
+
+# Función que arma la respuesta de un archivo del almacenamiento con ETag, Last-Modified y Cache-Control.
+# Responde 304 si el cliente ya tiene esa versión (If-None-Match / If-Modified-Since). Si no, según
+# DESCARGAS_ENVIO, deja el envío al servidor web ('x-accel-redirect' para nginx, 'x-sendfile' para Apache)
+# o lo envía Django por bloques.
+def respuesta_descarga(request, datos, filename=None, as_attachment=True, content_type=None, max_age=0):
+    respuesta = get_conditional_response(request, etag=datos['etag'], last_modified=datos['modificado'])
+    if respuesta is None:
+        nombre = datos['nombre']
+        filename = filename or posixpath.basename(nombre)
+        envio = getattr(settings, 'DESCARGAS_ENVIO', None)
+        if envio in ('x-accel-redirect', 'x-sendfile'):
+            respuesta = HttpResponse(content_type=content_type or mimetypes.guess_type(filename)[0])
+            respuesta['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+            if envio == 'x-accel-redirect':
+                respuesta['X-Accel-Redirect'] = quote(getattr(settings, 'DESCARGAS_URL_INTERNA', '/protegido/') + nombre)
+            else:
+                respuesta['X-Sendfile'] = default_storage.path(nombre)
+        else:
+            respuesta = FileResponse(
+                default_storage.open(nombre, 'rb'), as_attachment=as_attachment, filename=filename,
+                content_type=content_type,
+            )
+    respuesta['ETag'] = datos['etag']
+    respuesta['Last-Modified'] = http_date(datos['modificado'])
+    # Las descargas requieren sesión: solo el navegador del usuario las guarda, nunca un proxy compartido
+    patch_cache_control(respuesta, private=True, max_age=max_age)
+    return respuesta
@@ -0,0 +1,309 @@
+from datetime import timedelta
+from functools import lru_cache
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from cryptography.fernet import Fernet, InvalidToken
+from .models import Vehiculo, Asignacion, Vuelta
+
+
+# Tiempo mínimo entre dos vueltas registradas para el mismo vehículo
+ESPERA_ENTRE_VUELTAS = timedelta(minutes=10)
+
+# Duración máxima de la asignación activa guardada en caché (la clave ya incluye la fecha)
+DURACION_CACHE_ASIGNACION = 60 * 60 * 24
+
+
+# Error de escaneo con el mensaje y el código HTTP que se devuelven al lector de QR
+class ErrorEscaneo(Exception):
+    def __init__(self, mensaje, status):
+        super().__init__(mensaje)
+        self.mensaje = mensaje
+        self.status = status
+
+
+# Función para saber si la caché de escaneo está activada en settings.py
+def cache_activada():
+    return getattr(settings, 'CACHE_ESCANEO', True)
+
+
+# Función que crea una sola vez el objeto Fernet con la clave configurada
+@lru_cache(maxsize=1)
+def obtener_fernet():
+    try:
+        key = settings.FERNET_KEY
+    except AttributeError:
+        raise ErrorEscaneo("Error de configuración interna del servidor.", 500)
+    return Fernet(key)
+
+
+# Función que desencripta el token del QR; el resultado es fijo para cada token, por eso se guarda en una caché LRU acotada
+@lru_cache(maxsize=4096)
+def _descifrar_placa(token):
+    return obtener_fernet().decrypt(token.encode('utf-8')).decode('utf-8')
+
+
+# Función para obtener la placa original a partir del token escaneado
+def descifrar_placa(token):
+    try:
+        if cache_activada():
+            return _descifrar_placa(token)
+        return _descifrar_placa.__wrapped__(token)
+    except ErrorEscaneo:
+        raise
+    except InvalidToken:
+        raise ErrorEscaneo("Código QR inválido o no reconocido.", 400)
+    except Exception:
+        raise ErrorEscaneo("Error al procesar la información del código QR.", 400)
+
+
+# Versión asíncrona de descifrar_placa: el descifrado (AES y HMAC) corre en el pool de hilos por defecto,
+# sin bloquear el event loop ni esperar al hilo único que comparten las llamadas al ORM
+async def adescifrar_placa(token):
+    return await sync_to_async(descifrar_placa, thread_sensitive=False)(token)
+
+
+# Función que arma la clave de caché de la asignación activa de un vehículo en una fecha
+def clave_asignacion(placa, fecha):
+    return f"escaneo:asignacion:{fecha.isoformat()}:{placa}"
+
+
+# Función para eliminar de la caché la asignación activa de un vehículo en una fecha
+def olvidar_asignacion(placa, fecha):
+    cache.delete(clave_asignacion(placa, fecha))
+
+
+# Función que devuelve (id de la asignación, capacidad del vehículo) de la asignación activa del vehículo en la fecha
+def buscar_asignacion_activa(placa, fecha, usar_cache=True):
+    clave = clave_asignacion(placa, fecha)
+    if usar_cache:
+        encontrada = cache.get(clave)
+        if encontrada is not None:
+            return encontrada
+    try:
+        vehiculo = Vehiculo.objects.get(placa=placa)
+    except Vehiculo.DoesNotExist:
+        raise ErrorEscaneo("Vehículo no encontrado con la placa proporcionada por el QR.", 404)
+    try:
+        asignacion_id = Asignacion.objects.values_list('pk', flat=True).get(
+            vehiculo=vehiculo,
+            estado=True,
+            fecha_asignacion=fecha
+        )
+    except Asignacion.DoesNotExist:
+        raise ErrorEscaneo(
+            f"No se encontró una asignación activa para el vehículo {placa} en la fecha de hoy ({fecha.strftime('%d-%m-%Y')}).", 404
+        )
+    except Asignacion.MultipleObjectsReturned:
+        raise ErrorEscaneo(
+            f"Múltiples asignaciones activas encontradas para el vehículo {placa} hoy. Por favor, contacte al administrador.", 500
+        )
+    encontrada = (asignacion_id, vehiculo.capacidad_carga)
+    if usar_cache:
+        cache.set(clave, encontrada, DURACION_CACHE_ASIGNACION)
+    return encontrada
+
+
+# Versión asíncrona de buscar_asignacion_activa con la caché y el ORM asíncronos (aget)
+async def abuscar_asignacion_activa(placa, fecha, usar_cache=True):
+    clave = clave_asignacion(placa, fecha)
+    if usar_cache:
+        encontrada = await cache.aget(clave)
+        if encontrada is not None:
+            return encontrada
+    try:
+        vehiculo = await Vehiculo.objects.aget(placa=placa)
+    except Vehiculo.DoesNotExist:
+        raise ErrorEscaneo("Vehículo no encontrado con la placa proporcionada por el QR.", 404)
+    try:
+        asignacion_id = await Asignacion.objects.values_list('pk', flat=True).aget(
+            vehiculo=vehiculo,
+            estado=True,
+            fecha_asignacion=fecha
+        )
+    except Asignacion.DoesNotExist:
+        raise ErrorEscaneo(
+            f"No se encontró una asignación activa para el vehículo {placa} en la fecha de hoy ({fecha.strftime('%d-%m-%Y')}).", 404
+        )
+    except Asignacion.MultipleObjectsReturned:
+        raise ErrorEscaneo(
+            f"Múltiples asignaciones activas encontradas para el vehículo {placa} hoy. Por favor, contacte al administrador.", 500
+        )
+    encontrada = (asignacion_id, vehiculo.capacidad_carga)
+    if usar_cache:
+        await cache.aset(clave, encontrada, DURACION_CACHE_ASIGNACION)
+    return encontrada
+
+
+# Función para construir el mensaje de espera cuando el vehículo registró una vuelta hace poco
+def mensaje_espera_vuelta(tiempo_desde_ultima_vuelta, espera=ESPERA_ENTRE_VUELTAS):
+    segundos_transcurridos = max(tiempo_desde_ultima_vuelta.total_seconds(), 0)
+    segundos_espera = max(espera.total_seconds() - segundos_transcurridos, 0)
+    minutos_reales_espera = int(segundos_espera // 60)
+    segundos_reales_espera = int(segundos_espera % 60)
+    return (f"Este vehículo ya registró una vuelta hace menos de {int(espera.total_seconds() // 60)} minutos. "
+            f"Intente de nuevo en aproximadamente {minutos_reales_espera} min y {segundos_reales_espera} seg.")
+
+
+# Función que suma la vuelta a la asignación y guarda el evento en una sola transacción (los resúmenes se suman
+# al confirmarla); devuelve el nuevo total de vueltas, o None si la asignación no está activa o no pasó el tiempo
+# de espera
+def sumar_vuelta(asignacion_id, placa, ahora, espera):
+    with transaction.atomic():
+        nuevo_total = Asignacion.objects.registrar_vuelta(asignacion_id, placa, timezone.localdate(ahora), ahora, espera)
+        if nuevo_total is not None:
+            Vuelta.registrar(asignacion_id, ahora)
+    return nuevo_total
+
+
+# Función que registra la vuelta de un token escaneado. Con la caché caliente solo ejecuta escrituras:
+# el UPDATE condicional del contador y la inserción del evento, y después de confirmar, los resúmenes.
+def registrar_escaneo(token, ahora=None, espera=ESPERA_ENTRE_VUELTAS, reintentar=True):
+    ahora = ahora or timezone.now()
+    fecha_hoy = timezone.localdate(ahora)
+    placa = descifrar_placa(token)
+    usar_cache = cache_activada()
+    asignacion_id, capacidad = buscar_asignacion_activa(placa, fecha_hoy, usar_cache)
+    nuevo_total = sumar_vuelta(asignacion_id, placa, ahora, espera)
+    if nuevo_total is None:
+        estado, ultima_vuelta = Asignacion.objects.filter(
+            pk=asignacion_id, vehiculo_id=placa, fecha_asignacion=fecha_hoy
+        ).values_list(
+            'estado', 'ultima_vuelta_registrada_en'
+        ).first() or (False, None)
+        if not estado or ultima_vuelta is None:
+            if usar_cache and reintentar:
+                # La asignación guardada en caché ya no está activa o pasó a otro vehículo: se busca de nuevo
+                olvidar_asignacion(placa, fecha_hoy)
+                return registrar_escaneo(token, ahora, espera, reintentar=False)
+            raise ErrorEscaneo(
+                f"No se encontró una asignación activa para el vehículo {placa} en la fecha de hoy ({fecha_hoy.strftime('%d-%m-%Y')}).", 404
+            )
+        raise ErrorEscaneo(mensaje_espera_vuelta(ahora - ultima_vuelta, espera), 429)
+    return {
+        "total_vueltas": nuevo_total,
+        "total_material_acumulado": float(nuevo_total * capacidad),
+    }
+
+
+# Versión asíncrona de registrar_escaneo para la vista async. Las lecturas usan la caché y el ORM asíncronos;
+# la escritura (UPDATE condicional más el evento) necesita una transacción, que el ORM
+# asíncrono no ofrece, así que se ejecuta como una sola llamada síncrona.
+async def aregistrar_escaneo(token, ahora=None, espera=ESPERA_ENTRE_VUELTAS, reintentar=True):
+    ahora = ahora or timezone.now()
+    fecha_hoy = timezone.localdate(ahora)
+    placa = await adescifrar_placa(token)
+    usar_cache = cache_activada()
+    asignacion_id, capacidad = await abuscar_asignacion_activa(placa, fecha_hoy, usar_cache)
+    nuevo_total = await sync_to_async(sumar_vuelta)(asignacion_id, placa, ahora, espera)
+    if nuevo_total is None:
+        estado, ultima_vuelta = await Asignacion.objects.filter(
+            pk=asignacion_id, vehiculo_id=placa, fecha_asignacion=fecha_hoy
+        ).values_list(
+            'estado', 'ultima_vuelta_registrada_en'
+        ).afirst() or (False, None)
+        if not estado or ultima_vuelta is None:
+            if usar_cache and reintentar:
+                # La asignación guardada en caché ya no está activa o pasó a otro vehículo: se busca de nuevo
+                await cache.adelete(clave_asignacion(placa, fecha_hoy))
+                return await aregistrar_escaneo(token, ahora, espera, reintentar=False)
+            raise ErrorEscaneo(
+                f"No se encontró una asignación activa para el vehículo {placa} en la fecha de hoy ({fecha_hoy.strftime('%d-%m-%Y')}).", 404
+            )
+        raise ErrorEscaneo(mensaje_espera_vuelta(ahora - ultima_vuelta, espera), 429)
+    return {
+        "total_vueltas": nuevo_total,
+        "total_material_acumulado": float(nuevo_total * capacidad),
+    }
+
+
+# Cantidad máxima de escaneos aceptados en un solo lote
+MAX_ESCANEOS_LOTE = 5000
+
+# Tolerancia para los relojes de los lectores que van adelantados respecto al servidor
+TOLERANCIA_RELOJ = timedelta(minutes=5)
+
+
+# Función para leer la fecha y hora del escaneo enviada por el lector (ISO 8601, hora local si no trae zona)
+def leer_momento_escaneo(valor):
+    momento = parse_datetime(valor) if isinstance(valor, str) else None
+    if momento is None:
+        raise ErrorEscaneo("Fecha y hora del escaneo inválida o ausente.", 400)
+    if timezone.is_naive(momento):
+        momento = timezone.make_aware(momento)
+    if momento > timezone.now() + TOLERANCIA_RELOJ:
+        raise ErrorEscaneo("La fecha y hora del escaneo está en el futuro.", 400)
+    return momento
+
+
+# Función que registra un lote de escaneos guardados por un lector sin conexión.
+# Los registros se desencriptan en una pasada, las asignaciones se buscan con una sola consulta IN y
+# el tiempo de espera se aplica en el orden de las horas del lector. Devuelve un resultado por registro.
+def registrar_escaneos_lote(registros, espera=ESPERA_ENTRE_VUELTAS):
+    resultados = [None] * len(registros)
+    validos = []
+    for indice, registro in enumerate(registros):
+        try:
+            if not isinstance(registro, dict):
+                raise ErrorEscaneo("Registro de escaneo mal formado.", 400)
+            token = registro.get("token") or registro.get("placa")
+            if not token:
+                raise ErrorEscaneo("No se proporcionó la placa desde el QR.", 400)
+            momento = leer_momento_escaneo(registro.get("scanned_at"))
+            placa = descifrar_placa(token)
+            validos.append((momento, indice, placa, timezone.localdate(momento)))
+        except ErrorEscaneo as e:
+            resultados[indice] = {"indice": indice, "status": e.status, "error": e.mensaje}
+    if not validos:
+        return resultados
+
+    placas = {placa for _, _, placa, _ in validos}
+    fechas = {fecha for _, _, _, fecha in validos}
+    with transaction.atomic():
+        asignaciones = {}
+        for asignacion in (
+            Asignacion.objects.select_for_update(of=('self',))
+            .select_related('vehiculo')
+            .filter(vehiculo_id__in=placas, fecha_asignacion__in=fechas, estado=True)
+        ):
+            asignaciones.setdefault((asignacion.vehiculo_id, asignacion.fecha_asignacion), []).append(asignacion)
+        placas_sin_asignacion = placas - {placa for placa, _ in asignaciones}
+        placas_existentes = set(
+            Vehiculo.objects.filter(placa__in=placas_sin_asignacion).values_list('placa', flat=True)
+        ) if placas_sin_asignacion else set()
+
+        actualizadas = {}
+        vueltas = []
+        for momento, indice, placa, fecha in sorted(validos):
+            encontradas = asignaciones.get((placa, fecha), [])
+            if len(encontradas) != 1:
+                if len(encontradas) > 1:
+                    error = ErrorEscaneo(f"Múltiples asignaciones activas encontradas para el vehículo {placa} el {fecha.strftime('%d-%m-%Y')}. Por favor, contacte al administrador.", 500)
+                elif placa in placas_existentes or placa not in placas_sin_asignacion:
+                    error = ErrorEscaneo(f"No se encontró una asignación activa para el vehículo {placa} en la fecha {fecha.strftime('%d-%m-%Y')}.", 404)
+                else:
+                    error = ErrorEscaneo("Vehículo no encontrado con la placa proporcionada por el QR.", 404)
+                resultados[indice] = {"indice": indice, "status": error.status, "error": error.mensaje}
+                continue
+            asignacion = encontradas[0]
+            ultima_vuelta = asignacion.ultima_vuelta_registrada_en
+            if ultima_vuelta is not None and momento - ultima_vuelta < espera:
+                resultados[indice] = {"indice": indice, "status": 429, "error": mensaje_espera_vuelta(momento - ultima_vuelta, espera)}
+                continue
+            asignacion.total_vueltas += 1
+            asignacion.ultima_vuelta_registrada_en = momento
+            actualizadas[asignacion.pk] = asignacion
+            vueltas.append(Vuelta(asignacion_id=asignacion.pk, registrada_en=momento))
+            resultados[indice] = {
+                "indice": indice,
+                "status": 200,
+                "total_vueltas": asignacion.total_vueltas,
+                "total_material_acumulado": float(asignacion.total_material),
+            }
+        if actualizadas:
+            Asignacion.objects.bulk_update(actualizadas.values(), ['total_vueltas', 'ultima_vuelta_registrada_en'])
+            Vuelta.registrar_varias(vueltas)
+    return resultados
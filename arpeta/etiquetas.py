@@ -0,0 +1,84 @@
+import tempfile
+from io import BytesIO
+from django.core.files.storage import default_storage
+from .flujos import MEMORIA_MAXIMA_PDF, leer_en_bloques, zip_en_flujo
+from .qr import TAMANO_MODULO_QR, imagen_qr
+from .trabajos import clave_fernet
+
+
+# Etiquetas por fila y por columna en cada hoja carta del PDF
+COLUMNAS_ETIQUETAS = 3
+FILAS_ETIQUETAS = 4
+
+# Función que devuelve los vehículos para exportar con solo los campos que usan las etiquetas, leídos por bloques
+def vehiculos_para_etiquetas(vehiculos):
+    return (
+        vehiculos.select_related('modelo__marca')
+        .only('placa', 'codigo_qr', 'modelo__nombre', 'modelo__marca__nombre')
+        .order_by('placa')
+        .iterator(chunk_size=500)
+    )
+
+
+# Función que devuelve el PNG del QR guardado de un vehículo. Si todavía no se generó (el trabajo está en cola)
+# o el archivo no existe, lo dibuja en el momento sin guardarlo.
+def png_qr(vehiculo):
+    if vehiculo.codigo_qr and default_storage.exists(vehiculo.codigo_qr.name):
+        with default_storage.open(vehiculo.codigo_qr.name, 'rb') as archivo:
+            return archivo.read()
+    return imagen_qr(vehiculo.placa, clave_fernet())
+
+
+# Función que reduce el PNG del QR a un píxel gris por módulo: reportlab guarda cada imagen sin su compresión PNG,
+# así que la hoja es mucho más liviana y rápida de armar. El PDF la escala sin suavizar, así que se imprime nítida.
+def imagen_etiqueta(png):
+    from PIL import Image
+
+    imagen = Image.open(BytesIO(png)).convert('L')
+    return imagen.reduce(TAMANO_MODULO_QR) if min(imagen.size) >= TAMANO_MODULO_QR else imagen
+
+
+# Función que genera por partes un ZIP con el PNG del QR de cada vehículo
+def zip_qr(vehiculos):
+    return zip_en_flujo((f"qr_vehiculo_{vehiculo.placa}.png", png_qr(vehiculo)) for vehiculo in vehiculos_para_etiquetas(vehiculos))
+
+
+# Función que dibuja la hoja de etiquetas (QR, placa y marca/modelo) en páginas carta con reportlab y la escribe en `salida`
+def hoja_etiquetas(vehiculos, salida):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import inch
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen.canvas import Canvas
+
+    ancho_pagina, alto_pagina = letter
+    margen = 0.5 * inch
+    ancho = (ancho_pagina - 2 * margen) / COLUMNAS_ETIQUETAS
+    alto = (alto_pagina - 2 * margen) / FILAS_ETIQUETAS
+    lado_qr = min(ancho, alto) - 0.6 * inch
+    hoja = Canvas(salida, pagesize=letter, pageCompression=1)
+    hoja.setTitle("Códigos QR de vehículos")
+    posicion = 0
+    for vehiculo in vehiculos_para_etiquetas(vehiculos):
+        if posicion == COLUMNAS_ETIQUETAS * FILAS_ETIQUETAS:
+            hoja.showPage()
+            posicion = 0
+        fila, columna = divmod(posicion, COLUMNAS_ETIQUETAS)
+        x = margen + columna * ancho
+        y = alto_pagina - margen - (fila + 1) * alto
+        hoja.setDash(2, 2)
+        hoja.rect(x, y, ancho, alto)
+        hoja.drawImage(ImageReader(imagen_etiqueta(png_qr(vehiculo))), x + (ancho - lado_qr) / 2, y + 0.45 * inch, lado_qr, lado_qr)
+        hoja.setFont('Helvetica-Bold', 14)
+        hoja.drawCentredString(x + ancho / 2, y + 0.25 * inch, vehiculo.placa)
+        hoja.setFont('Helvetica', 8)
+        hoja.drawCentredString(x + ancho / 2, y + 0.1 * inch, f"{vehiculo.modelo.marca.nombre} {vehiculo.modelo.nombre}")
+        posicion += 1
+    hoja.save()
+
+
+# Función que genera por partes el PDF de etiquetas. reportlab escribe el documento completo al final, así que
+# se arma en un archivo temporal (en memoria hasta MEMORIA_MAXIMA_PDF y después en disco) y se envía por bloques.
+def pdf_qr(vehiculos):
+    archivo = tempfile.SpooledTemporaryFile(max_size=MEMORIA_MAXIMA_PDF)
+    hoja_etiquetas(vehiculos, archivo)
+    yield from leer_en_bloques(archivo)
@@ -0,0 +1,31 @@
+import os
+from importlib.util import find_spec
+from django.contrib.staticfiles.finders import BaseFinder
+from django.core.files.storage import FileSystemStorage
+
+
+# Finder de archivos estáticos que publica solo plotly.min.js del paquete de Python plotly (la misma versión
+# que genera los gráficos) como 'plotly/plotly.min.js'. El resto de package_data (plantillas, datos de mapas)
+# no se copia con collectstatic ni se sirve.
+class PlotlyFinder(BaseFinder):
+    prefijo = 'plotly'
+    archivo = 'plotly.min.js'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.storage = FileSystemStorage(
+            location=os.path.join(find_spec('plotly').submodule_search_locations[0], 'package_data')
+        )
+        # collectstatic antepone este prefijo a las rutas que devuelve list()
+        self.storage.prefix = self.prefijo
+
+    # Método que devuelve la ruta absoluta del archivo si se pide 'plotly/plotly.min.js'
+    def find(self, path, all=False):
+        if path != f"{self.prefijo}/{self.archivo}":
+            return []
+        ruta = self.storage.path(self.archivo)
+        return [ruta] if all else ruta
+
+    # Método que devuelve el único archivo que publica este finder para collectstatic
+    def list(self, ignore_patterns):
+        yield self.archivo, self.storage
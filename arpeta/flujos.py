@@ -0,0 +1,47 @@
+import zipfile
+from io import RawIOBase
+
+
+# Funciones para generar archivos por partes en las respuestas StreamingHttpResponse, de modo que la memoria
+# no crezca con la cantidad de archivos
+
+
+# Tamaño de los PDF armados en archivos temporales a partir del cual el archivo pasa de memoria a disco
+MEMORIA_MAXIMA_PDF = 10 * 1024 * 1024
+
+# Salida de solo escritura que acumula lo escrito hasta que se vacía (para generar un ZIP por partes)
+class SalidaEnFlujo(RawIOBase):
+    def __init__(self):
+        self.partes = []
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        self.partes.append(bytes(datos))
+        return len(datos)
+
+    def vaciar(self):
+        datos = b''.join(self.partes)
+        self.partes.clear()
+        return datos
+
+
+# Función que genera un ZIP por partes a partir de (nombre, contenido): cada archivo se envía apenas se comprime
+def zip_en_flujo(archivos):
+    salida = SalidaEnFlujo()
+    with zipfile.ZipFile(salida, 'w', compression=zipfile.ZIP_DEFLATED) as archivo_zip:
+        for nombre, contenido in archivos:
+            archivo_zip.writestr(nombre, contenido)
+            yield salida.vaciar()
+    yield salida.vaciar()
+
+
+# Función que devuelve por bloques el contenido de un archivo abierto, empezando desde el principio, y lo cierra al terminar
+def leer_en_bloques(archivo, tamano=64 * 1024):
+    try:
+        archivo.seek(0)
+        while bloque := archivo.read(tamano):
+            yield bloque
+    finally:
+        archivo.close()
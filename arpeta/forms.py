@@ -1,5 +1,8 @@
 from django import forms
-from .models import Operador, Vehiculo, Asignacion
+from django.contrib.auth.forms import PasswordResetForm
+from django.template.loader import render_to_string
+from .correos import encolar_correo
+from .models import Operador, Vehiculo, Asignacion, TipoMaterial
 
 # Formulario para el modelo Operador
 class OperadorForm(forms.ModelForm):
@@ -32,4 +35,60 @@ class AsignacionForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         if self.instance and self.instance.pk:
             self.fields['operador'].disabled = True
-            self.fields['vehiculo'].disabled = True
\ No newline at end of file
+            self.fields['vehiculo'].disabled = True
+
+# Formulario de búsqueda y filtros compartido por los listados de asignaciones, vehículos y operadores
+class FiltroBusquedaForm(forms.Form):
+    ESTADOS = [('', 'Todos'), ('activo', 'Activo'), ('inactivo', 'Inactivo')]
+
+    q = forms.CharField(required=False, max_length=50, label='Buscar')
+    fecha_desde = forms.DateField(required=False, label='Desde')
+    fecha_hasta = forms.DateField(required=False, label='Hasta')
+    estado = forms.ChoiceField(required=False, choices=ESTADOS, label='Estado')
+    placa = forms.CharField(required=False, max_length=6, label='Placa')
+    cedula = forms.CharField(required=False, max_length=8, label='Cédula')
+    operador = forms.CharField(required=False, max_length=50, label='Operador')
+    tipo_material = forms.ModelChoiceField(
+        queryset=TipoMaterial.objects.all(), required=False, label='Tipo de Material', empty_label='Todos los materiales',
+        widget=forms.Select(attrs={'class': 'px-3 py-2 border border-gray-300 rounded-md text-sm focus:ring-primary-500 focus:border-primary-500'})
+    )
+
+    # Devuelve solo los filtros válidos y con valor; los inválidos se ignoran en lugar de vaciar el listado
+    def filtros(self):
+        self.is_valid()
+        return {campo: valor for campo, valor in self.cleaned_data.items() if valor not in (None, '')}
+
+
+# Formulario para generar los recibos de pago de todas las asignaciones pagables en un rango de fechas
+class RecibosLoteForm(forms.Form):
+    TIPOS_PAGO = [('arena', 'Pago en Arena'), ('divisas', 'Pago en Divisas')]
+    FORMATOS = [('zip', 'ZIP con un PDF por recibo'), ('pdf', 'Un solo PDF')]
+
+    desde = forms.DateField(label='Desde')
+    hasta = forms.DateField(label='Hasta')
+    tipo_pago = forms.ChoiceField(choices=TIPOS_PAGO, label='Tipo de Pago')
+    formato = forms.ChoiceField(choices=FORMATOS, initial='zip', label='Formato')
+
+    def clean(self):
+        datos = super().clean()
+        if datos.get('desde') and datos.get('hasta') and datos['desde'] > datos['hasta']:
+            raise forms.ValidationError("La fecha inicial no puede ser posterior a la fecha final.")
+        return datos
+
+
+# Formulario para exportar de una vez los códigos QR de los vehículos filtrados
+class ExportarQrForm(forms.Form):
+    FORMATOS = [('zip', 'ZIP con un PNG por vehículo'), ('pdf', 'Hoja de etiquetas en PDF')]
+
+    formato = forms.ChoiceField(choices=FORMATOS, initial='zip', label='Formato')
+
+
+# Formulario para restablecer la contraseña que deja el correo en la cola de salida en lugar de enviarlo en la petición
+class RestablecerContrasenaForm(PasswordResetForm):
+    def send_mail(self, subject_template_name, email_template_name, context, from_email, to_email,
+                  html_email_template_name=None):
+        asunto = ''.join(render_to_string(subject_template_name, context).splitlines())
+        cuerpo = render_to_string(email_template_name, context)
+        cuerpo_html = render_to_string(html_email_template_name, context) if html_email_template_name else ''
+        # El correo lleva un enlace de acceso a la cuenta: se borra de la cola apenas se envía
+        encolar_correo(asunto, cuerpo, [to_email], cuerpo_html=cuerpo_html, remitente=from_email or '', confidencial=True)
@@ -0,0 +1,72 @@
+import hashlib
+import json
+from django.core.cache import cache
+
+
+# Duración de los gráficos renderizados en caché. La clave incluye la huella de los datos,
+# así que un gráfico con datos nuevos se vuelve a generar sin esperar a que venza.
+DURACION_CACHE_GRAFICOS = 60 * 60 * 24
+
+# Fondo transparente para que los gráficos tomen el color de la tarjeta que los contiene
+FONDO_TRANSPARENTE = dict(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
+
+
+# Función que calcula la huella de los datos de un gráfico
+def huella_datos(datos):
+    return hashlib.sha256(json.dumps(datos, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+# Función que devuelve el fragmento HTML de un gráfico de Plotly, guardado en caché por la huella de sus datos.
+# Plotly solo se importa y se usa cuando el gráfico no está en caché; plotly.js no se incluye en el fragmento
+# porque las plantillas lo cargan una vez como archivo estático.
+def renderizar_grafico(nombre, datos, construir):
+    clave = f"graficos:{nombre}:{huella_datos(datos)}"
+    html = cache.get(clave)
+    if html is None:
+        figura = construir(datos)
+        html = figura.to_html(full_html=False, include_plotlyjs=False, config={'responsive': True})
+        cache.set(clave, html, DURACION_CACHE_GRAFICOS)
+    return html
+
+
+# Gráfico de torta con la distribución de operadores activos e inactivos
+def figura_estado_operadores(datos):
+    import plotly.graph_objects as go
+
+    figura = go.Figure(go.Pie(
+        labels=['Activos', 'Inactivos'],
+        values=[datos['activos'], datos['inactivos']],
+        marker=dict(colors=['#4CAF50', '#F44336'], line=dict(color='#FFFFFF', width=1)),
+        textposition='inside',
+        textinfo='percent+label',
+    ))
+    figura.update_layout(title='Distribución de Operadores por Estado')
+    return figura
+
+
+# Gráfico de barras con la cantidad de operadores independientes y no independientes
+def figura_tipo_operadores(datos):
+    import plotly.graph_objects as go
+
+    figura = go.Figure()
+    for tipo, cantidad, color in [
+        ('Independientes', datos['independientes'], '#2196F3'),
+        ('No Independientes', datos['no_independientes'], '#9C27B0'),
+    ]:
+        figura.add_trace(go.Bar(x=[tipo], y=[cantidad], name=tipo, marker_color=color))
+    figura.update_layout(title='Distribución por Tipo de Operador', xaxis_title=None, yaxis_title='Cantidad', **FONDO_TRANSPARENTE)
+    return figura
+
+
+# Gráfico de barras con los vehículos más asignados; recibe [[etiqueta, cantidad], ...]
+def figura_vehiculos_populares(datos):
+    import plotly.graph_objects as go
+
+    figura = go.Figure(go.Bar(
+        x=[etiqueta for etiqueta, _ in datos],
+        y=[cantidad for _, cantidad in datos],
+        marker_color='#607D8B',
+        hovertemplate='Vehículo: %{x}<br>N° de Asignaciones: %{y}<extra></extra>',
+    ))
+    figura.update_layout(title='Vehículos más asignados', xaxis_title=None, yaxis_title='N° de Asignaciones', **FONDO_TRANSPARENTE)
+    return figura
@@ -0,0 +1,52 @@
+import posixpath
+from io import BytesIO
+
+
+# Derivados de las fotos: nombre -> (lado en píxeles, si se recorta al cuadrado). La miniatura es la de los listados
+# (se muestra a 40 px con object-cover, así que se recorta); la tarjeta es la de los detalles y las vistas previas.
+TAMANOS_FOTO = {
+    'miniatura': (128, True),
+    'tarjeta': (512, False),
+}
+
+# Calidad WebP de los derivados
+CALIDAD_WEBP = 80
+
+# Carpeta de MEDIA_ROOT donde se guardan los derivados, con la misma estructura que las fotos originales
+CARPETA_DERIVADOS = 'derivados'
+
+
+# Función que devuelve la ruta determinística de un derivado a partir de la ruta de la foto original:
+# operadores/foto.jpg -> derivados/operadores/foto_miniatura.webp
+def ruta_derivado(nombre, tamano):
+    base, _ = posixpath.splitext(nombre)
+    return f"{CARPETA_DERIVADOS}/{base}_{tamano}.webp"
+
+
+# Función que genera los derivados WebP de una foto y devuelve {tamano: bytes}.
+# No depende de Django, por lo que se puede ejecutar en un hilo o en otro proceso.
+# Pillow se importa en el primer uso para que los workers que no procesan fotos no lo carguen.
+def derivados_foto(contenido):
+    from PIL import Image, ImageOps
+
+    imagen = Image.open(BytesIO(contenido))
+    mayor = max(lado for lado, _ in TAMANOS_FOTO.values())
+    # En JPEG, el decodificador reduce la imagen mientras la lee (una foto de 12 MP se decodifica a 1/4 o 1/8)
+    imagen.draft('RGB', (mayor, mayor))
+    # Las fotos de teléfono guardan la rotación en EXIF; se aplica antes de recortar
+    imagen = ImageOps.exif_transpose(imagen)
+    imagen = imagen.convert('RGBA' if imagen.mode in ('RGBA', 'LA', 'P') else 'RGB')
+    derivados = {}
+    for tamano, (lado, cuadrado) in sorted(TAMANOS_FOTO.items(), key=lambda item: -item[1][0]):
+        if cuadrado:
+            imagen_derivada = ImageOps.fit(imagen, (lado, lado), Image.Resampling.LANCZOS)
+        else:
+            imagen_derivada = imagen.copy()
+            imagen_derivada.thumbnail((lado, lado), Image.Resampling.LANCZOS)
+        resultado = BytesIO()
+        imagen_derivada.save(resultado, format='WEBP', quality=CALIDAD_WEBP)
+        derivados[tamano] = resultado.getvalue()
+        # Los derivados más chicos se sacan del más grande, que ya está reducido
+        if not cuadrado:
+            imagen = imagen_derivada
+    return derivados
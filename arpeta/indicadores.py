@@ -0,0 +1,125 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, FloatField, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from .models import Operador, Vehiculo, TipoMaterial, Asignacion
+
+
+# Clave de caché del resumen de indicadores de las páginas del gerente
+CLAVE_INDICADORES = "indicadores:resumen"
+
+# Duración del resumen en caché. Las señales lo invalidan al guardar o borrar operadores, vehículos y asignaciones;
+# las vueltas escaneadas no pasan por save(), así que el material acumulado puede tardar hasta este tiempo en reflejarse.
+DURACION_CACHE_INDICADORES = 60
+
+# Cantidad de meses que muestra por defecto el gráfico de asignaciones por mes
+MESES_ASIGNACIONES = getattr(settings, 'MESES_ASIGNACIONES', 24)
+
+# Duración del conteo de asignaciones de cada mes en caché; las señales borran solo el mes que cambia
+DURACION_CACHE_MESES = 60 * 60 * 24
+
+
+# Expresión del volumen transportado por una asignación (vueltas * alto * ancho * largo del vehículo)
+def volumen_transportado(prefijo=''):
+    return (
+        F(f'{prefijo}total_vueltas') * F(f'{prefijo}vehiculo__alto')
+        * F(f'{prefijo}vehiculo__ancho') * F(f'{prefijo}vehiculo__largo')
+    )
+
+
+# Función para eliminar de la caché el resumen de indicadores
+def olvidar_indicadores():
+    cache.delete(CLAVE_INDICADORES)
+
+
+# Función que calcula los indicadores con una consulta de agregados condicionales por tabla
+def calcular_indicadores():
+    operadores = Operador.objects.aggregate(
+        total=Count('pk'),
+        activos=Count('pk', filter=Q(activo=True)),
+        independientes=Count('pk', filter=Q(independiente=True)),
+    )
+    vehiculos = Vehiculo.objects.aggregate(
+        total=Count('pk'),
+        activos=Count('pk', filter=Q(activo=True)),
+    )
+    asignaciones = Asignacion.objects.aggregate(
+        total=Count('pk'),
+        activas=Count('pk', filter=Q(estado=True)),
+        material=Sum(volumen_transportado(), output_field=FloatField()),
+    )
+    material_por_tipo = list(
+        TipoMaterial.objects.order_by('pk')
+        .annotate(material=Sum(volumen_transportado('asignacion__'), output_field=FloatField()))
+        .values_list('nombre', 'material')
+    )
+    return {
+        'total_operadores': operadores['total'],
+        'operadores_activos': operadores['activos'],
+        'operadores_inactivos': operadores['total'] - operadores['activos'],
+        'operadores_independientes': operadores['independientes'],
+        'operadores_no_independientes': operadores['total'] - operadores['independientes'],
+        'total_vehiculos': vehiculos['total'],
+        'vehiculos_activos': vehiculos['activos'],
+        'vehiculos_mantenimiento': vehiculos['total'] - vehiculos['activos'],
+        'porcentaje_disponibilidad': round(vehiculos['activos'] / vehiculos['total'] * 100) if vehiculos['total'] else 0,
+        'total_asignaciones': asignaciones['total'],
+        'asignaciones_activas': asignaciones['activas'],
+        'asignaciones_inactivas': asignaciones['total'] - asignaciones['activas'],
+        'total_material': float(asignaciones['material'] or 0),
+        'material_por_tipo': [(nombre, float(material or 0)) for nombre, material in material_por_tipo],
+    }
+
+
+# Función que devuelve el resumen de indicadores; solo consulta la base de datos si no está en caché
+def obtener_indicadores():
+    indicadores = cache.get(CLAVE_INDICADORES)
+    if indicadores is None:
+        indicadores = calcular_indicadores()
+        cache.set(CLAVE_INDICADORES, indicadores, DURACION_CACHE_INDICADORES)
+    return indicadores
+
+
+# Función que arma la clave de caché del conteo de asignaciones de un mes
+def clave_asignaciones_mes(mes):
+    return f"indicadores:asignaciones_mes:{mes:%Y-%m}"
+
+
+# Función para eliminar de la caché el conteo del mes al que pertenece una fecha
+def olvidar_asignaciones_mes(fecha):
+    cache.delete(clave_asignaciones_mes(fecha.replace(day=1)))
+
+
+# Función que devuelve el primer día de los últimos `meses` meses, del más antiguo al actual
+def ultimos_meses(meses, hoy=None):
+    mes = (hoy or timezone.localdate()).replace(day=1)
+    lista = []
+    for _ in range(meses):
+        lista.append(mes)
+        mes = (mes - timedelta(days=1)).replace(day=1)
+    return lista[::-1]
+
+
+# Función que devuelve [(mes, cantidad de asignaciones)] de los últimos `meses` meses.
+# Cada mes se guarda en caché por separado: solo se consultan los meses que faltan, con un único GROUP BY
+# acotado por rango de fechas, y al cambiar una asignación solo se vuelve a calcular su mes.
+def asignaciones_por_mes(meses=MESES_ASIGNACIONES):
+    lista = ultimos_meses(meses)
+    claves = {clave_asignaciones_mes(mes): mes for mes in lista}
+    conteos = cache.get_many(claves)
+    faltantes = [mes for clave, mes in claves.items() if clave not in conteos]
+    if faltantes:
+        fin = (faltantes[-1] + timedelta(days=31)).replace(day=1)
+        encontrados = dict(
+            Asignacion.objects.filter(fecha_asignacion__gte=faltantes[0], fecha_asignacion__lt=fin)
+            .annotate(mes=TruncMonth('fecha_asignacion'))
+            .values('mes')
+            .annotate(total=Count('pk'))
+            .values_list('mes', 'total')
+        )
+        nuevos = {clave_asignaciones_mes(mes): encontrados.get(mes, 0) for mes in faltantes}
+        cache.set_many(nuevos, DURACION_CACHE_MESES)
+        conteos.update(nuevos)
+    return [(mes, conteos[clave_asignaciones_mes(mes)]) for mes in lista]
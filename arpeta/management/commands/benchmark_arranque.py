@@ -0,0 +1,96 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Librerías de reportes y PDF que un worker no debe cargar al arrancar (se importan en el primer uso)
+MODULOS_PESADOS = ('xhtml2pdf', 'reportlab', 'html5lib', 'pypdf', 'plotly', 'pandas', 'qrcode', 'PIL')
+
+# Programa que ejecuta cada medición en un intérprete nuevo, igual que un worker de gunicorn/uwsgi al arrancar:
+# configura Django, crea la aplicación WSGI e importa la URLconf con todas las vistas.
+PROGRAMA = """
+import json, resource, sys, time
+inicio = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.conf import settings
+from importlib import import_module
+import_module(settings.ROOT_URLCONF)
+duracion = time.perf_counter() - inicio
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+rss = rss / 1024 / 1024 if sys.platform == 'darwin' else rss / 1024
+print(json.dumps({'ms': duracion * 1000, 'rss_mb': rss, 'modulos': sorted(sys.modules)}))
+"""
+
+
+# Comando para medir el tiempo de importación y la memoria con que arranca un worker
+class Command(BaseCommand):
+    help = ("Mide el tiempo de arranque y la memoria (RSS) de un worker en intérpretes nuevos, muestra las "
+            "importaciones más lentas y falla si se cargan librerías pesadas o si empeora respecto a una referencia.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=5, help="Cantidad de arranques medidos.")
+        parser.add_argument('--referencia', help="Archivo JSON con una medición anterior para comparar.")
+        parser.add_argument('--guardar', help="Archivo JSON donde guardar esta medición como referencia.")
+        parser.add_argument('--tolerancia', type=float, default=0.2,
+                            help="Aumento relativo permitido respecto a la referencia (0.2 = 20%%).")
+        parser.add_argument('--importaciones', type=int, default=10, help="Cantidad de importaciones lentas a mostrar.")
+
+    def handle(self, *args, **options):
+        mediciones = [self.arrancar() for _ in range(max(1, options['repeticiones']))]
+        resultado = {
+            'ms': statistics.median(m['ms'] for m in mediciones),
+            'rss_mb': statistics.median(m['rss_mb'] for m in mediciones),
+        }
+        self.stdout.write(
+            f"Arranque del worker: {resultado['ms']:,.0f} ms, {resultado['rss_mb']:,.1f} MB de RSS "
+            f"(mediana de {len(mediciones)})"
+        )
+        if options['importaciones']:
+            self.mostrar_importaciones(options['importaciones'])
+
+        errores = []
+        cargados = sorted({m.split('.')[0] for m in mediciones[0]['modulos']} & set(MODULOS_PESADOS))
+        if cargados:
+            errores.append(f"Se cargan al arrancar: {', '.join(cargados)}")
+        if options['referencia']:
+            with open(options['referencia'], encoding='utf-8') as archivo:
+                referencia = json.load(archivo)
+            for clave, unidad in (('ms', 'ms'), ('rss_mb', 'MB')):
+                limite = referencia[clave] * (1 + options['tolerancia'])
+                self.stdout.write(f"Referencia: {referencia[clave]:,.1f} {unidad}, límite {limite:,.1f} {unidad}")
+                if resultado[clave] > limite:
+                    errores.append(f"{clave} empeoró: {resultado[clave]:,.1f} {unidad} (límite {limite:,.1f} {unidad})")
+        if options['guardar']:
+            with open(options['guardar'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultado, archivo, indent=2)
+            self.stdout.write(f"Medición guardada en {options['guardar']}")
+        if errores:
+            raise CommandError('\n'.join(errores))
+
+    # Ejecuta un arranque en un intérprete nuevo con la misma configuración y devuelve su medición
+    def arrancar(self, *opciones):
+        entorno = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'sistema.settings')}
+        proceso = subprocess.run(
+            [sys.executable, *opciones, '-c', PROGRAMA], capture_output=True, text=True, env=entorno, cwd=settings.BASE_DIR
+        )
+        if proceso.returncode:
+            raise CommandError(f"El arranque falló:\n{proceso.stderr}")
+        return {**json.loads(proceso.stdout.strip().splitlines()[-1]), 'importtime': proceso.stderr}
+
+    # Muestra los paquetes de primer nivel que más tardan en importarse, según `python -X importtime`
+    def mostrar_importaciones(self, cantidad):
+        paquetes = []
+        for linea in self.arrancar('-X', 'importtime')['importtime'].splitlines():
+            if not linea.startswith('import time:') or 'cumulative' in linea:
+                continue
+            _, acumulado, nombre = linea[len('import time:'):].split('|')
+            if not nombre.startswith('  '):
+                paquetes.append((int(acumulado), nombre.strip()))
+        self.stdout.write("Importaciones más lentas (acumulado):")
+        for acumulado, nombre in sorted(paquetes, reverse=True)[:cantidad]:
+            self.stdout.write(f"  {acumulado / 1000:8,.1f} ms  {nombre}")
@@ -0,0 +1,103 @@
+import random
+import string
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from arpeta.busqueda import filtrar_asignaciones
+from arpeta.models import Operador, Vehiculo, TipoMaterial, Asignacion, Marca, Modelo
+
+
+NOMBRES = ['José', 'María', 'Luis', 'Ana', 'Carlos', 'Carmen', 'Pedro', 'Rosa', 'Jesús', 'Luisa', 'Miguel', 'Elena']
+APELLIDOS = ['González', 'Rodríguez', 'Pérez', 'Hernández', 'García', 'Martínez', 'López', 'Díaz', 'Sánchez', 'Romero']
+
+
+# Error usado para deshacer los datos sintéticos al terminar el benchmark
+class FinBenchmark(Exception):
+    pass
+
+
+# Comando para medir los filtros de asignaciones sobre un conjunto sintético de datos
+class Command(BaseCommand):
+    help = ("Genera un conjunto sintético de asignaciones (1.000.000 por defecto) y mide el tiempo de cada filtro "
+            "de búsqueda. Los datos se descartan al final salvo que se use --conservar.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--asignaciones', type=int, default=1_000_000, help="Cantidad de asignaciones sintéticas.")
+        parser.add_argument('--repeticiones', type=int, default=5, help="Repeticiones de cada consulta.")
+        parser.add_argument('--explain', action='store_true', help="Muestra el plan de ejecución de cada consulta.")
+        parser.add_argument('--conservar', action='store_true', help="Conserva los datos sintéticos en la base de datos.")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.generar(options['asignaciones'])
+                self.medir(options['repeticiones'], options['explain'])
+                if not options['conservar']:
+                    raise FinBenchmark
+        except FinBenchmark:
+            self.stdout.write("Datos sintéticos descartados.")
+
+    def generar(self, total):
+        aleatorio = random.Random(2712)
+        inicio = time.perf_counter()
+        cantidad = max(10, min(total // 200, 26 * 26 * 1000))
+        marca, _ = Marca.objects.get_or_create(nombre='Benchmark')
+        modelo, _ = Modelo.objects.get_or_create(nombre='Benchmark', marca=marca)
+        materiales = [TipoMaterial.objects.get_or_create(nombre=nombre)[0] for nombre in ('Arena', 'Granzon', 'Polvillo', 'Gravilla')]
+        operadores = Operador.objects.bulk_create([
+            Operador(
+                cedula=f'9{i:07d}', nombre=aleatorio.choice(NOMBRES), apellido=aleatorio.choice(APELLIDOS),
+                telefono='+584141234567', correo=f'benchmark{i}@arpeta.com', direccion='N/A'
+            ) for i in range(cantidad)
+        ], batch_size=5000)
+        vehiculos = Vehiculo.objects.bulk_create([
+            Vehiculo(
+                placa='Z' + string.ascii_uppercase[i // 26000 % 26] + string.ascii_uppercase[i // 1000 % 26] + f'{i % 1000:03d}',
+                modelo=modelo, alto=2, ancho=2, largo=3, codigo_qr='codigos_qr/benchmark.png'
+            ) for i in range(cantidad)
+        ], batch_size=5000)
+        hoy = timezone.localdate()
+        lote = []
+        for n in range(total):
+            dia, k = divmod(n, cantidad)
+            lote.append(Asignacion(
+                operador=operadores[k],
+                vehiculo=vehiculos[(k + dia) % cantidad],
+                fecha_asignacion=hoy - timedelta(days=dia),
+                tipo_material=aleatorio.choice(materiales),
+                total_vueltas=aleatorio.randint(0, 20),
+                estado=dia == 0 or aleatorio.random() < 0.1,
+            ))
+            if len(lote) == 10000:
+                Asignacion.objects.bulk_create(lote)
+                lote = []
+        Asignacion.objects.bulk_create(lote)
+        self.stdout.write(f"{total:,} asignaciones sintéticas generadas en {time.perf_counter() - inicio:.1f} s")
+
+    def medir(self, repeticiones, explain):
+        hoy = timezone.localdate()
+        escenarios = {
+            'Activas del último mes': {'estado': 'activo', 'fecha_desde': hoy - timedelta(days=30)},
+            'Rango de fechas y material': {
+                'fecha_desde': hoy - timedelta(days=90), 'fecha_hasta': hoy - timedelta(days=60),
+                'tipo_material': TipoMaterial.objects.get(nombre='Arena'),
+            },
+            'Prefijo de placa': {'placa': 'ZAB'},
+            'Prefijo de cédula': {'cedula': '90001'},
+            'Nombre de operador': {'operador': 'rodr'},
+            'Búsqueda general': {'q': 'ZAC1'},
+        }
+        for nombre, filtros in escenarios.items():
+            consulta = filtrar_asignaciones(
+                Asignacion.objects.select_related('operador', 'vehiculo'), filtros
+            ).order_by('-fecha_asignacion', '-id')[:25]
+            tiempos = []
+            for _ in range(repeticiones):
+                inicio = time.perf_counter()
+                list(consulta.all())
+                tiempos.append(time.perf_counter() - inicio)
+            self.stdout.write(f"{nombre}: mejor {min(tiempos) * 1000:.1f} ms, promedio {sum(tiempos) / len(tiempos) * 1000:.1f} ms")
+            if explain:
+                self.stdout.write(consulta.explain())
@@ -0,0 +1,179 @@
+import asyncio
+import statistics
+import time
+from collections import Counter
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from django.utils.module_loading import import_string
+from arpeta.escaneo import obtener_fernet
+from arpeta.models import (
+    Operador, Vehiculo, Asignacion, Marca, Modelo, Vuelta
+)
+from arpeta.roles import ADMINISTRACION
+
+
+# Usuario con el que el benchmark registra las vueltas
+USUARIO_CARGA = 'benchmark_carga'
+
+# Caracteres de la cookie de CSRF (el middleware acepta el secreto sin enmascarar en la cabecera)
+CARACTERES_CSRF = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+
+
+# Comando para medir la latencia y la concurrencia del registro de vueltas contra un servidor en ejecución
+class Command(BaseCommand):
+    help = ("Dispara escaneos concurrentes contra un servidor ya iniciado (por ejemplo `uvicorn sistema.asgi:application` "
+            "o un servidor WSGI) y muestra el rendimiento y los percentiles de latencia. Cada escaneo usa un vehículo "
+            "distinto, así que todos recorren el camino completo de registro. Los datos de prueba se borran al final.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help="URL base del servidor.")
+        parser.add_argument('--ruta', default='/administracion/registrar_vuelta_async/',
+                            help="Ruta del registro de vueltas (la síncrona es /administracion/registrar_vuelta/).")
+        parser.add_argument('--escaneos', type=int, default=5000, help="Cantidad de escaneos (máximo 99.999).")
+        parser.add_argument('--concurrencia', type=int, default=200, help="Conexiones abiertas al mismo tiempo.")
+        parser.add_argument('--conservar', action='store_true', help="Conserva los datos de prueba en la base de datos.")
+
+    def handle(self, *args, **options):
+        escaneos = options['escaneos']
+        if not 0 < escaneos < 100_000:
+            raise CommandError("La cantidad de escaneos debe estar entre 1 y 99.999.")
+        placas = [f'Q{i:05d}' for i in range(escaneos)]
+        if Vehiculo.objects.filter(placa__in=placas).exists():
+            raise CommandError("Ya existen vehículos con las placas de prueba (Q00000...). Bórrelos antes de medir.")
+
+        cookies = self.crear_datos(placas)
+        try:
+            tokens = [obtener_fernet().encrypt(placa.encode('utf-8')).decode('utf-8') for placa in placas]
+            url = urlsplit(options['url'])
+            latencias, estados, duracion = asyncio.run(
+                self.disparar(url, options['ruta'], tokens, options['concurrencia'], cookies)
+            )
+            self.mostrar(latencias, estados, duracion, options['concurrencia'])
+        finally:
+            if not options['conservar']:
+                self.borrar_datos(placas)
+
+    # Crea un vehículo con su asignación activa por escaneo y una sesión de un usuario de administración
+    def crear_datos(self, placas):
+        with transaction.atomic():
+            marca, _ = Marca.objects.get_or_create(nombre='Benchmark')
+            modelo, _ = Modelo.objects.get_or_create(nombre='Benchmark', marca=marca)
+            # Se asigna un nombre de QR para que los vehículos no generen la imagen en disco
+            vehiculos = Vehiculo.objects.bulk_create([
+                Vehiculo(placa=placa, modelo=modelo, alto=2, ancho=2, largo=3, codigo_qr='codigos_qr/benchmark.png')
+                for placa in placas
+            ], batch_size=5000)
+            operador, _ = Operador.objects.get_or_create(cedula='00000000', defaults={
+                'nombre': 'Benchmark', 'apellido': 'Benchmark', 'telefono': '+584141234567',
+                'correo': 'benchmark@arpeta.com', 'direccion': 'N/A',
+            })
+            hoy = timezone.localdate()
+            Asignacion.objects.bulk_create([
+                Asignacion(operador=operador, vehiculo=vehiculo, fecha_asignacion=hoy) for vehiculo in vehiculos
+            ], batch_size=5000)
+            usuario, creado = User.objects.get_or_create(username=USUARIO_CARGA, defaults={'email': 'carga@arpeta.com'})
+            if creado:
+                usuario.set_unusable_password()
+                usuario.save()
+            usuario.groups.add(Group.objects.get_or_create(name=ADMINISTRACION)[0])
+
+        sesion = import_string(f"{settings.SESSION_ENGINE}.SessionStore")()
+        sesion[SESSION_KEY] = str(usuario.pk)
+        sesion[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+        sesion[HASH_SESSION_KEY] = usuario.get_session_auth_hash()
+        sesion.save()
+        csrf = get_random_string(32, CARACTERES_CSRF)
+        cookies = SimpleCookie()
+        cookies[settings.SESSION_COOKIE_NAME] = sesion.session_key
+        cookies[settings.CSRF_COOKIE_NAME] = csrf
+        return {'cookie': '; '.join(f'{nombre}={valor.value}' for nombre, valor in cookies.items()), 'csrf': csrf}
+
+    # Borra los datos de prueba y descuenta de los resúmenes las vueltas que registró el benchmark
+    def borrar_datos(self, placas):
+        with transaction.atomic():
+            Vuelta.sumar_resumenes(*Vuelta.contar_resumenes(
+                Vuelta.objects.filter(asignacion__vehiculo_id__in=placas).values_list('registrada_en', flat=True)
+            ), signo=-1)
+            Vehiculo.objects.filter(placa__in=placas).delete()
+            Operador.objects.filter(cedula='00000000', asignacion__isnull=True).delete()
+        self.stdout.write("Datos de prueba borrados.")
+
+    # Reparte los escaneos entre conexiones HTTP/1.1 persistentes y mide la latencia de cada uno
+    async def disparar(self, url, ruta, tokens, concurrencia, cookies):
+        pendientes = iter(tokens)
+        latencias = []
+        estados = Counter()
+        cabeceras = (
+            f"POST {ruta} HTTP/1.1\r\nHost: {url.netloc}\r\nContent-Type: application/json\r\n"
+            f"Cookie: {cookies['cookie']}\r\nX-CSRFToken: {cookies['csrf']}\r\n"
+        )
+
+        async def conexion():
+            lector = escritor = None
+            for token in pendientes:
+                cuerpo = f'{{"placa": "{token}"}}'.encode('utf-8')
+                peticion = f"{cabeceras}Content-Length: {len(cuerpo)}\r\n\r\n".encode('latin-1') + cuerpo
+                inicio = time.perf_counter()
+                try:
+                    if escritor is None:
+                        lector, escritor = await asyncio.open_connection(url.hostname, url.port or 80)
+                    escritor.write(peticion)
+                    estado, cerrar = await leer_respuesta(lector)
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    estado, cerrar = 'error de conexión', True
+                latencias.append(time.perf_counter() - inicio)
+                estados[estado] += 1
+                if cerrar and escritor is not None:
+                    escritor.close()
+                    lector = escritor = None
+            if escritor is not None:
+                escritor.close()
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(conexion() for _ in range(concurrencia)))
+        return latencias, estados, time.perf_counter() - inicio
+
+    def mostrar(self, latencias, estados, duracion, concurrencia):
+        latencias = sorted(latencias)
+        percentiles = statistics.quantiles(latencias, n=100, method='inclusive') if len(latencias) > 1 else latencias * 99
+        self.stdout.write(
+            f"{len(latencias):,} escaneos con {concurrencia} conexiones en {duracion:,.2f} s: "
+            f"{len(latencias) / duracion:,.0f} escaneos/s"
+        )
+        self.stdout.write(
+            f"Latencia: p50 {percentiles[49] * 1000:,.1f} ms, p90 {percentiles[89] * 1000:,.1f} ms, "
+            f"p99 {percentiles[98] * 1000:,.1f} ms, máx {latencias[-1] * 1000:,.1f} ms"
+        )
+        self.stdout.write("Respuestas: " + ", ".join(f"{estado}: {cantidad:,}" for estado, cantidad in sorted(estados.items(), key=str)))
+
+
+# Función que lee una respuesta HTTP/1.1 y devuelve (código de estado, si el servidor cierra la conexión)
+async def leer_respuesta(lector):
+    linea = await lector.readuntil(b'\r\n')
+    estado = int(linea.split()[1])
+    largo = 0
+    por_partes = False
+    cerrar = linea.startswith(b'HTTP/1.0')
+    while (linea := await lector.readuntil(b'\r\n')) != b'\r\n':
+        nombre, _, valor = linea.decode('latin-1').partition(':')
+        nombre = nombre.strip().lower()
+        if nombre == 'content-length':
+            largo = int(valor)
+        elif nombre == 'transfer-encoding':
+            por_partes = 'chunked' in valor.lower()
+        elif nombre == 'connection':
+            cerrar = valor.strip().lower() == 'close'
+    if por_partes:
+        while (largo := int((await lector.readuntil(b'\r\n')).split(b';')[0], 16)):
+            await lector.readexactly(largo + 2)
+        await lector.readuntil(b'\r\n')
+    else:
+        await lector.readexactly(largo)
+    return estado, cerrar
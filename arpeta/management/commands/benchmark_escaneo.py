@@ -0,0 +1,70 @@
+import time
+from datetime import timedelta
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from arpeta.escaneo import clave_asignacion, obtener_fernet, registrar_escaneo, _descifrar_placa
+from arpeta.models import Operador, Vehiculo, Asignacion, Marca, Modelo
+
+
+# Error usado para deshacer los datos de prueba al terminar el benchmark
+class FinBenchmark(Exception):
+    pass
+
+
+# Comando para comparar los escaneos por segundo con la caché de escaneo activada y desactivada
+class Command(BaseCommand):
+    help = "Mide los escaneos por segundo de registrar_vuelta con y sin caché. Los datos de prueba se descartan al final."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escaneos', type=int, default=2000, help="Cantidad de escaneos por medición.")
+
+    def handle(self, *args, **options):
+        escaneos = options['escaneos']
+        try:
+            with transaction.atomic():
+                token = self.crear_datos()
+                for activada in (False, True):
+                    self.medir(token, escaneos, activada)
+                raise FinBenchmark
+        except FinBenchmark:
+            pass
+        finally:
+            # La asignación de prueba se descartó: no debe quedar en la caché compartida con los demás procesos
+            cache.delete(clave_asignacion('BENCH0', timezone.localdate()))
+            _descifrar_placa.cache_clear()
+
+    def crear_datos(self):
+        marca, _ = Marca.objects.get_or_create(nombre='Benchmark')
+        modelo, _ = Modelo.objects.get_or_create(nombre='Benchmark', marca=marca)
+        # Se asigna un nombre de QR para que el vehículo no genere la imagen en disco
+        vehiculo = Vehiculo(placa='BENCH0', modelo=modelo, alto=2, ancho=2, largo=3, codigo_qr='codigos_qr/benchmark.png')
+        vehiculo.save()
+        operador = Operador.objects.create(
+            cedula='00000000', nombre='Benchmark', apellido='Benchmark',
+            telefono='+584141234567', correo='benchmark@arpeta.com', direccion='N/A'
+        )
+        Asignacion.objects.create(operador=operador, vehiculo=vehiculo, fecha_asignacion=timezone.localdate())
+        return obtener_fernet().encrypt(b'BENCH0').decode('utf-8')
+
+    def medir(self, token, escaneos, activada):
+        _descifrar_placa.cache_clear()
+        cache.delete(clave_asignacion('BENCH0', timezone.localdate()))
+        # Espera negativa: el benchmark mide el costo del escaneo, no el tiempo mínimo entre vueltas
+        espera = -timedelta(days=1)
+        # DEBUG desactivado durante la medición para no registrar cada consulta en memoria
+        with override_settings(CACHE_ESCANEO=activada, DEBUG=False):
+            registrar_escaneo(token, espera=espera)
+            inicio = time.perf_counter()
+            for _ in range(escaneos):
+                registrar_escaneo(token, espera=espera)
+            duracion = time.perf_counter() - inicio
+            with CaptureQueriesContext(connection) as consultas:
+                registrar_escaneo(token, espera=espera)
+        selects = [q for q in consultas.captured_queries if q['sql'].lstrip().upper().startswith('SELECT')]
+        self.stdout.write(
+            f"Caché {'activada' if activada else 'desactivada'}: {escaneos / duracion:,.0f} escaneos/s, "
+            f"{len(consultas)} consultas por escaneo ({len(selects)} SELECT)"
+        )
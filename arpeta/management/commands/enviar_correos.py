@@ -0,0 +1,27 @@
+import time
+from django.core.management.base import BaseCommand
+from arpeta.correos import enviar_pendientes, purgar_enviados
+
+
+# Comando para vaciar la cola de correos (los reintentos pendientes incluidos)
+class Command(BaseCommand):
+    help = ("Envía los correos pendientes de la cola con una sola conexión SMTP. Con --continuo se queda revisando "
+            "la cola cada --intervalo segundos, así los reintentos salen aunque no se encolen correos nuevos.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--continuo', action='store_true', help="Revisa la cola en un ciclo sin fin.")
+        parser.add_argument('--intervalo', type=int, default=30, help="Segundos entre revisiones con --continuo.")
+        parser.add_argument('--purgar', type=int, metavar='DIAS', help="Borra los correos enviados hace más de DIAS días.")
+
+    def handle(self, *args, **options):
+        while True:
+            enviados, fallidos = enviar_pendientes()
+            if enviados or fallidos or not options['continuo']:
+                self.stdout.write(f"{enviados:,} correos enviados, {fallidos:,} fallidos.")
+            if options['purgar'] is not None:
+                borrados = purgar_enviados(options['purgar'])
+                if borrados:
+                    self.stdout.write(f"{borrados:,} correos enviados borrados.")
+            if not options['continuo']:
+                break
+            time.sleep(options['intervalo'])
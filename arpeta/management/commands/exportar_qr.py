@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from arpeta.busqueda import filtrar_vehiculos
+from arpeta.etiquetas import pdf_qr, zip_qr
+from arpeta.forms import FiltroBusquedaForm
+from arpeta.models import Vehiculo
+
+
+# Comando para exportar los códigos QR de los vehículos a un archivo ZIP o a una hoja de etiquetas en PDF
+class Command(BaseCommand):
+    help = ("Exporta los códigos QR de los vehículos (todos o los que cumplan los filtros) como un ZIP de PNG "
+            "o como una hoja de etiquetas en PDF lista para imprimir.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('salida', help="Archivo donde se guarda la exportación.")
+        parser.add_argument('--formato', choices=['zip', 'pdf'], default='zip', help="Formato de la exportación.")
+        parser.add_argument('--q', help="Texto a buscar en la placa, la marca o el modelo.")
+        parser.add_argument('--estado', choices=['activo', 'inactivo'], help="Estado de los vehículos.")
+        parser.add_argument('--placa', help="Prefijo de la placa.")
+
+    def handle(self, *args, **options):
+        filtros = FiltroBusquedaForm({campo: options[campo] or '' for campo in ('q', 'estado', 'placa')}).filtros()
+        vehiculos = filtrar_vehiculos(Vehiculo.objects.all(), filtros)
+        total = vehiculos.count()
+        if not total:
+            raise CommandError("No hay vehículos que coincidan con los filtros.")
+        partes = pdf_qr(vehiculos) if options['formato'] == 'pdf' else zip_qr(vehiculos)
+        with open(options['salida'], 'wb') as archivo:
+            for parte in partes:
+                archivo.write(parte)
+        self.stdout.write(self.style.SUCCESS(f"{total:,} códigos QR exportados en {options['salida']}."))
@@ -0,0 +1,76 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from arpeta.imagenes import derivados_foto
+from arpeta.models import Operador, Vehiculo
+from arpeta.trabajos import derivados_completos, guardar_derivados, marcar_derivados
+
+
+# Comando para generar los derivados (miniatura y tarjeta en WebP) de las fotos de operadores y vehículos ya guardadas
+class Command(BaseCommand):
+    help = ("Genera en paralelo los derivados WebP de las fotos de operadores y vehículos que todavía no los tienen "
+            "(o de todas con --todos). Las fotos se reducen en un pool de procesos.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todos', action='store_true', help="Vuelve a generar los derivados de todas las fotos.")
+        parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1, help="Procesos que reducen las fotos.")
+
+    def handle(self, *args, **options):
+        operadores = Operador.objects.exclude(foto_operador='').exclude(foto_operador=None)
+        vehiculos = Vehiculo.objects.exclude(foto_vehiculo='').exclude(foto_vehiculo=None)
+        if not options['todos']:
+            # Solo las fotos sin derivados anotados; las que ya los tienen en el almacenamiento solo se anotan
+            operadores = operadores.exclude(foto_derivada=F('foto_operador'))
+            vehiculos = vehiculos.exclude(foto_derivada=F('foto_vehiculo'))
+        nombres = [
+            *operadores.values_list('foto_operador', flat=True),
+            *vehiculos.values_list('foto_vehiculo', flat=True),
+        ]
+        if not options['todos']:
+            completos = [nombre for nombre in nombres if derivados_completos(nombre)]
+            for nombre in completos:
+                marcar_derivados(nombre)
+            nombres = [nombre for nombre in nombres if nombre not in set(completos)]
+        if not nombres:
+            self.stdout.write("No hay fotos sin derivados.")
+            return
+
+        total = len(nombres)
+        # Se envían pocas fotos a la vez para no tener en memoria todas las originales (pueden pesar varios MB)
+        ventana = options['procesos'] * 4
+        hechos = errores = 0
+        inicio = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=options['procesos'], mp_context=multiprocessing.get_context('spawn')) as ejecutor:
+            for desde in range(0, total, ventana):
+                pendientes = []
+                for nombre in nombres[desde:desde + ventana]:
+                    if not default_storage.exists(nombre):
+                        self.stderr.write(f"No se encontró la foto {nombre}")
+                        errores += 1
+                        continue
+                    with default_storage.open(nombre, 'rb') as archivo:
+                        pendientes.append((nombre, ejecutor.submit(derivados_foto, archivo.read())))
+                for nombre, futuro in pendientes:
+                    try:
+                        guardar_derivados(nombre, futuro.result())
+                    except Exception as error:
+                        self.stderr.write(f"Error al procesar la foto {nombre}: {error}")
+                        errores += 1
+                    else:
+                        hechos += 1
+                self.progreso(hechos + errores, total, time.perf_counter() - inicio)
+        mensaje = f"Derivados de {hechos:,} fotos generados en {time.perf_counter() - inicio:,.1f} s."
+        if errores:
+            mensaje += f" {errores:,} fotos con errores."
+        self.stdout.write(self.style.SUCCESS(mensaje))
+
+    def progreso(self, hechos, total, duracion):
+        velocidad = hechos / duracion if duracion else 0
+        restante = (total - hechos) / velocidad if velocidad else 0
+        self.stdout.write(
+            f"{hechos:,}/{total:,} ({hechos / total:.0%}) - {velocidad:,.1f} fotos/s - faltan unos {restante:,.0f} s"
+        )
@@ -0,0 +1,114 @@
+import os
+import posixpath
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from arpeta.imagenes import CARPETA_DERIVADOS, TAMANOS_FOTO
+from arpeta.models import Operador, Vehiculo
+
+
+# Carpetas de MEDIA_ROOT que se revisan y el modelo y campo que referencian sus archivos
+CARPETAS_MEDIA = {
+    'operadores': (Operador, 'foto_operador'),
+    'vehiculos': (Vehiculo, 'foto_vehiculo'),
+    'codigos_qr': (Vehiculo, 'codigo_qr'),
+}
+
+
+# Comando para encontrar y borrar los archivos de MEDIA_ROOT que ya no referencia ninguna fila
+class Command(BaseCommand):
+    help = ("Recorre las carpetas de fotos y códigos QR de MEDIA_ROOT, compara sus archivos con la base de datos por "
+            "lotes y muestra los huérfanos (con --borrar los elimina). Los derivados de fotos que ya no existen también "
+            "se cuentan como huérfanos. Los archivos modificados hace menos de --antiguedad minutos se ignoran, porque "
+            "pueden pertenecer a una transacción que todavía no se confirmó.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--borrar', action='store_true', help="Borra los archivos huérfanos (sin esto solo los lista).")
+        parser.add_argument('--lote', type=int, default=1000, help="Archivos comparados por consulta.")
+        parser.add_argument('--antiguedad', type=int, default=60, help="Minutos mínimos desde la última modificación.")
+
+    def handle(self, *args, **options):
+        limite = time.time() - options['antiguedad'] * 60
+        total_archivos = total_bytes = 0
+        for carpeta, (modelo, campo) in CARPETAS_MEDIA.items():
+            archivos, conservados = self.huerfanos(carpeta, modelo, campo, limite, options['lote'])
+            if carpeta != 'codigos_qr':
+                archivos += self.derivados_huerfanos(carpeta, conservados, limite)
+            cantidad, tamano = self.reclamar(archivos, options['borrar'])
+            total_archivos += cantidad
+            total_bytes += tamano
+            self.stdout.write(f"{carpeta}: {cantidad:,} archivos huérfanos ({tamano / 1024 / 1024:,.1f} MB)")
+        accion = "borrados" if options['borrar'] else "por borrar (use --borrar)"
+        self.stdout.write(self.style.SUCCESS(
+            f"{total_archivos:,} archivos huérfanos {accion}, {total_bytes / 1024 / 1024:,.1f} MB."
+        ))
+
+    # Devuelve los archivos de la carpeta sin fila que los referencie ([(ruta, bytes)]) y el conjunto de nombres
+    # (sin extensión) de los que sí existen, para revisar después sus derivados
+    def huerfanos(self, carpeta, modelo, campo, limite, tamano_lote):
+        huerfanos = []
+        conservados = set()
+        lote = {}
+
+        def revisar():
+            referenciados = set(modelo.objects.filter(**{f'{campo}__in': list(lote)}).values_list(campo, flat=True))
+            for nombre, (ruta, tamano) in lote.items():
+                if nombre in referenciados:
+                    conservados.add(posixpath.splitext(nombre)[0])
+                else:
+                    huerfanos.append((ruta, tamano))
+            lote.clear()
+
+        for entrada in self.recorrer(os.path.join(settings.MEDIA_ROOT, carpeta)):
+            nombre = os.path.relpath(entrada.path, settings.MEDIA_ROOT).replace(os.sep, '/')
+            informacion = entrada.stat()
+            if informacion.st_mtime > limite:
+                conservados.add(posixpath.splitext(nombre)[0])
+                continue
+            lote[nombre] = (entrada.path, informacion.st_size)
+            if len(lote) >= tamano_lote:
+                revisar()
+        if lote:
+            revisar()
+        return huerfanos, conservados
+
+    # Devuelve los derivados de la carpeta cuya foto original ya no está en `conservados`
+    def derivados_huerfanos(self, carpeta, conservados, limite):
+        sufijos = tuple(f"_{tamano}.webp" for tamano in TAMANOS_FOTO)
+        base = os.path.join(settings.MEDIA_ROOT, CARPETA_DERIVADOS)
+        huerfanos = []
+        for entrada in self.recorrer(os.path.join(base, carpeta)):
+            nombre = os.path.relpath(entrada.path, base).replace(os.sep, '/')
+            informacion = entrada.stat()
+            original = next((nombre[:-len(sufijo)] for sufijo in sufijos if nombre.endswith(sufijo)), None)
+            if informacion.st_mtime <= limite and original not in conservados:
+                huerfanos.append((entrada.path, informacion.st_size))
+        return huerfanos
+
+    # Recorre con os.scandir los archivos de una carpeta y sus subcarpetas (sin cargar la lista completa en memoria)
+    def recorrer(self, carpeta):
+        try:
+            entradas = os.scandir(carpeta)
+        except FileNotFoundError:
+            return
+        with entradas:
+            for entrada in entradas:
+                if entrada.is_dir(follow_symlinks=False):
+                    yield from self.recorrer(entrada.path)
+                elif entrada.is_file(follow_symlinks=False):
+                    yield entrada
+
+    # Borra (o solo cuenta) los archivos y devuelve (cantidad, bytes)
+    def reclamar(self, archivos, borrar):
+        cantidad = tamano = 0
+        for ruta, bytes_archivo in archivos:
+            if borrar:
+                try:
+                    os.remove(ruta)
+                except FileNotFoundError:
+                    continue
+            else:
+                self.stdout.write(f"  {ruta}")
+            cantidad += 1
+            tamano += bytes_archivo
+        return cantidad, tamano
@@ -0,0 +1,60 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from django.core.management.base import BaseCommand, CommandError
+from arpeta.models import Vehiculo
+from arpeta.qr import imagen_qr
+from arpeta.trabajos import clave_fernet, guardar_qr
+
+
+# Comando para volver a generar los códigos QR de los vehículos (por ejemplo, después de cambiar FERNET_KEY)
+class Command(BaseCommand):
+    help = ("Vuelve a generar los códigos QR de los vehículos indicados, o de todos con --todos, con la clave "
+            "FERNET_KEY actual. Los QR se dibujan en paralelo en un pool de procesos.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('placas', nargs='*', help="Placas de los vehículos a regenerar.")
+        parser.add_argument('--todos', action='store_true', help="Regenera los QR de todos los vehículos.")
+        parser.add_argument('--faltantes', action='store_true', help="Solo los vehículos que todavía no tienen QR.")
+        parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1, help="Procesos que dibujan los QR.")
+        parser.add_argument('--lote', type=int, default=500, help="Vehículos actualizados por cada UPDATE en bloque.")
+
+    def handle(self, *args, **options):
+        if not options['placas'] and not options['todos'] and not options['faltantes']:
+            raise CommandError("Indique las placas a regenerar, --todos o --faltantes.")
+        vehiculos = Vehiculo.objects.order_by('placa')
+        if options['placas']:
+            vehiculos = vehiculos.filter(placa__in=options['placas'])
+        if options['faltantes']:
+            vehiculos = vehiculos.filter(codigo_qr='')
+        anteriores = dict(vehiculos.values_list('placa', 'codigo_qr'))
+        faltan = set(options['placas']) - set(anteriores)
+        if faltan:
+            self.stderr.write(f"Placas no encontradas: {', '.join(sorted(faltan))}")
+        if not anteriores:
+            self.stdout.write("No hay vehículos para regenerar.")
+            return
+
+        total = len(anteriores)
+        clave = clave_fernet()
+        lote = []
+        inicio = time.perf_counter()
+        # Los procesos solo dibujan el PNG; el archivo y la base de datos se escriben en este proceso
+        with ProcessPoolExecutor(max_workers=options['procesos'], mp_context=multiprocessing.get_context('spawn')) as ejecutor:
+            imagenes = ejecutor.map(imagen_qr, anteriores, repeat(clave), chunksize=32)
+            for hechos, (placa, contenido) in enumerate(zip(anteriores, imagenes), start=1):
+                lote.append(Vehiculo(placa=placa, codigo_qr=guardar_qr(placa, contenido, anteriores[placa])))
+                if len(lote) >= options['lote'] or hechos == total:
+                    Vehiculo.objects.bulk_update(lote, ['codigo_qr'])
+                    lote = []
+                    self.progreso(hechos, total, time.perf_counter() - inicio)
+        self.stdout.write(self.style.SUCCESS(f"{total:,} códigos QR regenerados en {time.perf_counter() - inicio:,.1f} s."))
+
+    def progreso(self, hechos, total, duracion):
+        velocidad = hechos / duracion if duracion else 0
+        restante = (total - hechos) / velocidad if velocidad else 0
+        self.stdout.write(
+            f"{hechos:,}/{total:,} ({hechos / total:.0%}) - {velocidad:,.0f} QR/s - faltan unos {restante:,.0f} s"
+        )
@@ -0,0 +1,99 @@
+# Generated by Django 5.1.7 on 2026-10-18 00:35
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# Carga inicial de los resúmenes a partir de la última vuelta registrada de cada asignación,
+# ya que las vueltas anteriores a esta migración no tienen registro individual.
+def cargar_resumenes(apps, schema_editor):
+    Asignacion = apps.get_model('arpeta', 'Asignacion')
+    modelos = {
+        'hora': apps.get_model('arpeta', 'ResumenVueltasHora'),
+        'dia': apps.get_model('arpeta', 'ResumenVueltasDia'),
+        'mes': apps.get_model('arpeta', 'ResumenVueltasMes'),
+    }
+    totales = {'hora': {}, 'dia': {}, 'mes': {}}
+    asignaciones = Asignacion.objects.filter(ultima_vuelta_registrada_en__isnull=False, total_vueltas__gt=0)
+    for momento, vueltas in asignaciones.values_list('ultima_vuelta_registrada_en', 'total_vueltas').iterator():
+        local = timezone.localtime(momento)
+        claves = {
+            'hora': (local.date(), local.hour),
+            'dia': local.date(),
+            'mes': local.date().replace(day=1),
+        }
+        for nivel, clave in claves.items():
+            totales[nivel][clave] = totales[nivel].get(clave, 0) + vueltas
+    modelos['hora'].objects.bulk_create(
+        modelos['hora'](fecha=fecha, hora=hora, total=total) for (fecha, hora), total in totales['hora'].items()
+    )
+    modelos['dia'].objects.bulk_create(
+        modelos['dia'](fecha=fecha, total=total) for fecha, total in totales['dia'].items()
+    )
+    modelos['mes'].objects.bulk_create(
+        modelos['mes'](mes=mes, total=total) for mes, total in totales['mes'].items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('arpeta', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenVueltasDia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Total de Vueltas')),
+                ('fecha', models.DateField(unique=True, verbose_name='Fecha')),
+            ],
+            options={
+                'verbose_name': 'Resumen de Vueltas por Día',
+                'verbose_name_plural': 'Resúmenes de Vueltas por Día',
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenVueltasMes',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Total de Vueltas')),
+                ('mes', models.DateField(unique=True, verbose_name='Mes')),
+            ],
+            options={
+                'verbose_name': 'Resumen de Vueltas por Mes',
+                'verbose_name_plural': 'Resúmenes de Vueltas por Mes',
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenVueltasHora',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Total de Vueltas')),
+                ('fecha', models.DateField(verbose_name='Fecha')),
+                ('hora', models.PositiveSmallIntegerField(validators=[django.core.validators.MaxValueValidator(23)], verbose_name='Hora')),
+            ],
+            options={
+                'verbose_name': 'Resumen de Vueltas por Hora',
+                'verbose_name_plural': 'Resúmenes de Vueltas por Hora',
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'hora'), name='unique_resumen_vueltas_fecha_hora')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Vuelta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('registrada_en', models.DateTimeField(verbose_name='Registrada en')),
+                ('asignacion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vueltas', to='arpeta.asignacion', verbose_name='Asignación')),
+            ],
+            options={
+                'verbose_name': 'Vuelta',
+                'verbose_name_plural': 'Vueltas',
+                'indexes': [models.Index(fields=['registrada_en'], name='vuelta_registrada_en_idx')],
+            },
+        ),
+        migrations.RunPython(cargar_resumenes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.7 on 2026-10-18 00:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('arpeta', '0002_vuelta_resumenes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='operador',
+            index=models.Index(fields=['nombre', 'cedula'], name='operador_nombre_cedula_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehiculo',
+            index=models.Index(fields=['modelo', 'placa'], name='vehiculo_modelo_placa_idx'),
+        ),
+    ]
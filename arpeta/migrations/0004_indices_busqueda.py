@@ -0,0 +1,46 @@
+# Generated by Django 5.1.7 on 2026-10-18 00:46
+
+from django.db import migrations, models
+
+
+# Índices de texto que solo existen en PostgreSQL: trigram (pg_trgm) sobre UPPER(nombre) y UPPER(apellido)
+# para las búsquedas icontains de operadores. Las búsquedas por prefijo de placa y cédula ya usan los
+# índices varchar_pattern_ops que Django crea para esas claves primarias.
+INDICES_POSTGRESQL = [
+    ('operador_nombre_trgm_idx', 'arpeta_operador', 'UPPER("nombre") gin_trgm_ops'),
+    ('operador_apellido_trgm_idx', 'arpeta_operador', 'UPPER("apellido") gin_trgm_ops'),
+]
+
+
+def crear_indices_postgresql(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for nombre, tabla, expresion in INDICES_POSTGRESQL:
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS "{nombre}" ON "{tabla}" USING gin ({expresion})')
+
+
+def eliminar_indices_postgresql(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for nombre, _, _ in INDICES_POSTGRESQL:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{nombre}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('arpeta', '0003_indices_paginacion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='asignacion',
+            index=models.Index(fields=['estado', 'fecha_asignacion'], name='asignacion_estado_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asignacion',
+            index=models.Index(fields=['vehiculo', 'fecha_asignacion'], name='asignacion_vehiculo_fecha_idx'),
+        ),
+        migrations.RunPython(crear_indices_postgresql, eliminar_indices_postgresql),
+    ]
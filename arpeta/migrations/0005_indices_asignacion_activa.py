@@ -0,0 +1,21 @@
+# Generated by Django 5.1.7 on 2026-10-18 00:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('arpeta', '0004_indices_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='asignacion',
+            index=models.Index(condition=models.Q(('estado', True)), fields=['operador', 'fecha_asignacion'], name='asignacion_activa_operador_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asignacion',
+            index=models.Index(condition=models.Q(('estado', True)), fields=['vehiculo', 'fecha_asignacion'], name='asignacion_activa_vehiculo_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.7 on 2026-10-18 00:56
+
+import django.core.validators
+import django.db.models.deletion
+from datetime import date
+from django.db import migrations, models
+
+
+# Carga las tasas que estaban fijas en el código (arena y gravilla 12, granzón 4, el resto 2)
+# como tarifas vigentes desde siempre para los tipos de material existentes.
+def cargar_tarifas(apps, schema_editor):
+    TipoMaterial = apps.get_model('arpeta', 'TipoMaterial')
+    TarifaMaterial = apps.get_model('arpeta', 'TarifaMaterial')
+    tasas = {'arena': 12, 'gravilla': 12, 'granzon': 4}
+    TarifaMaterial.objects.bulk_create(
+        TarifaMaterial(tipo_material=tipo, tasa=tasas.get(tipo.nombre.lower(), 2), vigente_desde=date(2000, 1, 1))
+        for tipo in TipoMaterial.objects.all()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('arpeta', '0005_indices_asignacion_activa'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TarifaMaterial',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tasa', models.DecimalField(decimal_places=2, max_digits=8, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Tasa (por m³)')),
+                ('vigente_desde', models.DateField(verbose_name='Vigente desde')),
+                ('tipo_material', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tarifas', to='arpeta.tipomaterial', verbose_name='Tipo de Material')),
+            ],
+            options={
+                'verbose_name': 'Tarifa de Material',
+                'verbose_name_plural': 'Tarifas de Material',
+                'constraints': [models.UniqueConstraint(fields=('tipo_material', 'vigente_desde'), name='unique_tarifa_material_fecha')],
+            },
+        ),
+        migrations.RunPython(cargar_tarifas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.7 on 2026-10-18 01:22
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('arpeta', '0006_tarifas_material'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Correo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asunto', models.CharField(max_length=255, verbose_name='Asunto')),
+                ('cuerpo', models.TextField(verbose_name='Cuerpo')),
+                ('cuerpo_html', models.TextField(blank=True, verbose_name='Cuerpo HTML')),
+                ('remitente', models.CharField(blank=True, max_length=254, verbose_name='Remitente')),
+                ('destinatarios', models.JSONField(verbose_name='Destinatarios')),
+                ('adjuntos', models.JSONField(blank=True, default=list, verbose_name='Adjuntos')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('enviado', 'Enviado'), ('error', 'Error')], default='pendiente', max_length=10, verbose_name='Estado')),
+                ('intentos', models.PositiveSmallIntegerField(default=0, verbose_name='Intentos')),
+                ('proximo_intento', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Próximo Intento')),
+                ('ultimo_error', models.TextField(blank=True, verbose_name='Último Error')),
+                ('creado_en', models.DateTimeField(auto_now_add=True, verbose_name='Creado en')),
+                ('enviado_en', models.DateTimeField(blank=True, null=True, verbose_name='Enviado en')),
+            ],
+            options={
+                'verbose_name': 'Correo',
+                'verbose_name_plural': 'Correos',
+                'indexes': [models.Index(condition=models.Q(('estado', 'pendiente')), fields=['proximo_intento'], name='correo_pendiente_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:10
+
+from django.db import migrations
+
+
+# Índice trigram (pg_trgm, solo PostgreSQL) sobre UPPER(placa) para que la búsqueda general de asignaciones
+# encuentre la placa por cualquier parte (icontains) sin recorrer toda la tabla de vehículos.
+INDICES_POSTGRESQL = [
+    ('vehiculo_placa_trgm_idx', 'arpeta_vehiculo', 'UPPER("placa") gin_trgm_ops'),
+]
+
+
+def crear_indices_postgresql(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for nombre, tabla, expresion in INDICES_POSTGRESQL:
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS "{nombre}" ON "{tabla}" USING gin ({expresion})')
+
+
+def eliminar_indices_postgresql(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for nombre, _, _ in INDICES_POSTGRESQL:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{nombre}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('arpeta', '0007_correo'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices_postgresql, eliminar_indices_postgresql),
+    ]
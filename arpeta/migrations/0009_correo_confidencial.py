@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 01:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('arpeta', '0008_indice_placa_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='correo',
+            name='confidencial',
+            field=models.BooleanField(default=False, verbose_name='Confidencial'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.7 on 2026-10-18 01:55
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('arpeta', '0009_correo_confidencial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='asignacion',
+            name='asignacion_activa_vehiculo_idx',
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-18 01:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('arpeta', '0010_quitar_indice_activa_vehiculo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='operador',
+            name='foto_derivada',
+            field=models.CharField(blank=True, editable=False, max_length=100, verbose_name='Foto con Derivados'),
+        ),
+        migrations.AddField(
+            model_name='vehiculo',
+            name='foto_derivada',
+            field=models.CharField(blank=True, editable=False, max_length=100, verbose_name='Foto con Derivados'),
+        ),
+    ]
@@ -1,13 +1,10 @@
-from django.conf import settings
-from django.core.exceptions import ImproperlyConfigured
-from django.core.files.base import ContentFile
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
-from io import BytesIO
-import os
-from cryptography.fernet import Fernet
-import qrcode
+from django.db import IntegrityError, connections, models, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from collections import Counter
 from phonenumber_field.modelfields import PhoneNumberField
+from .trabajos import encolar_derivados, encolar_qr, url_derivado
 
 
 # Modelo que representa a un Operador
@@ -20,6 +17,8 @@ class Operador(models.Model):
     direccion = models.TextField(verbose_name='Dirección')
     independiente = models.BooleanField(default=True, verbose_name='Independiente')
     foto_operador = models.ImageField(upload_to='operadores/', blank=True, null=True, verbose_name='Foto del Operador')
+    # Foto cuyos derivados ya se generaron; si no coincide con la foto actual, se muestra la original
+    foto_derivada = models.CharField(max_length=100, blank=True, editable=False, verbose_name='Foto con Derivados')
     activo = models.BooleanField(default=True, verbose_name='Activo')
 
     # Propiedad que devuelve "Si" o "No" para el campo independiente
@@ -32,11 +31,21 @@ class Operador(models.Model):
     def activo_texto(self):
         return "Activo" if self.activo else "Inactivo"
 
-    # Método para eliminar un operador y su foto asociada
-    def delete(self, *args, **kwargs):
-        if self.foto_operador and os.path.isfile(self.foto_operador.path):
-            os.remove(self.foto_operador.path)
-        super().delete(*args, **kwargs)
+    # Propiedad con la URL de la miniatura de la foto (listados)
+    @property
+    def foto_miniatura(self):
+        return url_derivado(self.foto_operador, 'miniatura', self.foto_derivada)
+
+    # Propiedad con la URL de la foto en tamaño tarjeta (detalles y vista previa)
+    @property
+    def foto_tarjeta(self):
+        return url_derivado(self.foto_operador, 'tarjeta', self.foto_derivada)
+
+    # Método para guardar el operador. Los derivados de la foto se generan en segundo plano al confirmar la transacción
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        if self.foto_operador:
+            encolar_derivados(self.foto_operador.name)
 
     # Representación en cadena del modelo Operador
     def __str__(self):
@@ -44,6 +53,9 @@ class Operador(models.Model):
 
     # Meta clase para definir opciones adicionales del modelo
     class Meta:
+        indexes = [
+            models.Index(fields=['nombre', 'cedula'], name='operador_nombre_cedula_idx'),
+        ]
         verbose_name = 'Operador'
         verbose_name_plural = 'Operadores'
 
@@ -98,6 +110,8 @@ class Vehiculo(models.Model):
         validators=[MinValueValidator(1.00), MaxValueValidator(12.20)],
         verbose_name="Largo (metros)")
     foto_vehiculo = models.ImageField(upload_to="vehiculos/", blank=True, null=True, verbose_name="Foto del Vehículo")
+    # Foto cuyos derivados ya se generaron; si no coincide con la foto actual, se muestra la original
+    foto_derivada = models.CharField(max_length=100, blank=True, editable=False, verbose_name="Foto con Derivados")
     codigo_qr = models.ImageField(upload_to="codigos_qr/", verbose_name="Código QR")
     activo = models.BooleanField(default=True, verbose_name="Activo")
 
@@ -108,35 +122,25 @@ class Vehiculo(models.Model):
             return float(self.alto) * float(self.ancho) * float(self.largo)
         return 0.00
 
-    # Método para guardar el vehículo, generando un código QR encriptado si no existe
+    # Propiedad con la URL de la miniatura de la foto (listados)
+    @property
+    def foto_miniatura(self):
+        return url_derivado(self.foto_vehiculo, 'miniatura', self.foto_derivada)
+
+    # Propiedad con la URL de la foto en tamaño tarjeta (vista previa)
+    @property
+    def foto_tarjeta(self):
+        return url_derivado(self.foto_vehiculo, 'tarjeta', self.foto_derivada)
+
+    # Método para guardar el vehículo. Si no tiene código QR, su generación se encola para cuando se confirme
+    # la transacción: la petición no encripta ni dibuja el QR y el vehículo se guarda una sola vez.
+    # Lo mismo con los derivados de la foto.
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs) # REVISAR: Creo que tengo que eliminar esta línea
+        super().save(*args, **kwargs)
         if not self.codigo_qr and self.placa:
-            try:
-                key = settings.FERNET_KEY
-            except AttributeError:
-                raise ImproperlyConfigured(
-                    "La clave FERNET_KEY no está configurada en settings.py. "
-                    "No se puede generar el código QR encriptado."
-                )
-            f = Fernet(key)
-            placa_original_bytes = self.placa.encode('utf-8')
-            placa_encriptada_bytes = f.encrypt(placa_original_bytes)
-            contenido_qr_encriptado_str = placa_encriptada_bytes.decode('utf-8')
-            imagen_qr_obj = qrcode.make(contenido_qr_encriptado_str)
-            buffer = BytesIO()
-            imagen_qr_obj.save(buffer, format="PNG")
-            nombre_archivo = f"qr_vehiculo_{self.placa}.png"
-            self.codigo_qr.save(nombre_archivo, ContentFile(buffer.getvalue()), save=False)
-            super().save(*args, **kwargs)
-
-    # Método para eliminar un vehículo y sus archivos asociados (foto y código QR)
-    def delete(self, *args, **kwargs):
-        if self.foto_vehiculo and os.path.isfile(self.foto_vehiculo.path):
-            os.remove(self.foto_vehiculo.path)
-        if self.codigo_qr and os.path.isfile(self.codigo_qr.path):
-            os.remove(self.codigo_qr.path)
-        super().delete(*args, **kwargs)
+            encolar_qr(self.placa)
+        if self.foto_vehiculo:
+            encolar_derivados(self.foto_vehiculo.name)
 
     # Representación en cadena del modelo Vehiculo
     def __str__(self):
@@ -144,6 +148,9 @@ class Vehiculo(models.Model):
 
     # Meta clase para definir opciones adicionales del modelo
     class Meta:
+        indexes = [
+            models.Index(fields=['modelo', 'placa'], name='vehiculo_modelo_placa_idx'),
+        ]
         verbose_name = 'Vehículo'
         verbose_name_plural = 'Vehículos'
 
@@ -162,6 +169,56 @@ class TipoMaterial(models.Model):
         verbose_name_plural = 'Tipos de Material'
 
 
+# Modelo que representa la tasa de pago (en divisas por m³) de un tipo de material a partir de una fecha
+class TarifaMaterial(models.Model):
+    tipo_material = models.ForeignKey(TipoMaterial, on_delete=models.CASCADE, related_name='tarifas', verbose_name='Tipo de Material')
+    tasa = models.DecimalField(max_digits=8, decimal_places=2, validators=[MinValueValidator(0)], verbose_name='Tasa (por m³)')
+    vigente_desde = models.DateField(verbose_name='Vigente desde')
+
+    # Representación en cadena del modelo TarifaMaterial
+    def __str__(self):
+        return f"{self.tipo_material.nombre}: {self.tasa} por m³ desde {self.vigente_desde.strftime('%d-%m-%Y')}"
+
+    # Meta clase para definir opciones adicionales del modelo
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tipo_material', 'vigente_desde'], name='unique_tarifa_material_fecha')
+        ]
+        verbose_name = 'Tarifa de Material'
+        verbose_name_plural = 'Tarifas de Material'
+
+
+# Manager de Asignacion con operaciones atómicas sobre el contador de vueltas
+class AsignacionManager(models.Manager):
+    # Método para sumar una vuelta con un único UPDATE condicional (sin leer y reescribir la fila).
+    # Solo actualiza si la asignación sigue siendo del vehículo y la fecha escaneados (el id puede venir de una
+    # caché vieja si la asignación se editó), está activa y pasó el tiempo de espera desde la última vuelta;
+    # devuelve el nuevo total de vueltas, o None si no se actualizó ninguna fila. El UPDATE ... RETURNING se escribe
+    # como SQL parametrizado (PostgreSQL y SQLite lo admiten) porque el ORM no devuelve valores desde update().
+    def registrar_vuelta(self, asignacion_id, placa, fecha, ahora, espera):
+        opciones = self.model._meta
+        conexion = connections[self.db]
+        tabla = conexion.ops.quote_name(opciones.db_table)
+        total, ultima, vehiculo, fecha_asignacion, estado = (
+            conexion.ops.quote_name(opciones.get_field(nombre).column)
+            for nombre in ('total_vueltas', 'ultima_vuelta_registrada_en', 'vehiculo', 'fecha_asignacion', 'estado')
+        )
+        sql = (
+            f"UPDATE {tabla} SET {total} = {total} + 1, {ultima} = %s "
+            f"WHERE {conexion.ops.quote_name(opciones.pk.column)} = %s AND {vehiculo} = %s "
+            f"AND {fecha_asignacion} = %s AND {estado} AND ({ultima} IS NULL OR {ultima} <= %s) "
+            f"RETURNING {total}"
+        )
+        params = [
+            conexion.ops.adapt_datetimefield_value(ahora), asignacion_id, placa,
+            conexion.ops.adapt_datefield_value(fecha), conexion.ops.adapt_datetimefield_value(ahora - espera),
+        ]
+        with conexion.cursor() as cursor:
+            cursor.execute(sql, params)
+            fila = cursor.fetchone()
+        return fila[0] if fila else None
+
+
 # Modelo que representa una Asignación de un vehículo a un operador
 class Asignacion(models.Model):
     operador = models.ForeignKey(Operador, on_delete=models.CASCADE, verbose_name='Operador')
@@ -172,11 +229,28 @@ class Asignacion(models.Model):
     estado = models.BooleanField(default=True, verbose_name='Estado')
     ultima_vuelta_registrada_en = models.DateTimeField(null=True, blank=True, verbose_name='Última Vuelta Registrada en')
 
+    objects = AsignacionManager()
+
+    # Método que recuerda el vehículo y la fecha con los que se leyó la asignación, para que al editarla
+    # también se invalide la asignación activa en caché del vehículo anterior
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        instancia.clave_original = (instancia.__dict__.get('vehiculo_id'), instancia.__dict__.get('fecha_asignacion'))
+        return instancia
+
     # Meta clase para definir opciones adicionales del modelo
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=['operador', 'vehiculo', 'fecha_asignacion'], name='unique_operador_vehiculo_fecha')
         ]
+        indexes = [
+            models.Index(fields=['estado', 'fecha_asignacion'], name='asignacion_estado_fecha_idx'),
+            # También lo usa el registro de vueltas para buscar la asignación activa del vehículo en el día
+            models.Index(fields=['vehiculo', 'fecha_asignacion'], name='asignacion_vehiculo_fecha_idx'),
+            # Índice parcial para buscar la asignación activa del día de un operador (crear_asignacion)
+            models.Index(fields=['operador', 'fecha_asignacion'], condition=Q(estado=True), name='asignacion_activa_operador_idx'),
+        ]
         verbose_name = 'Asignacion'
         verbose_name_plural = 'Asignaciones'
 
@@ -203,4 +277,152 @@ class Asignacion(models.Model):
 
     # Representación en cadena del modelo Asignacion
     def __str__(self):
-        return f"Cédula Operador: {self.operador.cedula} -Placa Vehículo: {self.vehiculo.placa} - Fecha Asignación: {self.fecha_formateada} - Tipo Material: {self.tipo_material.nombre if self.tipo_material else 'N/A'} - Total Vueltas: {self.total_vueltas} - Total Material: {self.total_material} m³ - Estado: {self.estado_texto}"
\ No newline at end of file
+        return f"Cédula Operador: {self.operador.cedula} -Placa Vehículo: {self.vehiculo.placa} - Fecha Asignación: {self.fecha_formateada} - Tipo Material: {self.tipo_material.nombre if self.tipo_material else 'N/A'} - Total Vueltas: {self.total_vueltas} - Total Material: {self.total_material} m³ - Estado: {self.estado_texto}"
+
+
+# Modelo que representa cada vuelta escaneada (registro de solo inserción)
+class Vuelta(models.Model):
+    asignacion = models.ForeignKey(Asignacion, on_delete=models.CASCADE, related_name='vueltas', verbose_name='Asignación')
+    registrada_en = models.DateTimeField(verbose_name='Registrada en')
+
+    # Método para registrar una vuelta; los resúmenes se actualizan al confirmar la transacción
+    @classmethod
+    def registrar(cls, asignacion_id, momento):
+        return cls.registrar_varias([cls(asignacion_id=asignacion_id, registrada_en=momento)])[0]
+
+    # Método para registrar varias vueltas con una sola inserción. Los resúmenes se suman una vez por clave
+    # después de confirmar la transacción del escaneo, en otra transacción corta: así las filas de resumen,
+    # que todos los escaneos actualizan, no quedan bloqueadas mientras dura la transacción del escaneo.
+    @classmethod
+    def registrar_varias(cls, vueltas):
+        vueltas = cls.objects.bulk_create(vueltas)
+        conteos = cls.contar_resumenes(vuelta.registrada_en for vuelta in vueltas)
+        transaction.on_commit(lambda: cls.sumar_resumenes(*conteos))
+        return vueltas
+
+    # Método que cuenta las vueltas de cada resumen (por hora, día y mes en hora local) a partir de sus momentos
+    @staticmethod
+    def contar_resumenes(momentos):
+        horas, dias, meses = Counter(), Counter(), Counter()
+        for momento in momentos:
+            local = timezone.localtime(momento)
+            horas[(local.date(), local.hour)] += 1
+            dias[local.date()] += 1
+            meses[local.date().replace(day=1)] += 1
+        return horas, dias, meses
+
+    # Método que suma a los resúmenes las cantidades de contar_resumenes (o las resta con signo=-1). Las filas
+    # se actualizan siempre en el mismo orden para que dos transacciones simultáneas no se bloqueen en cruz.
+    @staticmethod
+    def sumar_resumenes(horas, dias, meses, signo=1):
+        with transaction.atomic():
+            for (fecha, hora), cantidad in sorted(horas.items()):
+                ResumenVueltasHora.incrementar(signo * cantidad, fecha=fecha, hora=hora)
+            for fecha, cantidad in sorted(dias.items()):
+                ResumenVueltasDia.incrementar(signo * cantidad, fecha=fecha)
+            for mes, cantidad in sorted(meses.items()):
+                ResumenVueltasMes.incrementar(signo * cantidad, mes=mes)
+
+    # Representación en cadena del modelo Vuelta
+    def __str__(self):
+        return f"Asignación: {self.asignacion_id} - Registrada en: {timezone.localtime(self.registrada_en).strftime('%d-%m-%Y %H:%M')}"
+
+    # Meta clase para definir opciones adicionales del modelo
+    class Meta:
+        indexes = [
+            models.Index(fields=['registrada_en'], name='vuelta_registrada_en_idx'),
+        ]
+        verbose_name = 'Vuelta'
+        verbose_name_plural = 'Vueltas'
+
+
+# Modelo base para los resúmenes de vueltas que se actualizan en cada escaneo
+class ResumenVueltas(models.Model):
+    total = models.PositiveIntegerField(default=0, verbose_name='Total de Vueltas')
+
+    # Método para sumar vueltas al resumen identificado por la clave, creándolo si no existe
+    @classmethod
+    def incrementar(cls, cantidad=1, **clave):
+        if cls.objects.filter(**clave).update(total=F('total') + cantidad):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(total=cantidad, **clave)
+        except IntegrityError:
+            cls.objects.filter(**clave).update(total=F('total') + cantidad)
+
+    # Meta clase para definir opciones adicionales del modelo
+    class Meta:
+        abstract = True
+
+
+# Modelo que resume las vueltas registradas por fecha y hora (hora local)
+class ResumenVueltasHora(ResumenVueltas):
+    fecha = models.DateField(verbose_name='Fecha')
+    hora = models.PositiveSmallIntegerField(validators=[MaxValueValidator(23)], verbose_name='Hora')
+
+    # Meta clase para definir opciones adicionales del modelo
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['fecha', 'hora'], name='unique_resumen_vueltas_fecha_hora')
+        ]
+        verbose_name = 'Resumen de Vueltas por Hora'
+        verbose_name_plural = 'Resúmenes de Vueltas por Hora'
+
+
+# Modelo que resume las vueltas registradas por día (hora local)
+class ResumenVueltasDia(ResumenVueltas):
+    fecha = models.DateField(unique=True, verbose_name='Fecha')
+
+    # Meta clase para definir opciones adicionales del modelo
+    class Meta:
+        verbose_name = 'Resumen de Vueltas por Día'
+        verbose_name_plural = 'Resúmenes de Vueltas por Día'
+
+
+# Modelo que resume las vueltas registradas por mes (primer día del mes)
+class ResumenVueltasMes(ResumenVueltas):
+    mes = models.DateField(unique=True, verbose_name='Mes')
+
+    # Meta clase para definir opciones adicionales del modelo
+    class Meta:
+        verbose_name = 'Resumen de Vueltas por Mes'
+        verbose_name_plural = 'Resúmenes de Vueltas por Mes'
+
+
+# Modelo que representa un correo en la cola de salida. Lo envía en segundo plano arpeta.correos.enviar_pendientes,
+# que reintenta los fallidos con una espera creciente hasta MAX_INTENTOS_CORREO.
+class Correo(models.Model):
+    PENDIENTE = 'pendiente'
+    ENVIADO = 'enviado'
+    ERROR = 'error'
+    ESTADOS = [(PENDIENTE, 'Pendiente'), (ENVIADO, 'Enviado'), (ERROR, 'Error')]
+
+    asunto = models.CharField(max_length=255, verbose_name='Asunto')
+    cuerpo = models.TextField(verbose_name='Cuerpo')
+    cuerpo_html = models.TextField(blank=True, verbose_name='Cuerpo HTML')
+    remitente = models.CharField(max_length=254, blank=True, verbose_name='Remitente')
+    destinatarios = models.JSONField(verbose_name='Destinatarios')
+    # Rutas dentro del almacenamiento de archivos; se leen al momento de enviar
+    adjuntos = models.JSONField(default=list, blank=True, verbose_name='Adjuntos')
+    # Los correos confidenciales (restablecer contraseña, con un enlace de acceso) se borran apenas se envían
+    confidencial = models.BooleanField(default=False, verbose_name='Confidencial')
+    estado = models.CharField(max_length=10, choices=ESTADOS, default=PENDIENTE, verbose_name='Estado')
+    intentos = models.PositiveSmallIntegerField(default=0, verbose_name='Intentos')
+    proximo_intento = models.DateTimeField(default=timezone.now, verbose_name='Próximo Intento')
+    ultimo_error = models.TextField(blank=True, verbose_name='Último Error')
+    creado_en = models.DateTimeField(auto_now_add=True, verbose_name='Creado en')
+    enviado_en = models.DateTimeField(null=True, blank=True, verbose_name='Enviado en')
+
+    # Representación en cadena del modelo Correo
+    def __str__(self):
+        return f"{self.asunto} - Para: {', '.join(self.destinatarios)} - Estado: {self.get_estado_display()}"
+
+    # Meta clase para definir opciones adicionales del modelo
+    class Meta:
+        indexes = [
+            # Índice parcial para tomar los correos pendientes cuyo próximo intento ya llegó
+            models.Index(fields=['proximo_intento'], condition=Q(estado='pendiente'), name='correo_pendiente_idx'),
+        ]
+        verbose_name = 'Correo'
+        verbose_name_plural = 'Correos'
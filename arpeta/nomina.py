@@ -0,0 +1,167 @@
+import multiprocessing
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.template.loader import render_to_string
+from .flujos import MEMORIA_MAXIMA_PDF, leer_en_bloques
+from .models import Asignacion, TarifaMaterial
+from .pdf import html_a_pdf
+
+
+# Cantidad mínima de vueltas para que una asignación se pueda pagar
+VUELTAS_MINIMAS_PAGO = 16
+
+# Cantidad máxima de recibos que se unen en un solo PDF. pypdf tiene en memoria todos los recibos y sus páginas
+# hasta escribir el documento, así que los lotes más grandes se descargan como ZIP, que se envía por partes.
+MAX_RECIBOS_PDF_UNIDO = 200
+
+# Cantidad de procesos que convierten recibos a PDF en paralelo
+PROCESOS_RECIBOS = getattr(settings, 'PROCESOS_RECIBOS', None) or os.cpu_count() or 1
+
+
+# Tasa para los tipos de material que todavía no tienen tarifa cargada
+TASA_POR_DEFECTO = 2
+
+# Tasa para las asignaciones sin tipo de material (se pagan como arena)
+TASA_SIN_MATERIAL = 12
+
+# Clave de caché del mapa de tarifas; las señales la borran cuando cambia una tarifa
+CLAVE_TARIFAS = "nomina:tarifas"
+
+# Duración del mapa de tarifas en caché. Es corta para que un proceso que no comparte la caché (LocMem)
+# tampoco pague con una tarifa vieja por mucho tiempo; cargar el mapa es una sola consulta.
+DURACION_CACHE_TARIFAS = 60
+
+
+# Función para eliminar de la caché el mapa de tarifas al confirmar la transacción (antes, otra petición podría
+# volver a guardar las tarifas anteriores mientras el cambio sigue sin confirmar)
+def olvidar_tarifas():
+    transaction.on_commit(lambda: cache.delete(CLAVE_TARIFAS))
+
+
+# Función que devuelve {id del tipo de material: [(vigente desde, tasa), ...]} con las tarifas más recientes primero;
+# se carga con una sola consulta y queda en caché hasta que cambie alguna tarifa
+def obtener_tarifas():
+    tarifas = cache.get(CLAVE_TARIFAS)
+    if tarifas is None:
+        tarifas = {}
+        for tipo_material_id, vigente_desde, tasa in TarifaMaterial.objects.order_by('-vigente_desde').values_list(
+            'tipo_material_id', 'vigente_desde', 'tasa'
+        ):
+            tarifas.setdefault(tipo_material_id, []).append((vigente_desde, tasa))
+        cache.set(CLAVE_TARIFAS, tarifas, DURACION_CACHE_TARIFAS)
+    return tarifas
+
+
+# Función que devuelve la tasa vigente en la fecha para un tipo de material
+def tasa_vigente(tipo_material_id, fecha):
+    if tipo_material_id is None:
+        return TASA_SIN_MATERIAL
+    for vigente_desde, tasa in obtener_tarifas().get(tipo_material_id, ()):
+        if vigente_desde <= fecha:
+            return tasa
+    return TASA_POR_DEFECTO
+
+
+# Función que agrega a las asignaciones la capacidad del vehículo, la tasa vigente en su fecha y el pago en divisas,
+# calculados en la misma consulta, para poder listarlas, filtrarlas y ordenarlas por monto sin recorrerlas en Python
+def calcular_pagos(asignaciones):
+    tarifa = TarifaMaterial.objects.filter(
+        tipo_material=OuterRef('tipo_material'), vigente_desde__lte=OuterRef('fecha_asignacion')
+    ).order_by('-vigente_desde').values('tasa')[:1]
+    decimal = DecimalField(max_digits=14, decimal_places=4)
+    return asignaciones.annotate(
+        capacidad=ExpressionWrapper(F('vehiculo__alto') * F('vehiculo__ancho') * F('vehiculo__largo'), output_field=decimal),
+        tasa=Case(
+            When(tipo_material__isnull=True, then=Value(TASA_SIN_MATERIAL)),
+            default=Coalesce(Subquery(tarifa), Value(TASA_POR_DEFECTO)),
+            output_field=decimal,
+        ),
+        pago_divisas=ExpressionWrapper(F('capacidad') * F('tasa'), output_field=decimal),
+    )
+
+
+# Función que arma el contexto del recibo de pago de una asignación.
+# Usa los montos de calcular_pagos si la asignación los trae; si no, toma la tasa del mapa de tarifas.
+def contexto_recibo(asignacion, tipo_pago, fecha):
+    capacidad_camion = float(asignacion.vehiculo.capacidad_carga)
+    material = asignacion.tipo_material.nombre.lower() if asignacion.tipo_material else "arena"
+    tasa = getattr(asignacion, 'tasa', None)
+    if tasa is None:
+        tasa = tasa_vigente(asignacion.tipo_material_id, asignacion.fecha_asignacion)
+    tasa = float(tasa)
+    return {
+        'asignacion': asignacion,
+        'tipo_pago': tipo_pago,
+        'pago_arena': capacidad_camion,
+        'pago_divisas': capacidad_camion * tasa,
+        'material': material,
+        'tasa': tasa,
+        'fecha': fecha,
+        'capacidad_camion': capacidad_camion,
+    }
+
+
+# Función que devuelve las asignaciones activas con las vueltas mínimas en el rango de fechas,
+# con el operador, el vehículo y el material en la misma consulta
+def asignaciones_pagables(desde, hasta):
+    return (
+        Asignacion.objects.filter(
+            estado=True, total_vueltas__gte=VUELTAS_MINIMAS_PAGO, fecha_asignacion__range=(desde, hasta)
+        )
+        .select_related('operador', 'vehiculo', 'tipo_material')
+        .order_by('fecha_asignacion', 'operador_id', 'pk')
+    )
+
+
+# Función que arma los contextos de los recibos recorriendo la consulta una sola vez (por bloques),
+# con los montos calculados en la base de datos
+def contextos_recibos(asignaciones, tipo_pago, fecha):
+    for asignacion in calcular_pagos(asignaciones).iterator(chunk_size=500):
+        yield contexto_recibo(asignacion, tipo_pago, fecha)
+
+
+# Función que devuelve el nombre del archivo del recibo de una asignación
+def nombre_recibo(contexto):
+    asignacion = contexto['asignacion']
+    return f"recibo_pago_{asignacion.operador_id}_{asignacion.fecha_asignacion:%Y%m%d}_{asignacion.pk}.pdf"
+
+
+# Función que genera (nombre, bytes del PDF) de cada recibo en el mismo orden de los contextos.
+# El HTML se renderiza en este proceso y la conversión a PDF se reparte en un pool de procesos iniciados con
+# "spawn" (no heredan las conexiones a la base de datos); solo hay unos pocos recibos en vuelo a la vez,
+# así que la memoria no crece con el tamaño del lote.
+def recibos_en_pdf(contextos, procesos=PROCESOS_RECIBOS):
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context('spawn')) as ejecutor:
+        en_vuelo = deque()
+        for contexto in contextos:
+            html = render_to_string('nomina/recibo_pago.html', contexto)
+            en_vuelo.append((nombre_recibo(contexto), ejecutor.submit(html_a_pdf, html)))
+            if len(en_vuelo) >= procesos * 2:
+                nombre, futuro = en_vuelo.popleft()
+                yield nombre, futuro.result()
+        while en_vuelo:
+            nombre, futuro = en_vuelo.popleft()
+            yield nombre, futuro.result()
+
+
+# Función que une los recibos en un solo PDF de varias páginas con pypdf. pypdf guarda todos los recibos hasta
+# escribir el documento completo al final, por eso la vista no une más de MAX_RECIBOS_PDF_UNIDO. El resultado
+# se arma en un archivo temporal (en memoria hasta MEMORIA_MAXIMA_PDF y después en disco) y se envía por bloques.
+def pdf_unido(archivos):
+    from pypdf import PdfWriter
+
+    escritor = PdfWriter()
+    for _, contenido in archivos:
+        escritor.append(BytesIO(contenido))
+    archivo = tempfile.SpooledTemporaryFile(max_size=MEMORIA_MAXIMA_PDF)
+    escritor.write(archivo)
+    escritor.close()
+    yield from leer_en_bloques(archivo)
@@ -0,0 +1,125 @@
+import base64
+import json
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+
+
+# Tamaño de página por defecto y máximo permitido para los listados
+TAMANO_PAGINA = getattr(settings, 'TAMANO_PAGINA', 25)
+TAMANO_PAGINA_MAXIMO = 100
+
+
+# Función para convertir los valores de la última fila en un cursor para la URL
+def codificar_cursor(valores):
+    return base64.urlsafe_b64encode(json.dumps(valores).encode('utf-8')).decode('ascii')
+
+
+# Función para leer un cursor de la URL; devuelve None si es inválido
+def decodificar_cursor(cursor, campos):
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, UnicodeError):
+        return None
+    if not isinstance(valores, list) or len(valores) != len(campos):
+        return None
+    return valores
+
+
+# Función para leer el tamaño de página pedido en la URL, acotado al máximo permitido
+def tamano_pagina(request, por_defecto=TAMANO_PAGINA):
+    try:
+        tamano = int(request.GET.get('por_pagina', por_defecto))
+    except (TypeError, ValueError):
+        tamano = por_defecto
+    return min(max(tamano, 1), TAMANO_PAGINA_MAXIMO)
+
+
+# Página obtenida con un cursor; se puede recorrer en las plantillas igual que una página de Paginator
+class PaginaCursor:
+    def __init__(self, object_list, tamano, cursor_anterior, cursor_siguiente, total_estimado=None):
+        self.object_list = object_list
+        self.tamano = tamano
+        self.cursor_anterior = cursor_anterior
+        self.cursor_siguiente = cursor_siguiente
+        self.total_estimado = total_estimado
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_previous(self):
+        return self.cursor_anterior is not None
+
+    def has_next(self):
+        return self.cursor_siguiente is not None
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+
+# Paginador por cursor (keyset): busca a partir de los valores de la última fila vista en lugar de usar OFFSET,
+# por lo que cualquier página cuesta lo mismo que la primera. Los campos deben identificar cada fila de forma única.
+class PaginadorCursor:
+    def __init__(self, queryset, campos, tamano=TAMANO_PAGINA, estimar_total=False):
+        self.queryset = queryset
+        self.campos = campos
+        self.tamano = tamano
+        self.estimar_total = estimar_total
+
+    # Construye la condición "fila después (o antes) del cursor" para un orden de varias columnas
+    def condicion(self, valores, despues):
+        operador = 'gt' if despues else 'lt'
+        condicion = Q()
+        for i, campo in enumerate(self.campos):
+            iguales = {self.campos[j]: valores[j] for j in range(i)}
+            condicion |= Q(**iguales, **{f'{campo}__{operador}': valores[i]})
+        return condicion
+
+    def obtener_pagina(self, despues=None, antes=None):
+        queryset = self.queryset
+        cursor = despues or antes
+        valores = decodificar_cursor(cursor, self.campos) if cursor else None
+        hacia_atras = valores is not None and not despues
+        if valores is not None:
+            queryset = queryset.filter(self.condicion(valores, despues=not hacia_atras))
+        orden = [f'-{campo}' for campo in self.campos] if hacia_atras else list(self.campos)
+        filas = list(queryset.order_by(*orden)[:self.tamano + 1])
+        hay_mas = len(filas) > self.tamano
+        filas = filas[:self.tamano]
+        if hacia_atras:
+            filas.reverse()
+
+        cursor_anterior = cursor_siguiente = None
+        if filas:
+            if hacia_atras:
+                cursor_anterior = self.cursor_de(filas[0]) if hay_mas else None
+                cursor_siguiente = self.cursor_de(filas[-1])
+            else:
+                cursor_anterior = self.cursor_de(filas[0]) if valores is not None else None
+                cursor_siguiente = self.cursor_de(filas[-1]) if hay_mas else None
+        total = self.total_estimado() if self.estimar_total else None
+        return PaginaCursor(filas, self.tamano, cursor_anterior, cursor_siguiente, total)
+
+    def cursor_de(self, fila):
+        valores = []
+        for campo in self.campos:
+            valor = getattr(fila, self.queryset.model._meta.get_field(campo).attname)
+            valores.append(valor if isinstance(valor, (int, float, str)) or valor is None else str(valor))
+        return codificar_cursor(valores)
+
+    # Total aproximado de filas tomado de las estadísticas de PostgreSQL (sin recorrer la tabla).
+    # Solo se calcula para listados sin filtros; en otros motores devuelve None.
+    def total_estimado(self):
+        conexion = connections[self.queryset.db]
+        if conexion.vendor != 'postgresql' or self.queryset.query.where:
+            return None
+        with conexion.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+                [self.queryset.model._meta.db_table],
+            )
+            fila = cursor.fetchone()
+        return fila[0] if fila and fila[0] >= 0 else None
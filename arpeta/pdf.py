@@ -0,0 +1,14 @@
+from io import BytesIO
+
+
+# Función que convierte un documento HTML en los bytes de un PDF con xhtml2pdf.
+# No depende de Django, por lo que se puede ejecutar en un hilo o en otro proceso.
+# xhtml2pdf (con reportlab y html5lib) se importa en el primer uso para que los workers que no generan PDF no lo carguen.
+def html_a_pdf(html):
+    from xhtml2pdf import pisa
+
+    resultado = BytesIO()
+    pdf = pisa.CreatePDF(html, dest=resultado)
+    if pdf.err:
+        raise ValueError(f"xhtml2pdf devolvió {pdf.err} errores")
+    return resultado.getvalue()
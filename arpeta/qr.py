@@ -0,0 +1,18 @@
+from io import BytesIO
+from cryptography.fernet import Fernet
+
+
+# Píxeles por módulo (cuadro) del QR en los PNG generados; es el valor por defecto de qrcode
+TAMANO_MODULO_QR = 10
+
+
+# Función que genera el PNG del código QR de una placa, con la placa encriptada con la clave Fernet.
+# No depende de Django, por lo que se puede ejecutar en un hilo o en otro proceso.
+# qrcode (con Pillow) se importa en el primer uso para que los workers que no generan QR no lo carguen.
+def imagen_qr(placa, clave):
+    import qrcode
+
+    contenido = Fernet(clave).encrypt(placa.encode('utf-8')).decode('utf-8')
+    resultado = BytesIO()
+    qrcode.make(contenido, box_size=TAMANO_MODULO_QR).save(resultado, format="PNG")
+    return resultado.getvalue()
@@ -0,0 +1,109 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils.functional import SimpleLazyObject
+
+
+# Nombres de los grupos que definen los roles del sistema
+ADMINISTRACION = 'Administracion'
+GERENTE = 'Gerente'
+NOMINA = 'Nomina'
+
+# Duración de los roles guardados en caché; las señales los invalidan antes si cambian los grupos
+DURACION_CACHE_ROLES = 60 * 60
+
+
+# Función que indica si la caché por defecto la comparten todos los procesos (Redis, Memcached, base de datos...).
+# Con LocMem cada proceso tiene su copia y no se entera de las invalidaciones de los otros, así que los roles
+# (que deciden los permisos) no se guardan en ella.
+def cache_compartida():
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+# Función que arma la clave de caché de los roles de un usuario
+def clave_roles(usuario_id):
+    return f"roles:{usuario_id}"
+
+
+# Función para eliminar de la caché los roles de uno o varios usuarios. Se hace al confirmar la transacción:
+# si se borraran antes, otra petición podría volver a guardar los grupos viejos mientras la transacción sigue abierta.
+def olvidar_roles(*usuarios_ids):
+    claves = [clave_roles(usuario_id) for usuario_id in usuarios_ids]
+    transaction.on_commit(lambda: cache.delete_many(claves))
+
+
+# Función que devuelve los nombres de los grupos del usuario. Se consultan una vez por petición y, si la caché es
+# compartida, solo cuando no están en ella.
+def obtener_roles(user):
+    if not user.is_authenticated:
+        return frozenset()
+    roles = getattr(user, '_roles', None)
+    if roles is None:
+        compartida = cache_compartida()
+        roles = cache.get(clave_roles(user.pk)) if compartida else None
+        if roles is None:
+            roles = frozenset(user.groups.values_list('name', flat=True))
+            if compartida:
+                cache.set(clave_roles(user.pk), roles, DURACION_CACHE_ROLES)
+        user._roles = roles
+    return roles
+
+
+# Versión asíncrona de obtener_roles para las vistas async: usa la caché y el ORM asíncronos
+async def aobtener_roles(user):
+    if not user.is_authenticated:
+        return frozenset()
+    roles = getattr(user, '_roles', None)
+    if roles is None:
+        compartida = cache_compartida()
+        roles = await cache.aget(clave_roles(user.pk)) if compartida else None
+        if roles is None:
+            roles = frozenset([nombre async for nombre in user.groups.values_list('name', flat=True)])
+            if compartida:
+                await cache.aset(clave_roles(user.pk), roles, DURACION_CACHE_ROLES)
+        user._roles = roles
+    return roles
+
+
+# Función para verificar si el usuario pertenece al grupo de administración
+def is_administracion(user):
+    return ADMINISTRACION in obtener_roles(user)
+
+
+# Versión asíncrona de is_administracion (user_passes_test la espera sin pasar por un hilo)
+async def ais_administracion(user):
+    return ADMINISTRACION in await aobtener_roles(user)
+
+
+# Función para verificar si el usuario pertenece al grupo de gerente
+def is_gerente(user):
+    return GERENTE in obtener_roles(user)
+
+
+# Función para verificar si el usuario pertenece al grupo de nomina
+def is_nomina(user):
+    return NOMINA in obtener_roles(user)
+
+
+# Middleware que expone los roles del usuario como request.roles (se resuelven solo si se usan).
+# Funciona en modo síncrono y asíncrono para que, bajo ASGI, las vistas async no pasen por un hilo.
+class RolesMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.roles = SimpleLazyObject(lambda: obtener_roles(request.user))
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        request.roles = SimpleLazyObject(lambda: obtener_roles(request.user))
+        return await self.get_response(request)
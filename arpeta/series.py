@@ -0,0 +1,77 @@
+from datetime import date, timedelta
+from django.core.cache import cache
+from django.db.models import Sum
+from django.utils import timezone
+from .models import ResumenVueltasHora, ResumenVueltasDia, ResumenVueltasMes
+
+
+# Duración de las series en caché. Los resúmenes se actualizan con cada vuelta escaneada (sin señales),
+# así que las series se refrescan al vencer este tiempo.
+DURACION_CACHE_SERIES = 60
+
+
+# Función que devuelve la serie guardada en caché con la clave indicada, o la calcula y la guarda
+def serie_en_cache(clave, calcular):
+    serie = cache.get(clave)
+    if serie is None:
+        serie = calcular()
+        cache.set(clave, serie, DURACION_CACHE_SERIES)
+    return serie
+
+
+# Función que devuelve [(fecha, vueltas)] de los últimos `dias` días hasta hoy (hora local),
+# con una sola consulta al resumen diario; los días sin vueltas se completan con 0
+def vueltas_por_dia(dias=7):
+    hoy = timezone.localdate()
+
+    def calcular():
+        fechas = [hoy - timedelta(days=i) for i in range(dias - 1, -1, -1)]
+        totales = dict(
+            ResumenVueltasDia.objects.filter(fecha__range=(fechas[0], hoy)).values_list('fecha', 'total')
+        )
+        return [(fecha, totales.get(fecha, 0)) for fecha in fechas]
+
+    return serie_en_cache(f"series:vueltas_dia:{hoy.isoformat()}:{dias}", calcular)
+
+
+# Función que devuelve las vueltas de cada mes del año (lista de 12 valores) a partir del resumen mensual
+def vueltas_por_mes(año=None):
+    año = año or timezone.localdate().year
+
+    def calcular():
+        totales = {
+            mes.month: total
+            for mes, total in ResumenVueltasMes.objects.filter(
+                mes__gte=date(año, 1, 1), mes__lt=date(año + 1, 1, 1)
+            ).values_list('mes', 'total')
+        }
+        return [totales.get(mes, 0) for mes in range(1, 13)]
+
+    return serie_en_cache(f"series:vueltas_mes:{año}", calcular)
+
+
+# Días que cubren por defecto las series por hora del día (los últimos 30 días hasta hoy)
+DIAS_VUELTAS_POR_HORA = 30
+
+
+# Función que devuelve las vueltas registradas en cada hora del día (lista de 24 valores, hora local) en los
+# últimos `dias` días hasta hoy. La ventana acota las filas que se suman del resumen por hora, que crece cada día.
+def vueltas_por_hora(dias=DIAS_VUELTAS_POR_HORA):
+    hoy = timezone.localdate()
+
+    def calcular():
+        totales = dict(
+            ResumenVueltasHora.objects.filter(fecha__range=(hoy - timedelta(days=dias - 1), hoy))
+            .values('hora')
+            .annotate(total_hora=Sum('total'))
+            .values_list('hora', 'total_hora')
+        )
+        return [totales.get(hora, 0) for hora in range(24)]
+
+    return serie_en_cache(f"series:vueltas_hora:{hoy.isoformat()}:{dias}", calcular)
+
+
+# Función para sumar las vueltas registradas en cada franja horaria [inicio, fin) en los últimos `dias` días
+def vueltas_por_franja(franjas, dias=DIAS_VUELTAS_POR_HORA):
+    horas = vueltas_por_hora(dias)
+    return [sum(horas[inicio:fin]) for inicio, fin in franjas]
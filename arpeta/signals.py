@@ -0,0 +1,90 @@
+from django.contrib.auth.models import Group, User
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from .descargas import olvidar_descarga
+from .escaneo import olvidar_asignacion
+from .indicadores import olvidar_asignaciones_mes, olvidar_indicadores
+from .models import Operador, Vehiculo, TipoMaterial, TarifaMaterial, Asignacion
+from .nomina import olvidar_tarifas
+from .roles import olvidar_roles
+from .trabajos import encolar_borrado
+
+
+# Invalida la asignación activa en caché cuando se crea, edita, cambia de estado o borra una asignación
+@receiver(post_save, sender=Asignacion)
+@receiver(post_delete, sender=Asignacion)
+def invalidar_cache_asignacion(sender, instance, **kwargs):
+    olvidar_asignacion(instance.vehiculo_id, instance.fecha_asignacion)
+    # Si se cambió el vehículo o la fecha, la clave anterior todavía apunta a esta asignación
+    placa, fecha = getattr(instance, 'clave_original', (None, None))
+    if placa and (placa, fecha) != (instance.vehiculo_id, instance.fecha_asignacion):
+        olvidar_asignacion(placa, fecha)
+    instance.clave_original = (instance.vehiculo_id, instance.fecha_asignacion)
+
+
+# Invalida la asignación activa de hoy cuando cambian los datos del vehículo (por ejemplo, su capacidad)
+@receiver(post_save, sender=Vehiculo)
+@receiver(post_delete, sender=Vehiculo)
+def invalidar_cache_vehiculo(sender, instance, **kwargs):
+    olvidar_asignacion(instance.placa, timezone.localdate())
+
+
+# Invalida el resumen de indicadores del gerente cuando cambian los datos que cuenta
+@receiver(post_save, sender=Operador)
+@receiver(post_delete, sender=Operador)
+@receiver(post_save, sender=Vehiculo)
+@receiver(post_delete, sender=Vehiculo)
+@receiver(post_save, sender=TipoMaterial)
+@receiver(post_delete, sender=TipoMaterial)
+@receiver(post_save, sender=Asignacion)
+@receiver(post_delete, sender=Asignacion)
+def invalidar_indicadores(sender, **kwargs):
+    olvidar_indicadores()
+
+
+# Invalida solo el conteo del mes de la asignación que se crea, edita o borra
+@receiver(post_save, sender=Asignacion)
+@receiver(post_delete, sender=Asignacion)
+def invalidar_asignaciones_mes(sender, instance, **kwargs):
+    olvidar_asignaciones_mes(instance.fecha_asignacion)
+
+
+# Invalida el mapa de tarifas cuando se crea, edita o borra una tarifa de material
+@receiver(post_save, sender=TarifaMaterial)
+@receiver(post_delete, sender=TarifaMaterial)
+def invalidar_tarifas(sender, **kwargs):
+    olvidar_tarifas()
+
+
+# Borra los archivos de un operador o vehículo eliminado (también en borrados en bloque y en cascada)
+# cuando se confirma la transacción, en segundo plano
+@receiver(post_delete, sender=Operador)
+def borrar_archivos_operador(sender, instance, **kwargs):
+    encolar_borrado(instance.foto_operador.name)
+
+
+@receiver(post_delete, sender=Vehiculo)
+def borrar_archivos_vehiculo(sender, instance, **kwargs):
+    encolar_borrado(instance.foto_vehiculo.name, instance.codigo_qr.name)
+    olvidar_descarga(f"qr:{instance.placa}")
+
+
+# Invalida los roles en caché de los usuarios cuyos grupos cambian, desde el usuario o desde el grupo
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidar_roles_usuarios(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        olvidar_roles(instance.pk)
+    elif action == 'pre_clear':
+        olvidar_roles(*instance.user_set.values_list('pk', flat=True))
+    else:
+        olvidar_roles(*pk_set)
+
+
+# Invalida los roles en caché de los miembros de un grupo que se renombra o se elimina
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def invalidar_roles_grupo(sender, instance, **kwargs):
+    olvidar_roles(*instance.user_set.values_list('pk', flat=True))
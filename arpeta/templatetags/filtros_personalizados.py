@@ -13,7 +13,14 @@ def formato_decimal(valor):
 
 @register.simple_tag
 def asignaciones_por_vehiculo(vehiculo):
+    """
+    Retorna el número de asignaciones asociadas a un vehículo específico.
+    Usa la anotación num_asignaciones de la vista si existe, para no consultar por cada fila.
+    """
     if vehiculo:
+        num_asignaciones = getattr(vehiculo, 'num_asignaciones', None)
+        if num_asignaciones is not None:
+            return num_asignaciones
         return Asignacion.objects.filter(vehiculo=vehiculo).count()
     return 0
 
@@ -21,7 +28,11 @@ def asignaciones_por_vehiculo(vehiculo):
 def asignaciones_por_operador(operador):
     """
     Retorna el número de asignaciones asociadas a un operador específico.
+    Usa la anotación num_asignaciones de la vista si existe, para no consultar por cada fila.
     """
     if operador:
+        num_asignaciones = getattr(operador, 'num_asignaciones', None)
+        if num_asignaciones is not None:
+            return num_asignaciones
         return Asignacion.objects.filter(operador=operador).count()
     return 0
\ No newline at end of file
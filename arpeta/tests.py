@@ -1,3 +1,851 @@
-from django.test import TestCase
+import os
+import time
+import zipfile
+from asgiref.sync import sync_to_async
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO, StringIO
+from datetime import date, datetime, timedelta
+from django.contrib.auth.models import Group, User
+from django.contrib.messages import get_messages
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.db import connection, transaction
+import tempfile
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from .busqueda import filtrar_asignaciones
+from .correos import MAX_INTENTOS_CORREO, encolar_correo, enviar_pendientes
+from .escaneo import ErrorEscaneo, aregistrar_escaneo, clave_asignacion, obtener_fernet, registrar_escaneo, registrar_escaneos_lote, sumar_vuelta
+from .finders import PlotlyFinder
+from .forms import FiltroBusquedaForm
+from .nomina import MAX_RECIBOS_PDF_UNIDO, calcular_pagos, tasa_vigente
+from .graficos import figura_estado_operadores, renderizar_grafico
+from .indicadores import asignaciones_por_mes, obtener_indicadores
+from .series import vueltas_por_dia, vueltas_por_hora
+from .imagenes import ruta_derivado
+from .trabajos import TERMINADO, derivados_completos, estado_trabajo, solicitar_pdf
+from .paginacion import PaginadorCursor
+from .roles import ADMINISTRACION, GERENTE, NOMINA, is_gerente
+from .models import Operador, Vehiculo, Asignacion, Marca, Modelo, TipoMaterial, TarifaMaterial, Vuelta, ResumenVueltasDia, Correo
 
-# Create your tests here.
+
+# Función para crear los datos mínimos de una asignación activa para hoy
+def crear_asignacion(placa='ABC123', cedula='12345678', fecha=None):
+    modelo, _ = Modelo.objects.get_or_create(nombre='Actros', marca=Marca.objects.get_or_create(nombre='Mercedes')[0])
+    vehiculo = Vehiculo(placa=placa, modelo=modelo, alto=2, ancho=2, largo=3)
+    vehiculo.save()
+    operador = Operador.objects.create(
+        cedula=cedula, nombre='Pedro', apellido='Pérez', telefono='+584141234567',
+        correo=f'{cedula}@arpeta.com', direccion='Caracas'
+    )
+    return Asignacion.objects.create(operador=operador, vehiculo=vehiculo, fecha_asignacion=fecha or timezone.localdate())
+
+
+# Pruebas de concurrencia del contador de vueltas
+class RegistrarVueltaConcurrenteTests(TransactionTestCase):
+    escaneos = 300
+    hilos = 16
+
+    def escanear(self, asignacion_id, espera):
+        try:
+            return sumar_vuelta(asignacion_id, 'ABC123', timezone.now(), espera)
+        finally:
+            connection.close()
+
+    def escanear_en_paralelo(self, asignacion_id, espera):
+        with ThreadPoolExecutor(max_workers=self.hilos) as ejecutor:
+            return list(ejecutor.map(lambda _: self.escanear(asignacion_id, espera), range(self.escaneos)))
+
+    def test_no_se_pierden_vueltas(self):
+        asignacion = crear_asignacion()
+        resultados = self.escanear_en_paralelo(asignacion.pk, -timedelta(days=1))
+        asignacion.refresh_from_db()
+        self.assertEqual(asignacion.total_vueltas, self.escaneos)
+        self.assertEqual(sorted(resultados), list(range(1, self.escaneos + 1)))
+        self.assertEqual(Vuelta.objects.filter(asignacion=asignacion).count(), self.escaneos)
+        self.assertEqual(ResumenVueltasDia.objects.get().total, self.escaneos)
+
+    def test_tiempo_de_espera_admite_una_sola_vuelta(self):
+        asignacion = crear_asignacion()
+        resultados = self.escanear_en_paralelo(asignacion.pk, timedelta(minutes=10))
+        asignacion.refresh_from_db()
+        self.assertEqual(asignacion.total_vueltas, 1)
+        self.assertEqual([r for r in resultados if r is not None], [1])
+        self.assertIsNotNone(asignacion.ultima_vuelta_registrada_en)
+        self.assertEqual(Vuelta.objects.filter(asignacion=asignacion).count(), 1)
+        self.assertEqual([r for r in resultados if r is not None], [1])
+        self.assertEqual(Vuelta.objects.filter(asignacion=asignacion).count(), 1)
+
+
+# Pruebas del UPDATE condicional del contador de vueltas
+class RegistrarVueltaTests(TestCase):
+    def test_respeta_estado_y_tiempo_de_espera(self):
+        asignacion = crear_asignacion()
+        ahora = timezone.now()
+        espera = timedelta(minutes=10)
+        clave = (asignacion.pk, asignacion.vehiculo_id, asignacion.fecha_asignacion)
+        self.assertEqual(Asignacion.objects.registrar_vuelta(*clave, ahora, espera), 1)
+        self.assertIsNone(Asignacion.objects.registrar_vuelta(*clave, ahora + timedelta(minutes=5), espera))
+        self.assertEqual(Asignacion.objects.registrar_vuelta(*clave, ahora + espera, espera), 2)
+        # Con un vehículo o una fecha que ya no son los de la asignación no se suma nada
+        self.assertIsNone(Asignacion.objects.registrar_vuelta(asignacion.pk, 'OTR999', asignacion.fecha_asignacion, ahora + 2 * espera, espera))
+        Asignacion.objects.filter(pk=asignacion.pk).update(estado=False)
+        self.assertIsNone(Asignacion.objects.registrar_vuelta(*clave, ahora + 2 * espera, espera))
+
+
+# Pruebas de la caché del registro de vueltas
+class CacheEscaneoTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.asignacion = crear_asignacion()
+        self.token = obtener_fernet().encrypt(b'ABC123').decode('utf-8')
+
+    def test_escaneo_con_cache_no_ejecuta_select(self):
+        registrar_escaneo(self.token, espera=-timedelta(days=1))
+        with CaptureQueriesContext(connection) as consultas:
+            resultado = registrar_escaneo(self.token, espera=-timedelta(days=1))
+        self.assertEqual(resultado['total_vueltas'], 2)
+        self.assertFalse([q for q in consultas.captured_queries if q['sql'].lstrip().upper().startswith('SELECT')])
+
+    def test_cambio_de_asignacion_invalida_la_cache(self):
+        registrar_escaneo(self.token)
+        self.asignacion.estado = False
+        self.asignacion.save()
+        with self.assertRaises(ErrorEscaneo) as error:
+            registrar_escaneo(self.token)
+        self.assertEqual(error.exception.status, 404)
+
+    def test_asignacion_movida_a_otro_vehiculo_no_suma_vueltas_al_anterior(self):
+        registrar_escaneo(self.token, espera=-timedelta(days=1))
+        otro = crear_asignacion(placa='YYY222', cedula='22222222')
+        otro.delete()
+        asignacion = Asignacion.objects.get(pk=self.asignacion.pk)
+        asignacion.vehiculo_id = 'YYY222'
+        asignacion.save()
+        clave = clave_asignacion('ABC123', asignacion.fecha_asignacion)
+        self.assertIsNone(cache.get(clave))
+        # Otro proceso con la caché vieja todavía tiene el id de la asignación movida
+        cache.set(clave, (asignacion.pk, 12.0))
+        with self.assertRaises(ErrorEscaneo) as error:
+            registrar_escaneo(self.token, espera=-timedelta(days=1))
+        self.assertEqual(error.exception.status, 404)
+        self.assertEqual(Asignacion.objects.get(pk=asignacion.pk).total_vueltas, 1)
+
+
+# Pruebas del registro de vueltas asíncrono
+class RegistrarVueltaAsyncTests(TestCase):
+    async def test_registra_y_respeta_tiempo_de_espera(self):
+        await cache.aclear()
+        await sync_to_async(crear_asignacion)()
+        token = obtener_fernet().encrypt(b'ABC123').decode('utf-8')
+        resultado = await aregistrar_escaneo(token)
+        self.assertEqual(resultado['total_vueltas'], 1)
+        with self.assertRaises(ErrorEscaneo) as error:
+            await aregistrar_escaneo(token)
+        self.assertEqual(error.exception.status, 429)
+
+    async def test_vista_async_exige_administracion(self):
+        await sync_to_async(crear_asignacion)()
+        usuario = await sync_to_async(User.objects.create_user)('admin', 'admin@arpeta.com', 'clave')
+        token = obtener_fernet().encrypt(b'ABC123').decode('utf-8')
+        url = reverse('registrar_vuelta_async')
+        await self.async_client.aforce_login(usuario)
+        respuesta = await self.async_client.post(url, {'placa': token}, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 302)
+        await usuario.groups.aadd(await Group.objects.acreate(name=ADMINISTRACION))
+        await cache.aclear()
+        respuesta = await self.async_client.post(url, {'placa': token}, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['total_vueltas'], 1)
+
+
+# Pruebas del registro de vueltas por lote
+class RegistrarEscaneosLoteTests(TestCase):
+    def test_aplica_tiempo_de_espera_en_orden_del_lector(self):
+        asignacion = crear_asignacion(fecha=date(2025, 6, 2))
+        token = obtener_fernet().encrypt(b'ABC123').decode('utf-8')
+        inicio = timezone.make_aware(datetime(2025, 6, 2, 6, 0))
+        minutos = [25, 0, 5, 12, 30]
+        registros = [{"token": token, "scanned_at": (inicio + timedelta(minutes=m)).isoformat()} for m in minutos]
+        registros += [{"token": "no-es-un-token", "scanned_at": inicio.isoformat()}, {"token": token}]
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with CaptureQueriesContext(connection) as consultas:
+                resultados = registrar_escaneos_lote(registros)
+        self.assertEqual([r["status"] for r in resultados], [200, 200, 429, 200, 429, 400, 400])
+        # La cantidad de consultas no depende del tamaño del lote, y los resúmenes se suman después de confirmar
+        self.assertLessEqual(len(consultas), 20)
+        self.assertFalse([c for c in consultas.captured_queries if 'arpeta_resumenvueltas' in c['sql']])
+        self.assertEqual(len(callbacks), 1)
+        asignacion.refresh_from_db()
+        self.assertEqual(asignacion.total_vueltas, 3)
+        self.assertEqual(asignacion.ultima_vuelta_registrada_en, inicio + timedelta(minutes=25))
+        self.assertEqual(Vuelta.objects.filter(asignacion=asignacion).count(), 3)
+        self.assertEqual(ResumenVueltasDia.objects.get().total, 3)
+
+
+# Pruebas del servicio de escaneo, que solo monta el registro de vueltas
+@override_settings(ROOT_URLCONF='sistema.urls_escaneo')
+class ServicioEscaneoTests(TestCase):
+    def test_registra_vueltas_y_no_expone_otras_vistas(self):
+        crear_asignacion()
+        usuario = User.objects.create_user('admin', 'admin@arpeta.com', 'clave')
+        usuario.groups.add(Group.objects.create(name=ADMINISTRACION))
+        self.client.force_login(usuario)
+        token = obtener_fernet().encrypt(b'ABC123').decode('utf-8')
+        respuesta = self.client.post(reverse('registrar_vuelta'), {'placa': token}, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['total_vueltas'], 1)
+        self.assertEqual(self.client.get('/administracion/operadores').status_code, 404)
+
+
+# Pruebas de la caché de roles
+class RolesTests(TestCase):
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': tempfile.mkdtemp(),
+    }})
+    def test_roles_en_cache_se_invalidan_al_confirmar_el_cambio_de_grupos(self):
+        cache.clear()
+        usuario = User.objects.create_user('gerente', 'gerente@arpeta.com', 'clave')
+        grupo = Group.objects.create(name=GERENTE)
+        self.assertFalse(is_gerente(User.objects.get(pk=usuario.pk)))
+        with self.captureOnCommitCallbacks(execute=True):
+            usuario.groups.add(grupo)
+            # Hasta confirmar la transacción se siguen viendo los roles anteriores
+            self.assertFalse(is_gerente(User.objects.get(pk=usuario.pk)))
+        with self.assertNumQueries(2):
+            self.assertTrue(is_gerente(User.objects.get(pk=usuario.pk)))
+        with self.assertNumQueries(1):
+            self.assertTrue(is_gerente(User.objects.get(pk=usuario.pk)))
+        with self.captureOnCommitCallbacks(execute=True):
+            grupo.user_set.remove(usuario)
+        self.assertFalse(is_gerente(User.objects.get(pk=usuario.pk)))
+
+    def test_sin_cache_compartida_los_roles_no_se_guardan(self):
+        usuario = User.objects.create_user('gerente', 'gerente@arpeta.com', 'clave')
+        usuario.groups.add(Group.objects.create(name=GERENTE))
+        for _ in range(2):
+            with self.assertNumQueries(2):
+                self.assertTrue(is_gerente(User.objects.get(pk=usuario.pk)))
+
+
+# Pruebas de la cantidad de consultas de los listados de administración
+class ListadosAdministracionTests(TestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user('admin', 'admin@arpeta.com', 'clave')
+        self.usuario.groups.add(Group.objects.create(name=ADMINISTRACION))
+        self.client.force_login(self.usuario)
+        # Primera visita, para que las consultas que se cuentan sean solo las del listado
+        self.client.get(reverse('inicio_administracion'))
+
+    def contar_consultas(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+        return len(consultas)
+
+    def test_consultas_constantes_sin_importar_las_filas(self):
+        crear_asignacion('AAA111', '11111111')
+        urls = [reverse('operadores'), reverse('vehiculos'), reverse('asignaciones')]
+        con_una_fila = [self.contar_consultas(url) for url in urls]
+        crear_asignacion('BBB222', '22222222')
+        con_dos_filas = [self.contar_consultas(url) for url in urls]
+        self.assertEqual(con_una_fila, con_dos_filas)
+
+
+# Pruebas del paginador por cursor
+class PaginadorCursorTests(TestCase):
+    def test_recorre_paginas_hacia_adelante_y_hacia_atras(self):
+        for i in range(7):
+            Operador.objects.create(
+                cedula=f'{i:08d}', nombre='Ana' if i % 2 else 'Luis', apellido='Pérez',
+                telefono='+584141234567', correo=f'{i}@arpeta.com', direccion='Caracas'
+            )
+        esperado = list(Operador.objects.order_by('nombre', 'cedula').values_list('cedula', flat=True))
+        paginador = PaginadorCursor(Operador.objects.all(), ['nombre', 'cedula'], tamano=3)
+        paginas = [paginador.obtener_pagina()]
+        while paginas[-1].has_next():
+            paginas.append(paginador.obtener_pagina(despues=paginas[-1].cursor_siguiente))
+        self.assertEqual([o.cedula for pagina in paginas for o in pagina], esperado)
+        self.assertEqual([len(pagina) for pagina in paginas], [3, 3, 1])
+        anterior = paginador.obtener_pagina(antes=paginas[-1].cursor_anterior)
+        self.assertEqual([o.cedula for o in anterior], [o.cedula for o in paginas[1]])
+        self.assertEqual(anterior.cursor_siguiente, paginas[1].cursor_siguiente)
+        primera = paginador.obtener_pagina(antes=anterior.cursor_anterior)
+        self.assertFalse(primera.has_previous())
+        self.assertEqual([o.cedula for o in primera], esperado[:3])
+
+
+# Pruebas de la capa de búsqueda y filtros
+class BusquedaTests(TestCase):
+    def test_filtra_asignaciones_por_prefijo_nombre_y_estado(self):
+        primera = crear_asignacion('ABC123', '11111111')
+        segunda = crear_asignacion('XYZ789', '22222222')
+        Operador.objects.filter(pk='22222222').update(nombre='Rosa')
+        segunda.estado = False
+        segunda.save()
+        todas = Asignacion.objects.all()
+        filtro = FiltroBusquedaForm({'placa': 'abc', 'fecha_desde': 'no es fecha'})
+        self.assertEqual(list(filtrar_asignaciones(todas, filtro.filtros())), [primera])
+        self.assertEqual(list(filtrar_asignaciones(todas, {'operador': 'ros'})), [segunda])
+        self.assertEqual(list(filtrar_asignaciones(todas, {'q': '1111'})), [primera])
+        self.assertEqual(list(filtrar_asignaciones(todas, {'estado': 'inactivo'})), [segunda])
+
+    def test_busqueda_del_gerente_por_placa_modelo_y_marca(self):
+        primera = crear_asignacion('ABC123', '11111111')
+        segunda = crear_asignacion('XYZ789', '22222222')
+        Vehiculo.objects.filter(pk='XYZ789').update(
+            modelo=Modelo.objects.create(nombre='FH16', marca=Marca.objects.create(nombre='Volvo'))
+        )
+        usuario = User.objects.create_user('gerente', 'gerente@arpeta.com', 'clave')
+        usuario.groups.add(Group.objects.create(name=GERENTE))
+        self.client.force_login(usuario)
+        for texto, esperado in [('c12', [primera]), ('fh1', [segunda]), ('volv', [segunda]), ('merced', [primera])]:
+            respuesta = self.client.get(reverse('vehiculos_gerente'), {'search': texto})
+            self.assertEqual(list(respuesta.context['asignaciones_activas']), esperado)
+
+
+# Pruebas de los planes de consulta de la asignación activa del día
+class IndicesAsignacionActivaTests(TestCase):
+    def plan(self, queryset):
+        if connection.vendor == 'postgresql':
+            # Con tablas casi vacías PostgreSQL prefiere recorrer la tabla; se desactiva para ver el índice elegido
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def test_busquedas_del_dia_usan_indices(self):
+        asignacion = crear_asignacion()
+        hoy = timezone.localdate()
+        activas = Asignacion.objects.filter(estado=True, fecha_asignacion=hoy)
+        self.assertIn('asignacion_activa_operador_idx', self.plan(activas.filter(operador=asignacion.operador_id)))
+        self.assertIn('asignacion_vehiculo_fecha_idx', self.plan(activas.filter(vehiculo=asignacion.vehiculo_id)))
+
+
+# Pruebas del resumen de indicadores del gerente
+class IndicadoresTests(TestCase):
+    def test_indicadores_en_cache_se_invalidan_al_guardar(self):
+        cache.clear()
+        asignacion = crear_asignacion()
+        Asignacion.objects.filter(pk=asignacion.pk).update(total_vueltas=2)
+        with self.assertNumQueries(4):
+            indicadores = obtener_indicadores()
+        self.assertEqual(indicadores['total_operadores'], 1)
+        self.assertEqual(indicadores['vehiculos_activos'], 1)
+        self.assertEqual(indicadores['asignaciones_activas'], 1)
+        self.assertAlmostEqual(indicadores['total_material'], 24.0)
+        with self.assertNumQueries(0):
+            obtener_indicadores()
+        asignacion.estado = False
+        asignacion.save()
+        self.assertEqual(obtener_indicadores()['asignaciones_inactivas'], 1)
+
+    def test_asignaciones_por_mes_recalcula_solo_el_mes_que_cambia(self):
+        cache.clear()
+        hoy = timezone.localdate()
+        hace_dos_meses = (hoy.replace(day=1) - timedelta(days=40)).replace(day=1)
+        crear_asignacion('AAA111', '11111111', fecha=hace_dos_meses)
+        crear_asignacion('BBB222', '22222222', fecha=hoy)
+        serie = asignaciones_por_mes(3)
+        self.assertEqual([mes for mes, _ in serie][0], hace_dos_meses)
+        self.assertEqual([total for _, total in serie], [1, 0, 1])
+        with self.assertNumQueries(0):
+            asignaciones_por_mes(3)
+        crear_asignacion('CCC333', '33333333', fecha=hoy)
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual([total for _, total in asignaciones_por_mes(3)], [1, 0, 2])
+        self.assertEqual(len(consultas), 1)
+        self.assertIn(str(hoy.replace(day=1)), consultas[0]['sql'])
+
+    def test_paginas_del_gerente_usan_el_resumen(self):
+        usuario = User.objects.create_user('gerente', 'gerente@arpeta.com', 'clave')
+        usuario.groups.add(Group.objects.create(name=GERENTE))
+        self.client.force_login(usuario)
+        asignacion = crear_asignacion()
+        Asignacion.objects.filter(pk=asignacion.pk).update(total_vueltas=16)
+        for nombre in ['reportes_gerente', 'asignaciones_gerente', 'operadores_gerente', 'vehiculos_gerente', 'pagos_gerente']:
+            self.assertEqual(self.client.get(reverse(nombre)).status_code, 200)
+
+
+# Pruebas de las series de vueltas de los gráficos del gerente
+class SeriesVueltasTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        usuario = User.objects.create_user('gerente', 'gerente@arpeta.com', 'clave')
+        usuario.groups.add(Group.objects.create(name=GERENTE))
+        self.client.force_login(usuario)
+
+    def test_series_completan_los_huecos(self):
+        asignacion = crear_asignacion()
+        ahora = timezone.localtime()
+        with self.captureOnCommitCallbacks(execute=True):
+            Vuelta.registrar(asignacion.pk, ahora)
+            Vuelta.registrar(asignacion.pk, ahora - timedelta(days=2))
+        self.assertEqual([total for _, total in vueltas_por_dia(7)], [0, 0, 0, 0, 1, 0, 1])
+        self.assertEqual(sum(vueltas_por_hora()), 2)
+        self.assertEqual(len(vueltas_por_hora()), 24)
+        # La vuelta de hace dos días queda fuera de una ventana de dos días
+        self.assertEqual(sum(vueltas_por_hora(dias=2)), 1)
+
+    def test_consultas_del_tablero_de_vehiculos(self):
+        crear_asignacion()
+        url = reverse('vehiculos_gerente')
+        self.client.get(url)
+        # Con los indicadores y las series en caché solo quedan la sesión, el usuario y la página de asignaciones
+        with self.assertNumQueries(4):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        cache.clear()
+        # Sin caché: además tres agregados de indicadores, el material por tipo y una consulta por serie
+        with self.assertNumQueries(11):
+            self.client.get(url)
+
+
+# Pruebas de la generación de PDF en segundo plano
+@override_settings(TRABAJOS_BACKEND='arpeta.trabajos.BackendInmediato', MEDIA_ROOT=tempfile.mkdtemp())
+class TrabajosPdfTests(TestCase):
+    def test_pdf_se_genera_una_vez_y_se_reutiliza(self):
+        cache.clear()
+        asignacion = crear_asignacion()
+        contexto = {'asignacion': asignacion, 'tipo_pago': 'arena', 'pago_arena': 12, 'pago_divisas': 144,
+                    'material': 'arena', 'tasa': 12, 'capacidad_camion': 12}
+        trabajo_id = solicitar_pdf('nomina/recibo_pago.html', {**contexto, 'fecha': '01/06/2025 08:00:00'},
+                                   'recibo.pdf', NOMINA, volatiles=('fecha',))
+        self.assertEqual(estado_trabajo(trabajo_id, {NOMINA})['estado'], TERMINADO)
+        otro_id = solicitar_pdf('nomina/recibo_pago.html', {**contexto, 'fecha': '01/06/2025 09:30:00'},
+                                'recibo.pdf', NOMINA, volatiles=('fecha',))
+        self.assertEqual(otro_id, trabajo_id)
+
+        usuario = User.objects.create_user('nomina', 'nomina@arpeta.com', 'clave')
+        usuario.groups.add(Group.objects.create(name=NOMINA))
+        self.client.force_login(usuario)
+        estado = self.client.get(reverse('estado_reporte', args=[trabajo_id])).json()
+        self.assertEqual(estado['estado'], TERMINADO)
+        respuesta = self.client.get(estado['url_descarga'])
+        self.assertEqual(respuesta['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(respuesta.streaming_content).startswith(b'%PDF'))
+        self.assertEqual(self.client.get(reverse('estado_reporte', args=['0' * 64])).status_code, 404)
+
+    def test_reporte_solo_lo_ve_el_rol_que_lo_pidio(self):
+        cache.clear()
+        contexto = {'asignacion': crear_asignacion(), 'tipo_pago': 'arena', 'pago_arena': 12, 'pago_divisas': 144,
+                    'material': 'arena', 'tasa': 12, 'capacidad_camion': 12, 'fecha': '01/06/2025 08:00:00'}
+        trabajo_id = solicitar_pdf('nomina/recibo_pago.html', contexto, 'recibo.pdf', NOMINA)
+        self.client.force_login(User.objects.create_user('sin_rol', 'sin_rol@arpeta.com', 'clave'))
+        self.assertEqual(self.client.get(reverse('estado_reporte', args=[trabajo_id])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('descargar_reporte', args=[trabajo_id])).status_code, 404)
+        # Sin el estado en caché (otro proceso) el rol sale de la ruta del archivo
+        cache.clear()
+        self.assertEqual(self.client.get(reverse('descargar_reporte', args=[trabajo_id])).status_code, 404)
+
+
+# Pruebas de la generación de los códigos QR en segundo plano
+@override_settings(TRABAJOS_BACKEND='arpeta.trabajos.BackendInmediato', MEDIA_ROOT=tempfile.mkdtemp())
+class CodigosQrTests(TestCase):
+    def test_qr_se_genera_al_confirmar_con_un_solo_insert(self):
+        modelo = Modelo.objects.create(nombre='Actros', marca=Marca.objects.create(nombre='Mercedes'))
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertNumQueries(1):
+                vehiculo = Vehiculo.objects.create(placa='QR1234', modelo=modelo, alto=2, ancho=2, largo=3)
+        self.assertEqual(len(callbacks), 1)
+        vehiculo.refresh_from_db()
+        self.assertEqual(vehiculo.codigo_qr.name, 'codigos_qr/qr_vehiculo_QR1234.png')
+        with vehiculo.codigo_qr.open('rb') as archivo:
+            self.assertTrue(archivo.read().startswith(b'\x89PNG'))
+
+    def test_regenerar_qr_reemplaza_el_archivo(self):
+        modelo = Modelo.objects.create(nombre='Actros', marca=Marca.objects.create(nombre='Mercedes'))
+        Vehiculo.objects.create(placa='QR0001', modelo=modelo, alto=2, ancho=2, largo=3, codigo_qr='codigos_qr/viejo.png')
+        call_command('regenerar_qr', 'QR0001', procesos=1, stdout=StringIO())
+        self.assertEqual(Vehiculo.objects.get().codigo_qr.name, 'codigos_qr/qr_vehiculo_QR0001.png')
+
+
+# Pruebas de la exportación de los códigos QR
+class ExportarQrTests(TestCase):
+    def setUp(self):
+        for placa in ('ABC123', 'ABD456', 'XYZ789'):
+            crear_asignacion(placa=placa, cedula=placa[-3:] * 2)
+        usuario = User.objects.create_user('admin', 'admin@arpeta.com', 'clave')
+        usuario.groups.add(Group.objects.create(name=ADMINISTRACION))
+        self.client.force_login(usuario)
+
+    def test_zip_con_los_vehiculos_filtrados(self):
+        respuesta = self.client.get(reverse('exportar_qr'), {'formato': 'zip', 'q': 'AB'})
+        self.assertEqual(respuesta['Content-Type'], 'application/zip')
+        with zipfile.ZipFile(BytesIO(b''.join(respuesta.streaming_content))) as archivo_zip:
+            self.assertEqual(archivo_zip.namelist(), ['qr_vehiculo_ABC123.png', 'qr_vehiculo_ABD456.png'])
+            self.assertTrue(archivo_zip.read('qr_vehiculo_ABC123.png').startswith(b'\x89PNG'))
+
+    def test_hoja_de_etiquetas_en_pdf(self):
+        respuesta = self.client.get(reverse('exportar_qr'), {'formato': 'pdf'})
+        self.assertEqual(respuesta['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(respuesta.streaming_content).startswith(b'%PDF'))
+
+
+# Backend de correo que cuenta las conexiones abiertas (como el SMTP, open no hace nada si ya hay una abierta)
+class BackendCorreoContado(locmem.EmailBackend):
+    aperturas = 0
+    abierta = False
+
+    def open(self):
+        if self.abierta:
+            return False
+        self.abierta = True
+        BackendCorreoContado.aperturas += 1
+        return True
+
+    def close(self):
+        self.abierta = False
+
+
+# Backend de correo que simula un servidor SMTP caído
+class BackendCorreoCaido(locmem.EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionRefusedError("Servidor SMTP no disponible")
+
+
+# Pruebas de la cola de correos
+@override_settings(TRABAJOS_BACKEND='arpeta.trabajos.BackendInmediato', MEDIA_ROOT=tempfile.mkdtemp())
+class CorreosTests(TestCase):
+    def setUp(self):
+        usuario = User.objects.create_user('admin', 'admin@arpeta.com', 'clave')
+        usuario.groups.add(Group.objects.create(name=ADMINISTRACION))
+        self.client.force_login(usuario)
+
+    def test_qr_se_encola_y_se_envia_con_adjunto(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            crear_asignacion()
+        with self.captureOnCommitCallbacks(execute=True):
+            respuesta = self.client.post(reverse('enviar_qr_correo', args=['ABC123']), {'correo': '12345678@arpeta.com'})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(Correo.objects.get().estado, Correo.ENVIADO)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Pedro Pérez', mail.outbox[0].body)
+        self.assertEqual(mail.outbox[0].attachments[0][0], 'qr_vehiculo_ABC123.png')
+
+    @override_settings(EMAIL_BACKEND='arpeta.tests.BackendCorreoContado')
+    def test_envio_a_los_asignados_de_hoy_con_una_conexion(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for placa in ('AAA111', 'BBB222', 'CCC333'):
+                crear_asignacion(placa=placa, cedula=placa[-3:] * 2)
+            crear_asignacion(placa='DDD444', cedula='44444444', fecha=timezone.localdate() - timedelta(days=1))
+        self.client.post(reverse('enviar_qr_asignados'))
+        self.assertEqual(Correo.objects.filter(estado=Correo.PENDIENTE).count(), 3)
+        BackendCorreoContado.aperturas = 0
+        self.assertEqual(enviar_pendientes(lote=2), (3, 0))
+        self.assertEqual(BackendCorreoContado.aperturas, 1)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['111111@arpeta.com', '222222@arpeta.com', '333333@arpeta.com'])
+
+    @override_settings(EMAIL_BACKEND='arpeta.tests.BackendCorreoCaido')
+    def test_reintentos_con_espera_creciente_hasta_el_error(self):
+        correo = encolar_correo('Prueba', 'Hola', ['operador@arpeta.com'])
+        esperas = []
+        with self.assertLogs('arpeta.correos', 'WARNING'):
+            for _ in range(MAX_INTENTOS_CORREO):
+                Correo.objects.filter(pk=correo.pk).update(proximo_intento=timezone.now())
+                self.assertEqual(enviar_pendientes(), (0, 1))
+                correo.refresh_from_db()
+                esperas.append(correo.proximo_intento - timezone.now())
+        self.assertEqual(correo.estado, Correo.ERROR)
+        self.assertEqual(correo.intentos, MAX_INTENTOS_CORREO)
+        self.assertIn('no disponible', correo.ultimo_error)
+        self.assertLess(esperas[0], esperas[1])
+        self.assertEqual(enviar_pendientes(), (0, 0))
+
+    def test_restablecer_contrasena_pasa_por_la_cola_y_no_queda_guardado(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.client.post(reverse('password_reset'), {'email': 'admin@arpeta.com'})
+            self.assertTrue(Correo.objects.get().confidencial)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(mail.outbox[0].to, ['admin@arpeta.com'])
+        # El enlace de acceso no queda en la base de datos
+        self.assertFalse(Correo.objects.exists())
+
+    @override_settings(EMAIL_BACKEND='arpeta.tests.BackendCorreoCaido')
+    def test_correo_confidencial_con_error_queda_sin_cuerpo(self):
+        correo = encolar_correo('Restablecer', 'enlace', ['admin@arpeta.com'], cuerpo_html='<a>enlace</a>', confidencial=True)
+        Correo.objects.filter(pk=correo.pk).update(intentos=MAX_INTENTOS_CORREO - 1)
+        with self.assertLogs('arpeta.correos', 'ERROR'):
+            enviar_pendientes()
+        correo.refresh_from_db()
+        self.assertEqual((correo.estado, correo.cuerpo, correo.cuerpo_html), (Correo.ERROR, '', ''))
+
+    def test_admin_de_correos_no_muestra_el_cuerpo(self):
+        encolar_correo('Restablecer', 'enlace secreto', ['admin@arpeta.com'], confidencial=True)
+        self.client.force_login(User.objects.create_superuser('super', 'super@arpeta.com', 'clave'))
+        respuesta = self.client.get(reverse('admin:arpeta_correo_change', args=[Correo.objects.get().pk]))
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotContains(respuesta, 'enlace secreto')
+        self.assertEqual(self.client.get(reverse('admin:arpeta_correo_add')).status_code, 403)
+
+
+# Pruebas del admin del registro de vueltas
+class VueltaAdminTests(TestCase):
+    def test_vueltas_son_de_solo_lectura(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            vuelta = Vuelta.registrar(crear_asignacion().pk, timezone.now())
+        self.client.force_login(User.objects.create_superuser('super', 'super@arpeta.com', 'clave'))
+        self.assertEqual(self.client.get(reverse('admin:arpeta_vuelta_changelist')).status_code, 200)
+        self.assertEqual(self.client.get(reverse('admin:arpeta_vuelta_add')).status_code, 403)
+        self.assertEqual(self.client.post(reverse('admin:arpeta_vuelta_delete', args=[vuelta.pk]), {'post': 'yes'}).status_code, 403)
+        self.assertTrue(Vuelta.objects.filter(pk=vuelta.pk).exists())
+
+
+# Función que devuelve una foto JPEG de prueba del tamaño indicado
+def foto_jpeg(ancho=1600, alto=1200):
+    from PIL import Image
+
+    resultado = BytesIO()
+    Image.new('RGB', (ancho, alto), (200, 120, 40)).save(resultado, format='JPEG')
+    return resultado.getvalue()
+
+
+# Pruebas de los derivados de las fotos
+@override_settings(TRABAJOS_BACKEND='arpeta.trabajos.BackendInmediato', MEDIA_ROOT=tempfile.mkdtemp())
+class DerivadosFotoTests(TestCase):
+    def test_derivados_se_generan_al_guardar_la_foto(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from PIL import Image
+
+        asignacion = crear_asignacion()
+        operador = asignacion.operador
+        self.assertIsNone(operador.foto_miniatura)
+        operador.foto_operador = SimpleUploadedFile('foto.jpg', foto_jpeg(), content_type='image/jpeg')
+        with self.captureOnCommitCallbacks(execute=True):
+            operador.save()
+        # Hasta que el trabajo anota los derivados se muestra la foto original, sin consultar el almacenamiento
+        self.assertEqual(operador.foto_miniatura, operador.foto_operador.url)
+        operador.refresh_from_db()
+        self.assertTrue(operador.foto_miniatura.endswith('_miniatura.webp'))
+        with Image.open(default_storage.path(ruta_derivado(operador.foto_operador.name, 'tarjeta'))) as tarjeta:
+            self.assertEqual((tarjeta.format, tarjeta.size), ('WEBP', (512, 384)))
+        with Image.open(default_storage.path(ruta_derivado(operador.foto_operador.name, 'miniatura'))) as miniatura:
+            self.assertEqual(miniatura.size, (128, 128))
+
+    def test_generar_derivados_procesa_las_fotos_existentes(self):
+        asignacion = crear_asignacion()
+        nombre = default_storage.save('vehiculos/camion.jpg', ContentFile(foto_jpeg()))
+        Vehiculo.objects.filter(pk=asignacion.vehiculo_id).update(foto_vehiculo=nombre)
+        salida = StringIO()
+        call_command('generar_derivados', procesos=1, stdout=salida)
+        self.assertIn('Derivados de 1 fotos', salida.getvalue())
+        self.assertTrue(derivados_completos(nombre))
+        call_command('generar_derivados', procesos=1, stdout=salida)
+        self.assertIn('No hay fotos sin derivados', salida.getvalue())
+        self.assertTrue(Vehiculo.objects.get().foto_miniatura.endswith('_miniatura.webp'))
+        # Una foto con derivados en el almacenamiento pero sin anotar solo se anota, no se procesa de nuevo
+        Vehiculo.objects.update(foto_derivada='')
+        call_command('generar_derivados', procesos=1, stdout=salida)
+        self.assertEqual(Vehiculo.objects.get().foto_derivada, nombre)
+
+    def test_listado_no_consulta_el_almacenamiento_por_fila(self):
+        usuario = User.objects.create_user('admin', 'admin@arpeta.com', 'clave')
+        usuario.groups.add(Group.objects.create(name=ADMINISTRACION))
+        self.client.force_login(usuario)
+        for numero in range(3):
+            asignacion = crear_asignacion(f'FOT00{numero}', f'7000000{numero}')
+            Operador.objects.filter(pk=asignacion.operador_id).update(
+                foto_operador=f'operadores/{numero}.jpg', foto_derivada=f'operadores/{numero}.jpg'
+            )
+        respuesta = self.client.get(reverse('operadores'))
+        self.assertContains(respuesta, 'derivados/operadores/0_miniatura.webp')
+
+
+# Pruebas del borrado de archivos al eliminar filas
+@override_settings(TRABAJOS_BACKEND='arpeta.trabajos.BackendInmediato', MEDIA_ROOT=tempfile.mkdtemp())
+class LimpiezaMediaTests(TestCase):
+    def crear_vehiculo(self, placa):
+        with self.captureOnCommitCallbacks(execute=True):
+            vehiculo = crear_asignacion(placa=placa, cedula=placa[-3:] * 2).vehiculo
+        vehiculo.refresh_from_db()
+        return vehiculo
+
+    def test_archivos_se_borran_solo_al_confirmar(self):
+        vehiculo = self.crear_vehiculo('ABC123')
+        ruta = vehiculo.codigo_qr.name
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    vehiculo.delete()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertTrue(default_storage.exists(ruta))
+        with self.captureOnCommitCallbacks(execute=True):
+            Vehiculo.objects.filter(placa='ABC123').delete()
+        self.assertFalse(default_storage.exists(ruta))
+
+    def test_limpiar_media_borra_los_huerfanos_antiguos(self):
+        conservado = self.crear_vehiculo('ABC123').codigo_qr.name
+        huerfano = default_storage.save('codigos_qr/huerfano.png', ContentFile(b'x' * 100))
+        reciente = default_storage.save('codigos_qr/reciente.png', ContentFile(b'x'))
+        derivado = default_storage.save(ruta_derivado('vehiculos/borrada.jpg', 'miniatura'), ContentFile(b'x'))
+        hace_un_dia = time.time() - 24 * 60 * 60
+        for nombre in (conservado, huerfano, derivado):
+            os.utime(default_storage.path(nombre), (hace_un_dia, hace_un_dia))
+        salida = StringIO()
+        call_command('limpiar_media', stdout=salida)
+        self.assertTrue(default_storage.exists(huerfano))
+        call_command('limpiar_media', borrar=True, lote=1, stdout=salida)
+        self.assertIn('2 archivos huérfanos borrados', salida.getvalue())
+        self.assertEqual([default_storage.exists(n) for n in (conservado, huerfano, reciente, derivado)],
+                         [True, False, True, False])
+
+
+# Pruebas de las descargas con caché condicional
+@override_settings(TRABAJOS_BACKEND='arpeta.trabajos.BackendInmediato', MEDIA_ROOT=tempfile.mkdtemp())
+class DescargasTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            crear_asignacion()
+        usuario = User.objects.create_user('admin', 'admin@arpeta.com', 'clave')
+        usuario.groups.add(Group.objects.create(name=ADMINISTRACION))
+        self.client.force_login(usuario)
+        self.url = reverse('descargar_qr', args=['ABC123'])
+
+    def test_qr_se_revalida_con_304_sin_consultar_el_vehiculo(self):
+        respuesta = self.client.get(self.url)
+        self.assertTrue(b''.join(respuesta.streaming_content).startswith(b'\x89PNG'))
+        self.assertEqual(respuesta['Cache-Control'], 'private, max-age=300')
+        self.assertIn('Last-Modified', respuesta)
+        etag = respuesta['ETag']
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+        self.assertEqual(respuesta['ETag'], etag)
+        self.assertFalse([c for c in consultas.captured_queries if 'arpeta_vehiculo' in c['sql']])
+
+        call_command('regenerar_qr', 'ABC123', procesos=1, stdout=StringIO())
+        respuesta = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotEqual(respuesta['ETag'], etag)
+
+    def test_qr_reemplazado_en_otro_proceso_cambia_el_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        # Se reemplaza el archivo sin olvidar_descarga, como lo vería un proceso con otra caché
+        ruta = Vehiculo.objects.get().codigo_qr.name
+        default_storage.delete(ruta)
+        default_storage.save(ruta, ContentFile(b'\x89PNG otro contenido'))
+        respuesta = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotEqual(respuesta['ETag'], etag)
+
+    @override_settings(DESCARGAS_ENVIO='x-accel-redirect')
+    def test_qr_con_x_accel_redirect(self):
+        respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta['X-Accel-Redirect'], '/protegido/codigos_qr/qr_vehiculo_ABC123.png')
+        self.assertEqual(respuesta['Content-Type'], 'image/png')
+        self.assertEqual(respuesta.content, b'')
+        self.assertEqual(self.client.get(reverse('descargar_qr', args=['NOEXI1'])).status_code, 404)
+
+
+# Pruebas de los recibos de pago por lote
+class RecibosLoteTests(TestCase):
+    def setUp(self):
+        usuario = User.objects.create_user('nomina', 'nomina@arpeta.com', 'clave')
+        usuario.groups.add(Group.objects.create(name=NOMINA))
+        self.client.force_login(usuario)
+        fecha = date(2025, 6, 2)
+        self.pagables = [crear_asignacion('AAA111', '11111111', fecha), crear_asignacion('BBB222', '22222222', fecha)]
+        crear_asignacion('CCC333', '33333333', fecha)
+        Asignacion.objects.filter(pk__in=[a.pk for a in self.pagables]).update(total_vueltas=16)
+
+    def pedir_recibos(self, formato):
+        return self.client.get(reverse('recibos_lote'), {
+            'desde': '2025-06-01', 'hasta': '2025-06-30', 'tipo_pago': 'arena', 'formato': formato
+        })
+
+    def test_zip_con_un_recibo_por_asignacion_pagable(self):
+        respuesta = self.pedir_recibos('zip')
+        self.assertEqual(respuesta['Content-Type'], 'application/zip')
+        with zipfile.ZipFile(BytesIO(b''.join(respuesta.streaming_content))) as archivo_zip:
+            nombres = archivo_zip.namelist()
+            self.assertEqual(nombres, [f"recibo_pago_{a.operador_id}_20250602_{a.pk}.pdf" for a in self.pagables])
+            self.assertTrue(archivo_zip.read(nombres[0]).startswith(b'%PDF'))
+
+    def test_pdf_unido_con_todos_los_recibos(self):
+        from pypdf import PdfReader
+
+        respuesta = self.pedir_recibos('pdf')
+        self.assertEqual(respuesta['Content-Type'], 'application/pdf')
+        contenido = b''.join(respuesta.streaming_content)
+        self.assertTrue(contenido.startswith(b'%PDF'))
+        self.assertGreaterEqual(len(PdfReader(BytesIO(contenido)).pages), len(self.pagables))
+
+    def test_pdf_unido_limita_la_cantidad_de_recibos(self):
+        for numero in range(MAX_RECIBOS_PDF_UNIDO):
+            crear_asignacion(f'L{numero:05d}', f'9{numero:07d}', date(2025, 6, 3))
+        Asignacion.objects.update(total_vueltas=16)
+        respuesta = self.pedir_recibos('pdf')
+        self.assertRedirects(respuesta, reverse('calcular_pago'), fetch_redirect_response=False)
+        self.assertIn('ZIP', str(list(get_messages(respuesta.wsgi_request))[0]))
+
+
+# Pruebas de la página de resultado del pago
+class ResultadoPagoTests(TestCase):
+    def test_formulario_de_pago_responde(self):
+        asignacion = crear_asignacion()
+        respuesta = self.client.get(reverse('resultado_pago'))
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(list(respuesta.context['asignaciones']), [asignacion])
+
+
+# Pruebas del motor de tarifas de pago
+class TarifasTests(TestCase):
+    def test_pagos_usan_la_tarifa_vigente_en_la_fecha(self):
+        cache.clear()
+        arena = TipoMaterial.objects.create(nombre='Arena')
+        polvillo = TipoMaterial.objects.create(nombre='Polvillo')
+        TarifaMaterial.objects.create(tipo_material=arena, tasa=12, vigente_desde=date(2000, 1, 1))
+        antes = crear_asignacion('AAA111', '11111111', date(2025, 5, 31))
+        despues = crear_asignacion('BBB222', '22222222', date(2025, 6, 2))
+        sin_tarifa = crear_asignacion('CCC333', '33333333', date(2025, 6, 2))
+        Asignacion.objects.filter(pk__in=[antes.pk, despues.pk]).update(tipo_material=arena)
+        Asignacion.objects.filter(pk=sin_tarifa.pk).update(tipo_material=polvillo)
+        self.assertEqual(tasa_vigente(arena.pk, date(2025, 6, 2)), 12)
+        with self.captureOnCommitCallbacks(execute=True):
+            TarifaMaterial.objects.create(tipo_material=arena, tasa=15, vigente_desde=date(2025, 6, 1))
+        self.assertEqual(tasa_vigente(arena.pk, date(2025, 6, 2)), 15)
+
+        with self.assertNumQueries(1):
+            pagos = list(calcular_pagos(Asignacion.objects.all()).order_by('-pago_divisas'))
+        # Cada vehículo de prueba carga 2 x 2 x 3 = 12 m³
+        self.assertEqual([(a.pk, float(a.pago_divisas)) for a in pagos],
+                         [(despues.pk, 180.0), (antes.pk, 144.0), (sin_tarifa.pk, 24.0)])
+
+
+# Pruebas de los gráficos de Plotly en caché
+class GraficosTests(TestCase):
+    def test_grafico_se_construye_una_vez_por_datos(self):
+        cache.clear()
+        construidos = []
+
+        def construir(datos):
+            construidos.append(datos)
+            return figura_estado_operadores(datos)
+
+        primero = renderizar_grafico('estado_operadores', {'activos': 3, 'inactivos': 1}, construir)
+        self.assertEqual(renderizar_grafico('estado_operadores', {'inactivos': 1, 'activos': 3}, construir), primero)
+        renderizar_grafico('estado_operadores', {'activos': 4, 'inactivos': 1}, construir)
+        self.assertEqual(len(construidos), 2)
+        # El fragmento no trae plotly.js: la plantilla lo carga como archivo estático
+        self.assertLess(len(primero), 20000)
+
+    def test_solo_se_publica_plotly_min_js(self):
+        finder = PlotlyFinder()
+        self.assertTrue(finder.find('plotly/plotly.min.js').endswith('plotly.min.js'))
+        self.assertEqual(finder.find('plotly/widgetbundle.js'), [])
+        self.assertEqual([ruta for ruta, _ in finder.list([])], ['plotly.min.js'])
+
+
+# Pruebas del tiempo de arranque de los workers
+class ArranqueTests(TestCase):
+    def test_worker_no_carga_librerias_pesadas(self):
+        # El comando falla si al arrancar se importan xhtml2pdf, pypdf, plotly, qrcode u otras librerías pesadas
+        call_command('benchmark_arranque', repeticiones=1, importaciones=0, stdout=StringIO())
@@ -0,0 +1,289 @@
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.template.loader import render_to_string
+from django.utils.module_loading import import_string
+from .pdf import html_a_pdf
+from .descargas import metadatos_descarga, olvidar_descarga
+from .imagenes import TAMANOS_FOTO, derivados_foto, ruta_derivado
+from .qr import imagen_qr
+
+
+logger = logging.getLogger(__name__)
+
+# Estados de un trabajo en segundo plano
+PENDIENTE = 'pendiente'
+EN_PROCESO = 'en_proceso'
+TERMINADO = 'terminado'
+ERROR = 'error'
+
+# Duración del estado de los trabajos en caché (el resultado terminado queda en el almacenamiento de archivos)
+DURACION_CACHE_TRABAJOS = 60 * 60
+
+# Carpeta de MEDIA_ROOT donde se guardan los PDF generados, nombrados por el hash de su contenido
+CARPETA_REPORTES = 'reportes'
+
+# Tiempo que el navegador reutiliza un PDF descargado sin revalidarlo (su nombre es el hash, nunca cambia)
+DURACION_NAVEGADOR_REPORTES = 60 * 60 * 24 * 30
+
+# Carpeta de MEDIA_ROOT donde se guardan los códigos QR de los vehículos
+CARPETA_QR = 'codigos_qr'
+
+# Tiempo que el navegador reutiliza un QR descargado sin revalidarlo. Es corto para que un QR regenerado
+# (por ejemplo, al cambiar FERNET_KEY) llegue pronto; después, la revalidación se responde con un 304.
+DURACION_NAVEGADOR_QR = 5 * 60
+
+
+# Backend que ejecuta los trabajos en un pool de hilos dentro del mismo proceso
+class BackendHilos:
+    def __init__(self):
+        self.ejecutor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'TRABAJOS_HILOS', 2), thread_name_prefix='arpeta-trabajos'
+        )
+
+    def encolar(self, funcion, *args):
+        self.ejecutor.submit(self.ejecutar, funcion, *args)
+
+    # Ejecuta un trabajo cerrando antes y después las conexiones a la base de datos vencidas o rotas del hilo,
+    # como hace Django al empezar y terminar cada petición (los hilos del pool viven lo que dura el proceso)
+    @staticmethod
+    def ejecutar(funcion, *args):
+        close_old_connections()
+        try:
+            return funcion(*args)
+        finally:
+            close_old_connections()
+
+
+# Backend que ejecuta los trabajos en el momento, dentro de la petición (pruebas y desarrollo local)
+class BackendInmediato:
+    def encolar(self, funcion, *args):
+        funcion(*args)
+
+
+_backends = {}
+
+
+# Función que devuelve el backend configurado en TRABAJOS_BACKEND (se crea una sola vez por proceso)
+def obtener_backend():
+    ruta = getattr(settings, 'TRABAJOS_BACKEND', 'arpeta.trabajos.BackendHilos')
+    if ruta not in _backends:
+        _backends[ruta] = import_string(ruta)()
+    return _backends[ruta]
+
+
+# Función que arma la clave de caché del estado de un trabajo
+def clave_trabajo(trabajo_id):
+    return f"trabajos:{trabajo_id}"
+
+
+# Función que devuelve la ruta del PDF de un trabajo dentro del almacenamiento. El rol que puede descargarlo
+# es parte de la ruta, así se sabe quién puede verlo aunque el estado no esté en la caché de este proceso.
+def ruta_reporte(trabajo_id, rol):
+    return f"{CARPETA_REPORTES}/{rol}/{trabajo_id}.pdf"
+
+
+# Función para saber si un identificador tiene la forma de los generados por solicitar_pdf (hash SHA-256)
+def trabajo_id_valido(trabajo_id):
+    return len(trabajo_id) == 64 and all(c in '0123456789abcdef' for c in trabajo_id)
+
+
+# Función para guardar el estado de un trabajo conservando el nombre del archivo
+def guardar_estado(trabajo_id, estado):
+    datos = cache.get(clave_trabajo(trabajo_id)) or {}
+    cache.set(clave_trabajo(trabajo_id), {**datos, 'estado': estado}, DURACION_CACHE_TRABAJOS)
+
+
+# Función que devuelve {'estado', 'nombre', 'rol'} de un trabajo que alguno de los `roles` puede ver, o None si
+# no se conoce o es de otro rol. Un PDF ya guardado cuenta como terminado aunque su estado no esté en la caché
+# de este proceso.
+def estado_trabajo(trabajo_id, roles):
+    datos = cache.get(clave_trabajo(trabajo_id))
+    if datos is not None and datos.get('rol') not in roles:
+        return None
+    for rol in [datos['rol']] if datos is not None else sorted(roles):
+        if default_storage.exists(ruta_reporte(trabajo_id, rol)):
+            return {'nombre': f"{trabajo_id}.pdf", **(datos or {}), 'rol': rol, 'estado': TERMINADO}
+    return datos
+
+
+# Trabajo que convierte el HTML en PDF y lo guarda en el almacenamiento de archivos
+def generar_pdf(trabajo_id, rol, html):
+    guardar_estado(trabajo_id, EN_PROCESO)
+    try:
+        contenido = html_a_pdf(html)
+        if not default_storage.exists(ruta_reporte(trabajo_id, rol)):
+            default_storage.save(ruta_reporte(trabajo_id, rol), ContentFile(contenido))
+    except Exception:
+        logger.exception("Error al generar el PDF del trabajo %s", trabajo_id)
+        guardar_estado(trabajo_id, ERROR)
+    else:
+        guardar_estado(trabajo_id, TERMINADO)
+
+
+# Función que pide un PDF a partir de una plantilla y devuelve el id del trabajo.
+# La plantilla se renderiza en la petición (las consultas quedan fuera del hilo del trabajo) y el id es el hash
+# del HTML, sin los campos `volatiles` (por ejemplo la fecha de generación): si el mismo reporte ya se generó,
+# se reutiliza el archivo guardado y no se encola nada. Solo los usuarios con el `rol` indicado pueden consultar
+# el estado del trabajo y descargar el PDF.
+def solicitar_pdf(plantilla, contexto, nombre, rol, volatiles=()):
+    html = render_to_string(plantilla, contexto)
+    if volatiles:
+        html_clave = render_to_string(plantilla, {k: v for k, v in contexto.items() if k not in volatiles})
+    else:
+        html_clave = html
+    trabajo_id = hashlib.sha256(f"{rol}\n{plantilla}\n{html_clave}".encode('utf-8')).hexdigest()
+    if default_storage.exists(ruta_reporte(trabajo_id, rol)):
+        return trabajo_id
+    datos = {'estado': PENDIENTE, 'nombre': nombre, 'rol': rol}
+    if cache.add(clave_trabajo(trabajo_id), datos, DURACION_CACHE_TRABAJOS):
+        obtener_backend().encolar(generar_pdf, trabajo_id, rol, html)
+    elif (cache.get(clave_trabajo(trabajo_id)) or {}).get('estado') == ERROR:
+        cache.set(clave_trabajo(trabajo_id), datos, DURACION_CACHE_TRABAJOS)
+        obtener_backend().encolar(generar_pdf, trabajo_id, rol, html)
+    return trabajo_id
+
+
+# Función que devuelve la clave Fernet con la que se encriptan las placas de los QR
+def clave_fernet():
+    try:
+        return settings.FERNET_KEY
+    except AttributeError:
+        raise ImproperlyConfigured(
+            "La clave FERNET_KEY no está configurada en settings.py. "
+            "No se puede generar el código QR encriptado."
+        )
+
+
+# Función que devuelve la ruta del código QR de un vehículo dentro del almacenamiento
+def ruta_qr(placa):
+    return f"{CARPETA_QR}/qr_vehiculo_{placa}.png"
+
+
+# Función que guarda el PNG del QR de un vehículo (reemplazando el anterior) y devuelve su ruta.
+# Solo escribe el archivo; el campo codigo_qr lo actualiza quien la llama.
+def guardar_qr(placa, contenido, anterior=None):
+    ruta = ruta_qr(placa)
+    if default_storage.exists(ruta):
+        default_storage.delete(ruta)
+    ruta = default_storage.save(ruta, ContentFile(contenido))
+    if anterior and anterior != ruta and default_storage.exists(anterior):
+        default_storage.delete(anterior)
+    olvidar_descarga(f"qr:{placa}")
+    return ruta
+
+
+# Función que devuelve los metadatos de descarga (nombre, ETag y fecha) del código QR de un vehículo
+def metadatos_qr(placa):
+    from .models import Vehiculo
+
+    return metadatos_descarga(
+        f"qr:{placa}", lambda: Vehiculo.objects.filter(placa=placa).values_list('codigo_qr', flat=True).first()
+    )
+
+
+# Trabajo que genera el código QR de un vehículo y lo asigna con un UPDATE (sin volver a llamar a save)
+def generar_qr(placa):
+    from .models import Vehiculo
+
+    try:
+        anterior = Vehiculo.objects.filter(placa=placa).values_list('codigo_qr', flat=True).first()
+        if anterior is None:
+            return
+        ruta = guardar_qr(placa, imagen_qr(placa, clave_fernet()), anterior)
+        Vehiculo.objects.filter(placa=placa).update(codigo_qr=ruta)
+    except Exception:
+        logger.exception("Error al generar el código QR del vehículo %s", placa)
+
+
+# Función que encola la generación del QR de un vehículo cuando se confirma la transacción que lo guardó
+def encolar_qr(placa):
+    clave_fernet()
+    transaction.on_commit(lambda: obtener_backend().encolar(generar_qr, placa))
+
+
+# Función que guarda los derivados de una foto (reemplazando los anteriores con el mismo nombre)
+# y anota en las filas que la usan que ya están disponibles
+def guardar_derivados(nombre, derivados):
+    for tamano, contenido in derivados.items():
+        ruta = ruta_derivado(nombre, tamano)
+        if default_storage.exists(ruta):
+            default_storage.delete(ruta)
+        default_storage.save(ruta, ContentFile(contenido))
+    marcar_derivados(nombre)
+
+
+# Función que anota la foto en foto_derivada de los operadores y vehículos que la usan, para que los listados
+# muestren sus derivados sin preguntar al almacenamiento si existen
+def marcar_derivados(nombre):
+    from .models import Operador, Vehiculo
+
+    Operador.objects.filter(foto_operador=nombre).exclude(foto_derivada=nombre).update(foto_derivada=nombre)
+    Vehiculo.objects.filter(foto_vehiculo=nombre).exclude(foto_derivada=nombre).update(foto_derivada=nombre)
+
+
+# Función para saber si ya están todos los derivados de una foto
+def derivados_completos(nombre):
+    return all(default_storage.exists(ruta_derivado(nombre, tamano)) for tamano in TAMANOS_FOTO)
+
+
+# Función que borra los derivados de una foto
+def borrar_derivados(nombre):
+    for tamano in TAMANOS_FOTO:
+        ruta = ruta_derivado(nombre, tamano)
+        if default_storage.exists(ruta):
+            default_storage.delete(ruta)
+
+
+# Función que devuelve la URL de un derivado de la foto, o la de la foto original mientras sus derivados no se
+# hayan generado (`derivada` es la foto con derivados anotada en la fila). No consulta el almacenamiento.
+def url_derivado(foto, tamano, derivada):
+    if not foto:
+        return None
+    if derivada != foto.name:
+        return foto.url
+    return default_storage.url(ruta_derivado(foto.name, tamano))
+
+
+# Trabajo que genera los derivados de una foto, si todavía no están
+def generar_derivados(nombre):
+    try:
+        if derivados_completos(nombre):
+            marcar_derivados(nombre)
+            return
+        if not default_storage.exists(nombre):
+            return
+        with default_storage.open(nombre, 'rb') as archivo:
+            guardar_derivados(nombre, derivados_foto(archivo.read()))
+    except Exception:
+        logger.exception("Error al generar los derivados de la foto %s", nombre)
+
+
+# Función que encola la generación de los derivados de una foto cuando se confirma la transacción que la guardó
+def encolar_derivados(nombre):
+    transaction.on_commit(lambda: obtener_backend().encolar(generar_derivados, nombre))
+
+
+# Trabajo que borra del almacenamiento los archivos indicados y los derivados de cada uno
+def borrar_archivos(nombres):
+    for nombre in nombres:
+        try:
+            if default_storage.exists(nombre):
+                default_storage.delete(nombre)
+            borrar_derivados(nombre)
+        except Exception:
+            logger.exception("Error al borrar el archivo %s", nombre)
+
+
+# Función que encola el borrado de archivos para cuando se confirme la transacción que borró o reemplazó sus filas.
+# Si la transacción se revierte, los archivos se conservan. Los nombres vacíos se ignoran.
+def encolar_borrado(*nombres):
+    nombres = [nombre for nombre in nombres if nombre]
+    if nombres:
+        transaction.on_commit(lambda: obtener_backend().encolar(borrar_archivos, nombres))
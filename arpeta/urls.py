@@ -1,56 +1,64 @@
 from django.urls import path
-from . import views
+from .forms import RestablecerContrasenaForm
+from .views import administracion, cuentas, escaneo, gerente, nomina, reportes
 
 from django.contrib.auth import views as auth_views
 
 urlpatterns = [
-    path('', views.inicio_redirect, name='inicio_redirect'),
-    path('login/', views.login_view, name='login'),
-    path('logout/', views.logout_view, name='logout'),
+    path('', cuentas.inicio_redirect, name='inicio_redirect'),
+    path('login/', cuentas.login_view, name='login'),
+    path('logout/', cuentas.logout_view, name='logout'),
 
 
-    path('reset_password/', auth_views.PasswordResetView.as_view(template_name="password_reset/password_reset_form.html", email_template_name="password_reset/password_reset_email.html", html_email_template_name="password_reset/password_reset_email.html"), name='password_reset'),
+    path('reset_password/', auth_views.PasswordResetView.as_view(form_class=RestablecerContrasenaForm, template_name="password_reset/password_reset_form.html", email_template_name="password_reset/password_reset_email.html", html_email_template_name="password_reset/password_reset_email.html"), name='password_reset'),
     path('reset_password_done/', auth_views.PasswordResetDoneView.as_view(template_name="password_reset/password_reset_done.html"), name='password_reset_done'),
     path('reset/<uidb64>/<token>/', auth_views.PasswordResetConfirmView.as_view(template_name="password_reset/password_reset_confirm.html"), name='password_reset_confirm'),
     path('reset_password_complete/', auth_views.PasswordResetCompleteView.as_view(template_name="password_reset/password_reset_complete.html"), name='password_reset_complete'),
 
 
-    path('administracion', views.inicio_administracion, name='inicio_administracion'),
-    path('administracion/operadores', views.operadores, name='operadores'),
-    path('administracion/operadores/crear_operador', views.crear_operador, name='crear_operador'),
-    path('administracion/operadores/editar_operador/<str:cedula>/', views.editar_operador, name='editar_operador'),
-    path('administracion/operadores/borrar_operador/<str:cedula>/', views.borrar_operador, name='borrar_operador'),
-    path('administracion/operadores/detalles/<str:cedula>/', views.detalles_operador, name='detalles_operador'),
-
-    path('administracion/vehiculos', views.vehiculos, name='vehiculos'),
-    path('administracion/vehiculos/crear_vehiculo', views.crear_vehiculo, name='crear_vehiculo'),
-    path('administracion/vehiculos/editar_vehiculo/<str:placa>/', views.editar_vehiculo, name='editar_vehiculo'),
-    path('administracion/vehiculos/borrar_vehiculo/<str:placa>/', views.borrar_vehiculo, name='borrar_vehiculo'),
-    path('administracion/crear_modelo_marca/', views.crear_modelo_marca, name='crear_modelo_marca'),
-    path('administracion/descargar_qr/<str:placa>/', views.descargar_qr, name='descargar_qr'),
-
-    path('administracion/enviar_qr_correo/<str:placa>', views.enviar_qr_correo, name='enviar_qr_correo'),
-
-    path('administracion/asignaciones', views.asignaciones, name='asignaciones'),
-    path('administracion/asignaciones/crear_asignacion', views.crear_asignacion, name='crear_asignacion'),
-    path('administracion/asignaciones/editar_asignacion/<int:id>/', views.editar_asignacion, name='editar_asignacion'),
-    path('administracion/asignaciones/borrar_asignacion/<int:id>/', views.borrar_asignacion, name='borrar_asignacion'),
-    path("administracion/crear_tipo_material/", views.crear_tipo_material, name="crear_tipo_material"),
-    path('administracion/cambiar_estado/<int:id>/', views.cambiar_estado, name='cambiar_estado'),
-    path("administracion/registrar_vuelta/", views.registrar_vuelta, name="registrar_vuelta"),
-
-    path('gerente/inicio_gerente.html', views.inicio_gerente, name='inicio_gerente'),
-    path('gerente/base_gerente.html', views.base_gerente, name='base_gerente'),
-    path('gerente/reportes_gerente.html', views.reportes_gerente, name='reportes_gerente'),
-    path('gerente/pagos_gerente.html', views.pagos_gerente, name='pagos_gerente'),
-    path('gerente/lista_asignaciones.html', views.lista_asignaciones, name='lista_asignaciones'),
-    path('gerente/asignaciones_gerente.html',views.dashboard_asignaciones, name='asignaciones_gerente'),
-    path('gerente/vehiculos_gerente.html', views.VehiculosGerenteView.as_view(), name='vehiculos_gerente'),
-    path('gerente/operadores', views.OperadoresGerenteView.as_view(), name='operadores_gerente'),  
+    path('administracion', administracion.inicio_administracion, name='inicio_administracion'),
+    path('administracion/operadores', administracion.operadores, name='operadores'),
+    path('administracion/operadores/crear_operador', administracion.crear_operador, name='crear_operador'),
+    path('administracion/operadores/editar_operador/<str:cedula>/', administracion.editar_operador, name='editar_operador'),
+    path('administracion/operadores/borrar_operador/<str:cedula>/', administracion.borrar_operador, name='borrar_operador'),
+    path('administracion/operadores/detalles/<str:cedula>/', administracion.detalles_operador, name='detalles_operador'),
+
+    path('administracion/vehiculos', administracion.vehiculos, name='vehiculos'),
+    path('administracion/vehiculos/crear_vehiculo', administracion.crear_vehiculo, name='crear_vehiculo'),
+    path('administracion/vehiculos/editar_vehiculo/<str:placa>/', administracion.editar_vehiculo, name='editar_vehiculo'),
+    path('administracion/vehiculos/borrar_vehiculo/<str:placa>/', administracion.borrar_vehiculo, name='borrar_vehiculo'),
+    path('administracion/crear_modelo_marca/', administracion.crear_modelo_marca, name='crear_modelo_marca'),
+    path('administracion/descargar_qr/<str:placa>/', administracion.descargar_qr, name='descargar_qr'),
+    path('administracion/vehiculos/exportar_qr/', administracion.exportar_qr, name='exportar_qr'),
+
+    path('administracion/enviar_qr_correo/<str:placa>', administracion.enviar_qr_correo, name='enviar_qr_correo'),
+    path('administracion/asignaciones/enviar_qr_asignados/', administracion.enviar_qr_asignados, name='enviar_qr_asignados'),
+
+    path('administracion/asignaciones', administracion.asignaciones, name='asignaciones'),
+    path('administracion/asignaciones/crear_asignacion', administracion.crear_asignacion, name='crear_asignacion'),
+    path('administracion/asignaciones/editar_asignacion/<int:id>/', administracion.editar_asignacion, name='editar_asignacion'),
+    path('administracion/asignaciones/borrar_asignacion/<int:id>/', administracion.borrar_asignacion, name='borrar_asignacion'),
+    path("administracion/crear_tipo_material/", administracion.crear_tipo_material, name="crear_tipo_material"),
+    path('administracion/cambiar_estado/<int:id>/', administracion.cambiar_estado, name='cambiar_estado'),
+    path("administracion/registrar_vuelta/", escaneo.registrar_vuelta, name="registrar_vuelta"),
+    path("administracion/registrar_vuelta_async/", escaneo.registrar_vuelta_async, name="registrar_vuelta_async"),
+    path("administracion/registrar_vueltas_lote/", escaneo.registrar_vueltas_lote, name="registrar_vueltas_lote"),
+
+    path('gerente/inicio_gerente.html', gerente.inicio_gerente, name='inicio_gerente'),
+    path('gerente/base_gerente.html', gerente.base_gerente, name='base_gerente'),
+    path('gerente/reportes_gerente.html', gerente.reportes_gerente, name='reportes_gerente'),
+    path('gerente/pagos_gerente.html', gerente.pagos_gerente, name='pagos_gerente'),
+    path('gerente/lista_asignaciones.html', gerente.lista_asignaciones, name='lista_asignaciones'),
+    path('gerente/asignaciones_gerente.html',gerente.dashboard_asignaciones, name='asignaciones_gerente'),
+    path('gerente/vehiculos_gerente.html', gerente.VehiculosGerenteView.as_view(), name='vehiculos_gerente'),
+    path('gerente/operadores', gerente.OperadoresGerenteView.as_view(), name='operadores_gerente'),  
+    path('reportes/<str:trabajo_id>/estado/', reportes.estado_reporte, name='estado_reporte'),
+    path('reportes/<str:trabajo_id>/descargar/', reportes.descargar_reporte, name='descargar_reporte'),
     
-    path('nomina/inicio_nomina.html', views.inicio_nomina, name='inicio_nomina'),
-    path('nomina/calcular_pago.html', views. calcular_pago, name='calcular_pago'),
-    path('nomina/resultado_pago.html', views.PagoOperadorForm, name='resultado_pago'),
-    path('nomina/recibo_pago.html', views.generar_recibo_pdf, name='generar_recibo_pdf'),
-    path('nomina/base_nomina.html', views.base_nomina, name='base_nomina')
+    path('nomina/inicio_nomina.html', nomina.inicio_nomina, name='inicio_nomina'),
+    path('nomina/calcular_pago.html', nomina.calcular_pago, name='calcular_pago'),
+    path('nomina/resultado_pago.html', nomina.PagoOperadorForm, name='resultado_pago'),
+    path('nomina/recibo_pago.html', nomina.generar_recibo_pdf, name='generar_recibo_pdf'),
+    path('nomina/recibos_lote/', nomina.recibos_lote, name='recibos_lote'),
+    path('nomina/base_nomina.html', nomina.base_nomina, name='base_nomina')
 ]
\ No newline at end of file
@@ -0,0 +1,3 @@
+# Vistas de la aplicación, separadas por rol: cuentas (inicio de sesión), administracion, escaneo (registro de vueltas
+# con el QR), gerente, nomina y reportes (PDF generados en segundo plano). Este paquete no importa sus módulos para
+# que el servicio de escaneo (sistema/urls_escaneo.py) cargue solo las vistas que usa.
@@ -0,0 +1,437 @@
+import json
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.core.files.storage import default_storage
+from django.db.models import Count
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
+from django.views.decorators.http import require_POST
+from ..models import Operador, Vehiculo, TipoMaterial, Asignacion, Marca, Modelo
+from ..forms import OperadorForm, VehiculoForm, AsignacionForm, FiltroBusquedaForm, ExportarQrForm
+from ..busqueda import filtrar_asignaciones, filtrar_operadores, filtrar_vehiculos
+from ..roles import is_administracion
+from ..paginacion import PaginadorCursor, tamano_pagina
+from ..etiquetas import pdf_qr, zip_qr
+from ..correos import correo_qr, encolar_correos
+from ..descargas import olvidar_descarga, respuesta_descarga
+from ..trabajos import DURACION_NAVEGADOR_QR, encolar_borrado, metadatos_qr
+
+
+# Vista para la página de inicio de administración
+@login_required
+@user_passes_test(is_administracion)
+def inicio_administracion(request):
+    return render(request, 'administracion/inicio_administracion.html')
+
+
+# Vista para listar operadores
+@login_required
+@user_passes_test(is_administracion)
+def operadores(request):
+    filtro = FiltroBusquedaForm(request.GET)
+    operadores = filtrar_operadores(Operador.objects.all(), filtro.filtros())\
+        .annotate(num_asignaciones=Count('asignacion'))
+    paginador = PaginadorCursor(operadores, ['nombre', 'cedula'], tamano_pagina(request), estimar_total=True)
+    operadores = paginador.obtener_pagina(request.GET.get('despues'), request.GET.get('antes'))
+    return render(request, 'administracion/operadores/index_operador.html', {'operadores': operadores, 'filtro': filtro})
+
+
+# Vista para crear un operador
+@login_required
+@user_passes_test(is_administracion)
+def crear_operador(request):
+    if request.method == "POST":
+        formulario = OperadorForm(request.POST, request.FILES)
+        if formulario.is_valid():
+            formulario.save()
+            return redirect('operadores')
+    else:
+        formulario = OperadorForm()
+    return render(request, 'administracion/operadores/crear_operador.html', {'formulario': formulario})
+
+
+# Vista para editar un operador
+@login_required
+@user_passes_test(is_administracion)
+def editar_operador(request, cedula):
+    operador = get_object_or_404(Operador, cedula=cedula)
+    if request.method == "POST":
+        foto_anterior = operador.foto_operador.name
+        formulario = OperadorForm(request.POST, request.FILES, instance=operador)
+        if formulario.is_valid():
+            formulario.save()
+            if operador.foto_operador.name != foto_anterior:
+                encolar_borrado(foto_anterior)
+            messages.success(request, f"Operador {operador.nombre} {operador.apellido} actualizado correctamente.")
+            return redirect('operadores')
+    else:
+        formulario = OperadorForm(instance=operador)
+    return render(request, 'administracion/operadores/editar_operador.html', {
+        'formulario': formulario,
+        'operador': operador
+    })
+
+
+# Vista para borrar un operador
+@login_required
+@user_passes_test(is_administracion)
+def borrar_operador(request, cedula):
+    operador = get_object_or_404(Operador, cedula=cedula)
+    if Asignacion.objects.filter(operador=operador).exists():
+        messages.error(request, f"El operador {operador.nombre} {operador.apellido} (Cédula: {operador.cedula}) no puede ser eliminado porque tiene asignaciones registradas.")
+        return redirect('operadores')
+    try:
+        operador.delete()
+        messages.success(request, f"Operador {operador.nombre} {operador.apellido} eliminado correctamente.")
+    except Exception as e:
+        messages.error(request, f"Error al eliminar el operador {operador.nombre} {operador.apellido}: {str(e)}")
+    return redirect('operadores')
+
+
+# Vista para listar vehículos
+@login_required
+@user_passes_test(is_administracion)
+def vehiculos(request):
+    filtro = FiltroBusquedaForm(request.GET)
+    vehiculos = filtrar_vehiculos(Vehiculo.objects.select_related('modelo__marca'), filtro.filtros())\
+        .annotate(num_asignaciones=Count('asignacion'))
+    paginador = PaginadorCursor(vehiculos, ['modelo', 'placa'], tamano_pagina(request), estimar_total=True)
+    vehiculos = paginador.obtener_pagina(request.GET.get('despues'), request.GET.get('antes'))
+    return render(request, 'administracion/vehiculos/index_vehiculo.html', {'vehiculos': vehiculos, 'filtro': filtro})
+
+
+# Vista para crear un vehículo
+@login_required
+@user_passes_test(is_administracion)
+def crear_vehiculo(request):
+    if request.method == "POST":
+        formulario = VehiculoForm(request.POST, request.FILES)
+        if formulario.is_valid():
+            formulario.save()
+            return redirect('vehiculos')
+    else:
+        formulario = VehiculoForm()
+    return render(request, 'administracion/vehiculos/crear_vehiculo.html', {'formulario': formulario})
+
+
+# Vista para crear una marca y modelo
+@login_required
+@user_passes_test(is_administracion)
+@require_POST
+def crear_modelo_marca(request):
+    try:
+        data = json.loads(request.body)
+        marca_nombre = data.get('marca', '').strip()
+        modelo_nombre = data.get('modelo', '').strip()
+        if not marca_nombre or not modelo_nombre:
+            return JsonResponse({'success': False, 'errors': 'La marca y el modelo no pueden estar vacíos.'}, status=400)
+        marca_obj, created = Marca.objects.get_or_create(
+            nombre__iexact=marca_nombre, 
+            defaults={'nombre': marca_nombre.capitalize()}
+        )
+        if Modelo.objects.filter(marca=marca_obj, nombre__iexact=modelo_nombre).exists():
+            return JsonResponse({'success': False, 'errors': 'Este modelo ya existe para esta marca.'}, status=400)
+        nuevo_modelo = Modelo.objects.create(marca=marca_obj, nombre=modelo_nombre.capitalize())
+        return JsonResponse({
+            'success': True,
+            'id': nuevo_modelo.id,
+            'marca': marca_obj.nombre,
+            'modelo': nuevo_modelo.nombre
+        })
+    except Exception as e:
+        return JsonResponse({'success': False, 'errors': str(e)}, status=500)
+
+
+# Vista para editar un vehículo
+@login_required
+@user_passes_test(is_administracion)
+def editar_vehiculo(request, placa):
+    vehiculo = get_object_or_404(Vehiculo, placa=placa)
+    if Asignacion.objects.filter(vehiculo=vehiculo).exists():
+        messages.error(request, f"El vehículo con placa {vehiculo.placa} no puede ser editado porque tiene asignaciones registradas.")
+        return redirect('vehiculos')
+    if request.method == 'POST':
+        foto_anterior = vehiculo.foto_vehiculo.name
+        formulario = VehiculoForm(request.POST, request.FILES, instance=vehiculo)
+        if formulario.is_valid():
+            formulario.save()
+            if vehiculo.foto_vehiculo.name != foto_anterior:
+                encolar_borrado(foto_anterior)
+            messages.success(request, f"Vehículo con placa {vehiculo.placa} actualizado correctamente.")
+            return redirect('vehiculos')
+    else:
+        formulario = VehiculoForm(instance=vehiculo)
+    return render(request, 'administracion/vehiculos/editar_vehiculo.html', {'formulario': formulario, 'vehiculo': vehiculo})
+
+
+# Vista para borrar un vehículo
+@login_required
+@user_passes_test(is_administracion)
+def borrar_vehiculo(request, placa):
+    vehiculo = get_object_or_404(Vehiculo, placa=placa)
+    if Asignacion.objects.filter(vehiculo=vehiculo).exists():
+        messages.error(request, f"El vehículo con placa {vehiculo.placa} no puede ser eliminado porque tiene asignaciones registradas.")
+        return redirect('vehiculos')
+    try:
+        vehiculo.delete()
+        messages.success(request, f"Vehículo con placa {vehiculo.placa} eliminado correctamente.")
+    except Exception as e:
+        messages.error(request, f"Error al eliminar el vehículo {vehiculo.placa}: {str(e)}")
+    return redirect('vehiculos')
+
+
+# Vista para descargar el código QR de un vehículo
+@login_required
+@user_passes_test(is_administracion)
+def descargar_qr(request, placa):
+    datos = metadatos_qr(placa)
+    if datos is None:
+        raise Http404("El QR no existe.")
+    try:
+        return respuesta_descarga(request, datos, max_age=DURACION_NAVEGADOR_QR)
+    except FileNotFoundError:
+        # El archivo se borró entre la lectura de sus metadatos y el envío
+        olvidar_descarga(f"qr:{placa}")
+        raise Http404("El QR no existe.")
+
+
+# Vista para exportar los códigos QR de los vehículos filtrados como ZIP de PNG o como hoja de etiquetas en PDF
+@login_required
+@user_passes_test(is_administracion)
+def exportar_qr(request):
+    formulario = ExportarQrForm(request.GET)
+    if not formulario.is_valid():
+        messages.error(request, "Formato de exportación no válido.")
+        return redirect('vehiculos')
+    vehiculos = filtrar_vehiculos(Vehiculo.objects.all(), FiltroBusquedaForm(request.GET).filtros())
+    if not vehiculos.exists():
+        messages.error(request, "No hay vehículos que coincidan con los filtros.")
+        return redirect('vehiculos')
+    if formulario.cleaned_data['formato'] == 'pdf':
+        respuesta = StreamingHttpResponse(pdf_qr(vehiculos), content_type='application/pdf')
+        respuesta['Content-Disposition'] = 'attachment; filename="codigos_qr.pdf"'
+    else:
+        respuesta = StreamingHttpResponse(zip_qr(vehiculos), content_type='application/zip')
+        respuesta['Content-Disposition'] = 'attachment; filename="codigos_qr.zip"'
+    return respuesta
+
+
+# Vista para listar asignaciones
+@login_required
+@user_passes_test(is_administracion)
+def asignaciones(request):
+    filtro = FiltroBusquedaForm(request.GET)
+    asignaciones = filtrar_asignaciones(
+        Asignacion.objects.select_related('operador', 'vehiculo__modelo__marca', 'tipo_material'),
+        filtro.filtros()
+    )
+    paginador = PaginadorCursor(asignaciones, ['id'], tamano_pagina(request), estimar_total=True)
+    asignaciones = paginador.obtener_pagina(request.GET.get('despues'), request.GET.get('antes'))
+    return render(request, 'administracion/asignaciones/index_asignacion.html', {'asignaciones': asignaciones, 'filtro': filtro})
+
+
+# Vista para crear una asignación
+@login_required
+@user_passes_test(is_administracion)
+def crear_asignacion(request):
+    if request.method == 'POST':
+        formulario = AsignacionForm(request.POST)
+        if formulario.is_valid():
+            operador_seleccionado = formulario.cleaned_data['operador']
+            vehiculo_seleccionado = formulario.cleaned_data['vehiculo']
+            tipo_material_seleccionado = formulario.cleaned_data.get('tipo_material')
+            fecha_actual = timezone.localtime(timezone.now()).date()
+            otra_asignacion_activa_operador = Asignacion.objects.filter(
+                operador=operador_seleccionado,
+                estado=True,
+                fecha_asignacion=fecha_actual
+            ).exclude(vehiculo=vehiculo_seleccionado).first()
+            if otra_asignacion_activa_operador is not None:
+                messages.error(request, f"El operador {operador_seleccionado} ya tiene una asignación activa con otro vehículo para hoy ({otra_asignacion_activa_operador.vehiculo_id}).")
+                return render(request, 'administracion/asignaciones/crear_asignacion.html', {
+                    'formulario': formulario,
+                    'operadores': Operador.objects.all(),
+                    'vehiculos': Vehiculo.objects.all(),
+                    'tipos_material': TipoMaterial.objects.all()
+                })
+            otra_asignacion_activa_vehiculo = Asignacion.objects.filter(
+                vehiculo=vehiculo_seleccionado,
+                estado=True,
+                fecha_asignacion=fecha_actual
+            ).exclude(operador=operador_seleccionado).select_related('operador').first()
+            if otra_asignacion_activa_vehiculo is not None:
+                messages.error(request, f"El vehículo {vehiculo_seleccionado} ya tiene una asignación activa con otro operador para hoy ({otra_asignacion_activa_vehiculo.operador}).")
+                return render(request, 'administracion/asignaciones/crear_asignacion.html', {
+                    'formulario': formulario,
+                    'operadores': Operador.objects.all(),
+                    'vehiculos': Vehiculo.objects.all(),
+                    'tipos_material': TipoMaterial.objects.all()
+                })
+            asignacion_existente, created = Asignacion.objects.get_or_create(
+                operador=operador_seleccionado,
+                vehiculo=vehiculo_seleccionado,
+                fecha_asignacion=fecha_actual,
+                defaults={
+                    'tipo_material': tipo_material_seleccionado,
+                    'estado': True,
+                    'total_vueltas': 0,
+                }
+            )
+            if not created:
+                if asignacion_existente.estado:
+                    messages.warning(request, f"La asignación para el operador {operador_seleccionado} y el vehículo {vehiculo_seleccionado} ya está activa para hoy.")
+                else:
+                    asignacion_existente.estado = True
+                    asignacion_existente.tipo_material = tipo_material_seleccionado
+                    asignacion_existente.total_vueltas = 0
+                    asignacion_existente.save()
+                    messages.success(request, f"La asignación existente para {operador_seleccionado} y {vehiculo_seleccionado} ha sido reactivada y actualizada para hoy.")
+            else:
+                messages.success(request, "Nueva asignación creada exitosamente.")
+            
+            return redirect('asignaciones')
+        else:
+            messages.error(request, "Por favor, corrige los errores en el formulario.")
+    else:
+        formulario = AsignacionForm()
+    return render(request, 'administracion/asignaciones/crear_asignacion.html', {
+        'formulario': formulario,
+        'operadores': Operador.objects.all(),
+        'vehiculos': Vehiculo.objects.all(),
+        'tipos_material': TipoMaterial.objects.all()
+    })
+
+
+# Vista para crear un tipo de material
+@login_required
+@user_passes_test(is_administracion)
+def crear_tipo_material(request):
+    if request.method == "POST":
+        data = json.loads(request.body)
+        nombre = data.get("nombre", "").strip()
+        if nombre:
+            material, creado = TipoMaterial.objects.get_or_create(nombre=nombre)
+            return JsonResponse({"success": True, "id": material.id, "nombre": material.nombre})
+    return JsonResponse({"success": False})
+
+
+# Vista para editar una asignación
+@login_required
+@user_passes_test(is_administracion)
+def editar_asignacion(request, id):
+    asignacion = get_object_or_404(Asignacion, id=id)
+    if asignacion.total_vueltas > 0:
+        messages.error(request, f"La asignación ID {asignacion.id} no puede ser editada porque tiene {asignacion.total_vueltas} vuelta(s) registrada(s). Para editar, el total de vueltas debe ser cero.")
+        return redirect('asignaciones')
+    if request.method == 'POST':
+        formulario = AsignacionForm(request.POST, instance=asignacion)
+        if formulario.is_valid():
+            formulario.save()
+            messages.success(request, f"Asignación ID {asignacion.id} actualizada correctamente.")
+            return redirect('asignaciones')
+    else:
+        formulario = AsignacionForm(instance=asignacion)
+    return render(request, 'administracion/asignaciones/editar_asignacion.html', {'formulario': formulario, 'asignacion': asignacion})
+
+
+# Vista para borrar una asignación
+@login_required
+@user_passes_test(is_administracion)
+def borrar_asignacion(request, id):
+    asignacion = get_object_or_404(Asignacion, id=id)
+    if asignacion.total_vueltas > 0:
+        messages.error(request, f"La asignación ID {asignacion.id} no puede ser eliminada porque tiene {asignacion.total_vueltas} vuelta(s) registrada(s). Para eliminar, el total de vueltas debe ser cero.")
+        return redirect('asignaciones')
+    try:
+        asignacion.delete()
+        messages.success(request, f"Asignación ID {asignacion.id} eliminada correctamente.")
+    except Exception as e:
+        messages.error(request, f"Error al eliminar la asignación ID {asignacion.id}: {str(e)}")
+    return redirect('asignaciones')
+
+
+# Vista para cambiar el estado de una asignación
+@login_required
+@user_passes_test(is_administracion)
+def cambiar_estado(request, id):
+    asignacion = get_object_or_404(Asignacion, id=id)
+    asignacion.estado = not asignacion.estado
+    asignacion.save()
+    return redirect('asignaciones')
+
+
+# Vista para enviar el código QR de un vehículo por correo electrónico. El correo queda en la cola de salida
+# y se envía en segundo plano, así la petición no espera al servidor SMTP.
+@login_required
+@user_passes_test(is_administracion)
+def enviar_qr_correo(request, placa):
+    vehiculo = get_object_or_404(Vehiculo, placa=placa)
+    if request.method == 'POST':
+        correo_destino = request.POST.get('correo')
+        if not correo_destino:
+            messages.error(request, 'No se proporcionó una dirección de correo válida.')
+            return JsonResponse({'message': 'No se proporcionó una dirección de correo válida.'}, status=400)
+        operador = Operador.objects.filter(correo__iexact=correo_destino).first()
+        nombre_completo_operador = f"{operador.nombre} {operador.apellido}" if operador else "Operador"
+        if vehiculo.codigo_qr and default_storage.exists(vehiculo.codigo_qr.name):
+            encolar_correos([correo_qr(vehiculo, correo_destino, nombre_completo_operador)])
+            messages.success(request, '¡El código QR se enviará por correo en unos instantes!')
+            return JsonResponse({'message': 'Correo en cola de envío.'})
+        else:
+            messages.error(request, 'El vehículo no tiene un código QR asociado.')
+            return JsonResponse({'message': 'El vehículo no tiene código QR.'}, status=400)
+    else:
+        messages.warning(request, 'Acceso no permitido.')
+        return JsonResponse({'message': 'Método no permitido.'}, status=405)
+
+
+# Vista para enviar por correo, de una vez, el código QR de su vehículo a cada operador con una asignación activa hoy
+@login_required
+@user_passes_test(is_administracion)
+@require_POST
+def enviar_qr_asignados(request):
+    asignaciones = (
+        Asignacion.objects.filter(estado=True, fecha_asignacion=timezone.localdate())
+        .exclude(operador__correo='')
+        .select_related('operador', 'vehiculo')
+    )
+    correos = []
+    sin_qr = 0
+    for asignacion in asignaciones:
+        vehiculo, operador = asignacion.vehiculo, asignacion.operador
+        if not vehiculo.codigo_qr:
+            sin_qr += 1
+            continue
+        correos.append(correo_qr(vehiculo, operador.correo, f"{operador.nombre} {operador.apellido}"))
+    if correos:
+        encolar_correos(correos)
+        messages.success(request, f"Se enviarán {len(correos)} códigos QR a los operadores asignados hoy.")
+    else:
+        messages.info(request, "No hay operadores con asignaciones activas hoy para enviar códigos QR.")
+    if sin_qr:
+        messages.warning(request, f"{sin_qr} vehículos todavía no tienen código QR y no se enviaron.")
+    return redirect('asignaciones')
+
+
+# Vista para ver todos los detalles de un operador
+@login_required
+@user_passes_test(is_administracion)
+def detalles_operador(request, cedula):
+    try:
+        operador = Operador.objects.get(cedula=cedula)
+        
+        data = {
+            'cedula': operador.cedula,
+            'nombre': operador.nombre,
+            'apellido': operador.apellido,
+            'telefono': str(operador.telefono),
+            'correo': operador.correo or 'No especificado',
+            'direccion': operador.direccion or 'No especificada',
+            'independiente_texto': 'Sí' if operador.independiente else 'No',
+            'foto_operador': operador.foto_tarjeta,
+        }
+        return JsonResponse(data)
+
+    except Operador.DoesNotExist:
+        return JsonResponse({'error': 'Operador no encontrado'}, status=404)
@@ -0,0 +1,54 @@
+from django.contrib import messages
+from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth.forms import AuthenticationForm
+from django.http import HttpResponse
+from django.shortcuts import redirect, render
+from ..roles import ADMINISTRACION, GERENTE, NOMINA, is_administracion, is_gerente, is_nomina
+
+
+# Vista para redirigir a la página de inicio según el grupo del usuario
+def inicio_redirect(request):
+    if request.user.is_authenticated:
+        if ADMINISTRACION in request.roles:
+            return redirect('inicio_administracion')
+        elif GERENTE in request.roles:
+            return redirect('inicio_gerente')
+        elif NOMINA in request.roles:
+            return redirect('inicio_nomina')
+        else:
+            return HttpResponse("No tienes permisos para acceder a esta sección. Por favor, contacta al administrador.", status=403)
+    else:
+        return redirect('login')
+
+
+# Vista para el inicio de sesión
+def login_view(request):
+    if request.method == 'POST':
+        form = AuthenticationForm(data=request.POST)
+        if form.is_valid():
+            email = form.cleaned_data.get('username')
+            password = form.cleaned_data.get('password')
+            user = authenticate(request, username=email, password=password)
+            if user is not None:
+                login(request, user)
+                if is_administracion(user):
+                    return redirect('inicio_administracion')
+                elif is_gerente(user):
+                    return redirect('inicio_gerente')
+                elif is_nomina(user):
+                    return redirect('inicio_nomina')
+                else:
+                    return redirect('inicio_redirect')
+            else:
+                messages.error(request, "Correo o contraseña incorrectos.")
+        else:
+            messages.error(request, "Correo o contraseña incorrectos.")
+    else:
+        form = AuthenticationForm()
+    return render(request, 'login.html', {'form': form})
+
+
+# Vista para el cierre de sesión
+def logout_view(request):
+    logout(request)
+    return redirect('login')
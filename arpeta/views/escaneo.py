@@ -0,0 +1,75 @@
+import json
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.http import JsonResponse
+from django.views.decorators.http import require_POST
+from ..escaneo import MAX_ESCANEOS_LOTE, ErrorEscaneo, aregistrar_escaneo, registrar_escaneo, registrar_escaneos_lote
+from ..roles import ais_administracion, is_administracion
+
+
+# Vista para registrar una vuelta
+@login_required
+@user_passes_test(is_administracion)
+def registrar_vuelta(request):
+    if request.method == "POST":
+        try:
+            data = json.loads(request.body)
+            placa_escaneada_encriptada = data.get("placa")
+            if not placa_escaneada_encriptada:
+                return JsonResponse({"error": "No se proporcionó la placa desde el QR."}, status=400)
+            resultado = registrar_escaneo(placa_escaneada_encriptada)
+            return JsonResponse({"message": "Vuelta registrada con éxito.", **resultado}, status=200)
+        except ErrorEscaneo as e:
+            return JsonResponse({"error": e.mensaje}, status=e.status)
+        except json.JSONDecodeError:
+            return JsonResponse({"error": "Solicitud JSON mal formada."}, status=400)
+        except Exception as e:
+            return JsonResponse({"error": "Ocurrió un error inesperado en el servidor al registrar la vuelta."}, status=500)
+    return JsonResponse({"error": "Método no permitido."}, status=405)
+
+
+# Vista asíncrona para registrar una vuelta (para servidores ASGI como uvicorn). Responde igual que registrar_vuelta.
+# Solo usa user_passes_test con la verificación asíncrona: un usuario anónimo no tiene roles, así que también se
+# redirige al inicio de sesión, y se evita el salto a un hilo que haría login_required.
+@user_passes_test(ais_administracion)
+async def registrar_vuelta_async(request):
+    if request.method == "POST":
+        try:
+            data = json.loads(request.body)
+            placa_escaneada_encriptada = data.get("placa")
+            if not placa_escaneada_encriptada:
+                return JsonResponse({"error": "No se proporcionó la placa desde el QR."}, status=400)
+            resultado = await aregistrar_escaneo(placa_escaneada_encriptada)
+            return JsonResponse({"message": "Vuelta registrada con éxito.", **resultado}, status=200)
+        except ErrorEscaneo as e:
+            return JsonResponse({"error": e.mensaje}, status=e.status)
+        except json.JSONDecodeError:
+            return JsonResponse({"error": "Solicitud JSON mal formada."}, status=400)
+        except Exception:
+            return JsonResponse({"error": "Ocurrió un error inesperado en el servidor al registrar la vuelta."}, status=500)
+    return JsonResponse({"error": "Método no permitido."}, status=405)
+
+
+# Vista para registrar un lote de vueltas escaneadas sin conexión (arreglo JSON o NDJSON)
+@login_required
+@user_passes_test(is_administracion)
+@require_POST
+def registrar_vueltas_lote(request):
+    try:
+        if request.content_type == 'application/x-ndjson':
+            registros = [json.loads(linea) for linea in request.body.splitlines() if linea.strip()]
+        else:
+            registros = json.loads(request.body)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return JsonResponse({"error": "Solicitud JSON mal formada."}, status=400)
+    if not isinstance(registros, list):
+        return JsonResponse({"error": "Se esperaba una lista de escaneos."}, status=400)
+    if len(registros) > MAX_ESCANEOS_LOTE:
+        return JsonResponse({"error": f"El lote no puede tener más de {MAX_ESCANEOS_LOTE} escaneos."}, status=413)
+    try:
+        resultados = registrar_escaneos_lote(registros)
+    except Exception:
+        return JsonResponse({"error": "Ocurrió un error inesperado en el servidor al registrar las vueltas."}, status=500)
+    return JsonResponse({
+        "registradas": sum(1 for resultado in resultados if resultado["status"] == 200),
+        "resultados": resultados,
+    })
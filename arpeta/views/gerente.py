@@ -0,0 +1,285 @@
+import json
+from datetime import datetime
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.core.paginator import Paginator
+from django.db.models import Count, Sum
+from django.shortcuts import render
+from django.views import View
+from ..models import Operador, Asignacion
+from ..forms import FiltroBusquedaForm
+from ..busqueda import filtrar_asignaciones
+from ..roles import GERENTE, is_gerente
+from ..paginacion import tamano_pagina
+from ..indicadores import MESES_ASIGNACIONES, asignaciones_por_mes, obtener_indicadores
+from ..series import vueltas_por_dia, vueltas_por_franja, vueltas_por_mes
+from ..graficos import figura_estado_operadores, figura_tipo_operadores, figura_vehiculos_populares, renderizar_grafico
+from ..nomina import VUELTAS_MINIMAS_PAGO, calcular_pagos
+from ..trabajos import solicitar_pdf
+from .reportes import respuesta_trabajo_pdf
+
+
+# Vista para la página de inicio de gerente
+@user_passes_test(is_gerente)
+@login_required
+def inicio_gerente(request):
+    return render(request, 'gerente/inicio_gerente.html')
+
+# Vista para la página de pagos del gerente: asignaciones con su pago calculado en la base de datos,
+# ordenadas por monto o por fecha
+@user_passes_test(is_gerente)
+def pagos_gerente(request):
+    ordenes = {'monto': ('pago_divisas', 'id'), '-monto': ('-pago_divisas', '-id'), 'fecha': ('-fecha_asignacion', '-id')}
+    orden = request.GET.get('orden', 'fecha')
+    pagos = calcular_pagos(
+        Asignacion.objects.filter(total_vueltas__gte=VUELTAS_MINIMAS_PAGO)
+        .select_related('operador', 'vehiculo', 'vehiculo__modelo', 'vehiculo__modelo__marca', 'tipo_material')
+    ).order_by(*ordenes.get(orden, ordenes['fecha']))
+    pagina = Paginator(pagos, tamano_pagina(request)).get_page(request.GET.get('page'))
+    total_pagado = pagos.order_by().aggregate(total=Sum('pago_divisas'))['total'] or 0
+    return render(request, 'gerente/pagos_gerente.html', {
+        'pagos': pagina,
+        'orden': orden,
+        'total_pagado': total_pagado,
+    })
+
+# Vista para la página de reportes del gerente
+@login_required
+@user_passes_test(is_gerente)
+def reportes_gerente(request):
+    # Indicadores de operadores, vehículos y asignaciones (en caché, calculados con agregados condicionales)
+    indicadores = obtener_indicadores()
+
+    # Asignaciones recientes (últimas 5)
+    asignaciones_recientes = Asignacion.objects.select_related('operador', 'vehiculo', 'tipo_material')\
+                                               .order_by('-fecha_asignacion')[:5]
+
+    # Gráfico de actividad por hora (últimos 30 días)
+    horas = range(6, 21, 2)  # De 6am a 8pm cada 2 horas
+    horas_labels = [f"{h}:00-{h+2}:00" for h in horas[:-1]]
+    actividad_horaria = vueltas_por_franja([(h, h + 2) for h in horas[:-1]])
+
+    context = {
+        **indicadores,
+        'total_material': round(indicadores['total_material'], 2),
+        'asignaciones_recientes': asignaciones_recientes,
+        
+        # Gráficos
+        'horas_labels': json.dumps(horas_labels),
+        'actividad_horaria': json.dumps(actividad_horaria),
+        
+        # Fecha de generación
+        'fecha_generacion': datetime.now().strftime("%d/%m/%Y %H:%M")
+    }
+
+    if 'pdf' in request.GET:
+        return generar_pdf_reporte(request, context)
+    
+    return render(request, 'gerente/reportes_gerente.html', context)
+
+def generar_pdf_reporte(request, context):
+    trabajo_id = solicitar_pdf(
+        'gerente/gerente_reporte_pdf.html', context, 'reportes_gerente.pdf', GERENTE, volatiles=('fecha_generacion',)
+    )
+    return respuesta_trabajo_pdf(request, trabajo_id)
+
+
+@user_passes_test(is_gerente)
+def base_gerente(request):
+    return render(request, 'gerente/base_gerente.html')
+
+@user_passes_test(is_gerente)
+def lista_asignaciones (request):
+    return render(request, 'gerente/lista_asignaciones.html')
+
+
+#------------------------------------------------------Operadores Gerente-----------------------------------------------------------------
+
+class OperadoresGerenteView(View):
+    template_name = 'gerente/operadores_gerente.html'
+
+    def get(self, request):
+        # Obtenemos todos los operadores para la tabla (sin orden por fecha)
+        operadores = Operador.objects.all()
+
+        # Estadísticas básicas
+        indicadores = obtener_indicadores()
+        total_operadores = indicadores['total_operadores']
+        operadores_activos = indicadores['operadores_activos']
+        operadores_inactivos = indicadores['operadores_inactivos']
+
+        # Operadores con asignaciones activas
+        asignaciones_activas = Asignacion.objects.filter(estado=True).select_related('operador', 'vehiculo')
+
+        # Gráfico de Estado de operadores
+        grafico_estado = renderizar_grafico(
+            'estado_operadores', {'activos': operadores_activos, 'inactivos': operadores_inactivos}, figura_estado_operadores
+        )
+
+        # Gráfico de Tipo de operadores
+        operadores_independientes = indicadores['operadores_independientes']
+        operadores_no_independientes = indicadores['operadores_no_independientes']
+        grafico_tipo = renderizar_grafico(
+            'tipo_operadores',
+            {'independientes': operadores_independientes, 'no_independientes': operadores_no_independientes},
+            figura_tipo_operadores,
+        )
+
+        # Gráfico de Vehículos más asignados (si hay)
+        vehiculos_populares = Asignacion.objects.values(
+            'vehiculo__placa', 'vehiculo__modelo__marca__nombre', 'vehiculo__modelo__nombre'
+        ).annotate(
+            total_asignaciones=Count('id')
+        ).order_by('-total_asignaciones')[:5]
+
+        grafico_vehiculos = None
+        if vehiculos_populares:
+            datos_vehiculos = [
+                [f"{v['vehiculo__placa']} ({v['vehiculo__modelo__marca__nombre']} {v['vehiculo__modelo__nombre']})", v['total_asignaciones']]
+                for v in vehiculos_populares
+            ]
+            grafico_vehiculos = renderizar_grafico('vehiculos_populares', datos_vehiculos, figura_vehiculos_populares)
+
+        context = {
+            'operadores': operadores,
+            'total_operadores': total_operadores,
+            'operadores_activos': operadores_activos,
+            'operadores_inactivos': operadores_inactivos,
+            'operadores_independientes': operadores_independientes,
+            'operadores_no_independientes': operadores_no_independientes,
+            'asignaciones_activas': asignaciones_activas,
+            'grafico_estado': grafico_estado,
+            'grafico_tipo': grafico_tipo,
+            'grafico_vehiculos': grafico_vehiculos,
+        }
+
+        if 'pdf' in request.GET:
+            return self.generate_pdf(context)
+
+        return render(request, self.template_name, context)
+
+    def generate_pdf(self, context):
+        trabajo_id = solicitar_pdf('gerente/operadores_gerente_pdf.html', context, 'reporte_operadores.pdf', GERENTE)
+        return respuesta_trabajo_pdf(self.request, trabajo_id)
+    
+    
+#----------------------------------------------------Vehiculos Gerente-------------------------------------------------------------    
+
+class VehiculosGerenteView(View):
+    template_name = 'gerente/vehiculos_gerente.html'
+    paginate_by = 10
+
+    def get(self, request):
+        # Filtros y búsqueda
+        search_query = request.GET.get('search', '')
+        estado_filter = request.GET.get('estado', None)
+
+        # Datos básicos
+        indicadores = obtener_indicadores()
+        total_vehiculos = indicadores['total_vehiculos']
+        vehiculos_activos = indicadores['vehiculos_activos']
+        vehiculos_mantenimiento = indicadores['vehiculos_mantenimiento']
+
+        # Asignaciones activas
+        asignaciones_qs = Asignacion.objects.filter(estado=True)\
+            .select_related('vehiculo', 'vehiculo__modelo', 'vehiculo__modelo__marca', 'operador')\
+            .order_by('-ultima_vuelta_registrada_en')
+
+        filtros = FiltroBusquedaForm({'q': search_query, 'estado': estado_filter or ''}).filtros()
+        asignaciones_qs = filtrar_asignaciones(asignaciones_qs, filtros)
+
+        # Paginación
+        paginator = Paginator(asignaciones_qs, self.paginate_by)
+        page_number = request.GET.get('page')
+        page_obj = paginator.get_page(page_number)
+
+        # Datos reales para gráficos (implementa estos métodos según tus modelos)
+        dias_semana, vueltas_diarias = self.get_vueltas_ultima_semana()
+        meses_anio, vueltas_mensuales = self.get_vueltas_ultimo_anio()
+        horas_dia, vueltas_horarias = self.get_vueltas_por_hora()
+
+        context = {
+            # Totales
+            'total_vehiculos': total_vehiculos,
+            'vehiculos_activos': vehiculos_activos,
+            'vehiculos_mantenimiento': vehiculos_mantenimiento,
+            'porcentaje_disponibilidad': indicadores['porcentaje_disponibilidad'],
+            'tiempo_promedio_mantenimiento': 3,
+            
+            # Asignaciones
+            'asignaciones_activas': page_obj,
+            'total_asignaciones_activas': paginator.count,
+            
+            # ... otros datos ...
+            'dias_semana': dias_semana,  # Sin json.dumps
+            'vueltas_diarias': vueltas_diarias,
+            'meses_anio': meses_anio,
+            'vueltas_mensuales': vueltas_mensuales,
+            'horas_dia': horas_dia,
+            'vueltas_horarias': vueltas_horarias,
+       
+                    
+            # Filtros
+            'search_query': search_query,
+            'estado_filter': estado_filter,
+        }
+        
+        return render(request, "gerente/vehiculos_gerente.html", context)
+
+    def get_vueltas_ultima_semana(self):
+        """Obtiene vueltas de los últimos 7 días a partir del resumen diario"""
+        serie = vueltas_por_dia(7)
+        dias = [fecha.strftime('%a') for fecha, _ in serie]  # Nombre corto del día (Lun, Mar, etc.)
+        vueltas = [total for _, total in serie]
+        return dias, vueltas
+
+    def get_vueltas_ultimo_anio(self):
+        meses = ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 
+                'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic']
+        vueltas = vueltas_por_mes()
+        return meses, vueltas
+
+    def get_vueltas_por_hora(self):
+        """Obtiene vueltas por franja horaria de los últimos 30 días a partir del resumen por hora"""
+        horas = ['6-8', '8-10', '10-12', '12-14', '14-16', '16-18', '18-20']
+        vueltas = vueltas_por_franja([(6,8), (8,10), (10,12), (12,14), (14,16), (16,18), (18,20)])
+        return horas, vueltas
+        
+ #--------------------------------------------------------Asignaciones Gerente------------------------------------------------------       
+  
+
+# Cantidad máxima de meses que se puede pedir en el gráfico de asignaciones por mes
+MESES_ASIGNACIONES_MAXIMO = 120
+
+def dashboard_asignaciones(request):
+    indicadores = obtener_indicadores()
+
+    # Datos para gráfico de Material por Tipo
+    tipos_material_labels = [nombre for nombre, _ in indicadores['material_por_tipo']]
+    tipos_material_data = [material for _, material in indicadores['material_por_tipo']]
+
+    # Datos para gráfico de Asignaciones por Mes (últimos meses, se puede cambiar con ?meses=)
+    try:
+        meses = min(max(int(request.GET.get('meses', MESES_ASIGNACIONES)), 1), MESES_ASIGNACIONES_MAXIMO)
+    except (TypeError, ValueError):
+        meses = MESES_ASIGNACIONES
+    serie_meses = asignaciones_por_mes(meses)
+    meses_labels = [mes.strftime('%b %Y') for mes, _ in serie_meses]
+    meses_data = [total for _, total in serie_meses]
+
+    # Asignaciones recientes
+    asignaciones_recientes = Asignacion.objects.select_related('operador', 'vehiculo', 'tipo_material')\
+                                               .order_by('-fecha_asignacion')[:10]
+
+    context = {
+        'total_asignaciones': indicadores['total_asignaciones'],
+        'asignaciones_activas': indicadores['asignaciones_activas'],
+        'asignaciones_inactivas': indicadores['asignaciones_inactivas'],
+        'total_material': indicadores['total_material'],
+        'tipos_material_labels': tipos_material_labels,
+        'tipos_material_data': tipos_material_data,
+        'meses_labels': meses_labels,
+        'meses_data': meses_data,
+        'asignaciones_recientes': asignaciones_recientes,
+    }
+
+    return render(request, 'gerente/asignaciones_gerente.html', context)
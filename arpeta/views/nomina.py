@@ -0,0 +1,170 @@
+from datetime import datetime
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.http import StreamingHttpResponse
+from django.shortcuts import redirect, render
+from ..models import Asignacion
+from ..forms import RecibosLoteForm
+from ..roles import NOMINA, is_nomina
+from ..nomina import (
+    MAX_RECIBOS_PDF_UNIDO, VUELTAS_MINIMAS_PAGO, asignaciones_pagables, calcular_pagos, contexto_recibo,
+    contextos_recibos, pdf_unido, recibos_en_pdf
+)
+from ..flujos import zip_en_flujo
+from ..trabajos import solicitar_pdf
+from .reportes import respuesta_trabajo_pdf
+
+
+@user_passes_test(is_nomina)
+def base_nomina (request):
+    return render(request, 'nomina/base_nomina')
+
+@user_passes_test(is_nomina)
+def pagos_nomina (request):
+    return render(request, 'nomina/pagos_nomina')
+
+@user_passes_test(is_nomina)
+def inicio_nomina (request):
+    return render(request, 'nomina/inicio_nomina.html')
+
+#----------------------------------------------------------Calcular Pago-----------------------------------------------------------
+
+def calcular_pago(request):
+    asignaciones_activas = Asignacion.objects.filter(estado=True).select_related('operador', 'vehiculo')
+    
+    if request.method == 'POST':
+        try:
+            asignacion_id = request.POST.get('asignacion')
+            tipo_pago = request.POST.get('tipo_pago')
+            confirmar = request.POST.get('confirmar', False)
+            
+            if not asignacion_id or not tipo_pago:
+                messages.error(request, "Debe completar todos los campos del formulario")
+                return redirect('calcular_pago')
+                
+            if not confirmar:
+                messages.error(request, "Debe confirmar que los datos son correctos")
+                return redirect('calcular_pago')
+            
+            asignacion = calcular_pagos(
+                Asignacion.objects.select_related('operador', 'vehiculo', 'tipo_material')
+            ).get(pk=asignacion_id, estado=True)
+            
+            if asignacion.total_vueltas < VUELTAS_MINIMAS_PAGO:
+                messages.error(request, f"El operador no ha completado las {VUELTAS_MINIMAS_PAGO} vueltas mínimas. Vueltas actuales: {asignacion.total_vueltas}")
+                return redirect('calcular_pago')
+            
+            context = contexto_recibo(asignacion, tipo_pago, datetime.now().strftime("%d/%m/%Y %H:%M:%S"))
+            
+            if 'generar_pdf' in request.POST:
+                return generar_recibo_pdf(request, context)
+            
+            return render(request, 'nomina/resultado_pago.html', context)
+            
+        except Asignacion.DoesNotExist:
+            messages.error(request, "La asignación seleccionada no es válida")
+            return redirect('calcular_pago')
+        except Exception as e:
+            messages.error(request, f"Ocurrió un error: {str(e)}")
+            return redirect('calcular_pago')
+    
+    return render(request, 'nomina/calcular_pago.html', {
+        'asignaciones': asignaciones_activas,
+        'max_recibos_pdf': MAX_RECIBOS_PDF_UNIDO,
+    })
+    
+    #------------------------------------------------Generar Recibo--------------------------------------------------------------------
+
+def generar_recibo_pdf(request, context=None, asignacion_id=None):
+    if context is None:
+        try:
+            asignacion = Asignacion.objects.select_related('operador', 'vehiculo', 'tipo_material').get(id=asignacion_id)
+            context = contexto_recibo(
+                asignacion, request.GET.get('tipo_pago', 'arena'), datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+            )
+        except Asignacion.DoesNotExist:
+            messages.error(request, "La asignación no existe")
+            return redirect('calcular_pago')
+    
+    trabajo_id = solicitar_pdf(
+        'nomina/recibo_pago.html', context,
+        f'recibo_pago_{context["asignacion"].operador.cedula}_{datetime.now().strftime("%Y%m%d")}.pdf',
+        NOMINA, volatiles=('fecha',),
+    )
+    return respuesta_trabajo_pdf(request, trabajo_id)
+
+# Vista para generar de una vez los recibos de todas las asignaciones pagables en un rango de fechas
+@login_required
+@user_passes_test(is_nomina)
+def recibos_lote(request):
+    formulario = RecibosLoteForm(request.GET)
+    if not formulario.is_valid():
+        for errores in formulario.errors.values():
+            messages.error(request, errores[0])
+        return redirect('calcular_pago')
+    datos = formulario.cleaned_data
+    asignaciones = asignaciones_pagables(datos['desde'], datos['hasta'])
+    if not asignaciones.exists():
+        messages.error(request, "No hay asignaciones activas con las vueltas mínimas en el rango de fechas seleccionado.")
+        return redirect('calcular_pago')
+    if datos['formato'] == 'pdf' and asignaciones.count() > MAX_RECIBOS_PDF_UNIDO:
+        messages.error(request, f"Un solo PDF admite hasta {MAX_RECIBOS_PDF_UNIDO} recibos. "
+                                "Para rangos con más asignaciones descargue el ZIP.")
+        return redirect('calcular_pago')
+
+    fecha = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+    recibos = recibos_en_pdf(contextos_recibos(asignaciones, datos['tipo_pago'], fecha))
+    nombre = f"recibos_pago_{datos['desde']:%Y%m%d}_{datos['hasta']:%Y%m%d}"
+    if datos['formato'] == 'pdf':
+        respuesta = StreamingHttpResponse(pdf_unido(recibos), content_type='application/pdf')
+        respuesta['Content-Disposition'] = f'attachment; filename="{nombre}.pdf"'
+    else:
+        respuesta = StreamingHttpResponse(zip_en_flujo(recibos), content_type='application/zip')
+        respuesta['Content-Disposition'] = f'attachment; filename="{nombre}.zip"'
+    return respuesta
+
+#------------------------------------------------------------Resumen del pago-------------------------------------------------------------
+
+
+def PagoOperadorForm(request):
+    error_messages = []
+    asignacion = None
+    tipo_pago = None
+    confirmado = False
+
+    if request.method == 'POST':
+        # Obtener datos del POST
+        asignacion_id = request.POST.get('asignacion')
+        tipo_pago = request.POST.get('tipo_pago')
+        confirmar = request.POST.get('confirmar') == 'on'  # Los checkboxes envían 'on' cuando están marcados
+
+        # Validación manual
+        if not asignacion_id:
+            error_messages.append('Debe seleccionar una asignación')
+        else:
+            try:
+                asignacion = Asignacion.objects.get(id=asignacion_id, estado=True)
+            except Asignacion.DoesNotExist:
+                error_messages.append('Asignación no válida o no disponible')
+
+        if not tipo_pago or tipo_pago not in ['arena', 'divisas']:
+            error_messages.append('Debe seleccionar un tipo de pago válido')
+
+        if not confirmar:
+            error_messages.append('Debe confirmar el pago')
+
+        # Si no hay errores, procesar el pago
+       # Redirigir a una página de éxito
+
+    # Si es GET o hay errores, mostrar el formulario
+    asignaciones_disponibles = Asignacion.objects.filter(estado=True)
+    context = {
+        'asignaciones': asignaciones_disponibles,
+        'error_messages': error_messages,
+        'valores_previos': {
+            'asignacion_id': asignacion.id if asignacion else '',
+            'tipo_pago': tipo_pago,
+            'confirmar': confirmado
+        }
+    }
+    return render(request, 'nomina/resultado_pago.html', context)
@@ -0,0 +1,53 @@
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse
+from django.shortcuts import redirect, render
+from django.urls import reverse
+from ..roles import obtener_roles
+from ..descargas import metadatos_descarga, respuesta_descarga
+from ..trabajos import (
+    DURACION_NAVEGADOR_REPORTES, PENDIENTE, TERMINADO, estado_trabajo, ruta_reporte, trabajo_id_valido
+)
+
+
+# Función que responde a la solicitud de un PDF: si ya está generado redirige a la descarga; si no, devuelve
+# el estado del trabajo (JSON para clientes que lo piden) o la página que espera a que termine
+def respuesta_trabajo_pdf(request, trabajo_id):
+    estado = estado_trabajo(trabajo_id, obtener_roles(request.user))
+    if estado and estado['estado'] == TERMINADO:
+        return redirect('descargar_reporte', trabajo_id=trabajo_id)
+    if 'application/json' in request.headers.get('Accept', ''):
+        return JsonResponse({
+            'id': trabajo_id,
+            'estado': estado['estado'] if estado else PENDIENTE,
+            'url_estado': reverse('estado_reporte', args=[trabajo_id]),
+        }, status=202)
+    return render(request, 'reportes/esperando_pdf.html', {'trabajo_id': trabajo_id})
+
+
+# Vista para consultar el estado de un trabajo de PDF (solo para el rol que lo pidió)
+@login_required
+def estado_reporte(request, trabajo_id):
+    estado = estado_trabajo(trabajo_id, obtener_roles(request.user)) if trabajo_id_valido(trabajo_id) else None
+    if estado is None:
+        return JsonResponse({'error': 'Trabajo no encontrado'}, status=404)
+    datos = {'id': trabajo_id, 'estado': estado['estado']}
+    if estado['estado'] == TERMINADO:
+        datos['url_descarga'] = reverse('descargar_reporte', args=[trabajo_id])
+    return JsonResponse(datos)
+
+
+# Vista para descargar el PDF generado por un trabajo (solo para el rol que lo pidió)
+@login_required
+def descargar_reporte(request, trabajo_id):
+    estado = estado_trabajo(trabajo_id, obtener_roles(request.user)) if trabajo_id_valido(trabajo_id) else None
+    if estado is None or estado['estado'] != TERMINADO:
+        raise Http404("El reporte no existe o todavía no está listo.")
+    # El id ya es el hash del reporte, así que sirve de ETag sin leer el PDF
+    datos = metadatos_descarga(
+        f"reporte:{trabajo_id}", lambda: ruta_reporte(trabajo_id, estado['rol']), etag=trabajo_id
+    )
+    if datos is None:
+        raise Http404("El reporte no existe o todavía no está listo.")
+    return respuesta_descarga(
+        request, datos, filename=estado['nombre'], content_type='application/pdf', max_age=DURACION_NAVEGADOR_REPORTES,
+    )
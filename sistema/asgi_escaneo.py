@@ -0,0 +1,14 @@
+"""
+ASGI config for the scan service.
+
+It exposes the ASGI callable as a module-level variable named ``application``
+and only serves the lap registration endpoints (see sistema/settings_escaneo.py).
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sistema.settings_escaneo')
+
+application = get_asgi_application()
@@ -30,6 +30,10 @@ SECRET_KEY = 'django-insecure-)wgph*m*(kdpp+s$zz(bd4hy2g-1)xkrtiks-o4_o!)&*3#+2@
 # Clave para encriptación Fernet (para códigos QR).
 FERNET_KEY = b'0k8nLk92yO-zLogb8MWaqyj2ihyl_m-dHYtlzgc7euU='
 
+# Guarda en caché el descifrado de los QR y la asignación activa de cada vehículo
+# para que el registro de vueltas no consulte la base de datos en cada escaneo.
+CACHE_ESCANEO = True
+
 # Modo de depuración (DEBUG). ¡Debe ser False en producción!
 DEBUG = True
 
@@ -65,6 +69,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'arpeta.roles.RolesMiddleware',  # Expone los roles del usuario como request.roles.
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -112,6 +117,20 @@ DATABASES = {
 }
 
 
+# --- Caché ---
+# --------------------------------------------------------------------------
+
+# Caché compartida por todos los procesos de la aplicación completa y del servicio de escaneo (Redis). Los QR
+# descifrados, las asignaciones activas, los roles y los estados de los trabajos se invalidan desde cualquier
+# proceso, así que no puede ser la caché en memoria local de Django (LocMem).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://127.0.0.1:6379/1',
+    }
+}
+
+
 # --- Validación de Contraseñas ---
 # --------------------------------------------------------------------------
 
@@ -147,6 +166,31 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static'), # Asegúrate de que esta línea exista si pusiste Font Awesome aquí
 ]
 
+# Buscadores de archivos estáticos. PlotlyFinder publica solo plotly.js de la misma versión que el paquete
+# de Python, como 'plotly/plotly.min.js'.
+STATICFILES_FINDERS = [
+    'django.contrib.staticfiles.finders.FileSystemFinder',
+    'django.contrib.staticfiles.finders.AppDirectoriesFinder',
+    'arpeta.finders.PlotlyFinder',
+]
+
+# Cantidad de filas por página en los listados de administración (se puede cambiar con ?por_pagina=).
+TAMANO_PAGINA = 25
+
+# Meses que muestra por defecto el gráfico de asignaciones por mes del gerente (se puede cambiar con ?meses=).
+MESES_ASIGNACIONES = 24
+
+# Backend de los trabajos en segundo plano (generación de PDF) y cantidad de hilos del pool.
+# 'arpeta.trabajos.BackendInmediato' ejecuta los trabajos dentro de la petición (útil en pruebas).
+TRABAJOS_BACKEND = 'arpeta.trabajos.BackendHilos'
+TRABAJOS_HILOS = 2
+
+# Envío de las descargas protegidas (códigos QR y reportes PDF). Con None las envía Django; con 'x-accel-redirect'
+# (nginx) o 'x-sendfile' (Apache/lighttpd) Django solo revisa permisos y cabeceras de caché y el servidor web envía
+# el archivo. Para nginx, DESCARGAS_URL_INTERNA es la location `internal` con alias a MEDIA_ROOT.
+DESCARGAS_ENVIO = None
+DESCARGAS_URL_INTERNA = '/protegido/'
+
 # Tipo de campo para claves primarias automáticas (BigAutoField para mayor rango).
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -0,0 +1,39 @@
+"""
+Configuración del servicio de escaneo.
+
+Sirve solo el registro de vueltas con el QR (sistema/urls_escaneo.py), con las aplicaciones y el middleware
+mínimos, para correr como un servicio aparte junto a la aplicación completa. Usa la misma base de datos, la
+misma caché compartida (CACHES en sistema/settings.py, Redis) y las mismas sesiones, así que un usuario que inició
+sesión en la aplicación completa puede registrar vueltas aquí y los cambios de asignaciones hechos allá invalidan
+la caché de escaneo de este servicio.
+
+Se ejecuta con `DJANGO_SETTINGS_MODULE=sistema.settings_escaneo` (por ejemplo con sistema/asgi_escaneo.py).
+"""
+
+from .settings import *  # noqa: F401,F403
+
+
+# --- Aplicaciones y Middleware ---
+# --------------------------------------------------------------------------
+
+# Solo las aplicaciones que usan los modelos y la autenticación (sin admin, mensajes ni archivos estáticos).
+INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'arpeta',
+]
+
+# Sesión, protección CSRF y usuario autenticado: lo que necesita registrar_vuelta.
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+]
+
+# Archivo de URLs con solo el registro de vueltas.
+ROOT_URLCONF = 'sistema.urls_escaneo'
+
+# Aplicación ASGI del servicio de escaneo.
+ASGI_APPLICATION = 'sistema.asgi_escaneo.application'
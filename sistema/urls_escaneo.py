@@ -0,0 +1,16 @@
+"""
+URLs del servicio de escaneo (sistema/settings_escaneo.py).
+
+Solo monta el registro de vueltas, en las mismas rutas que la aplicación completa, para que el proxy pueda enviar
+esas rutas a este servicio sin cambiar el lector de QR. El registro de una vuelta usa la vista asíncrona, porque
+este servicio se ejecuta con ASGI (sistema/asgi_escaneo.py).
+"""
+
+from django.urls import path
+from arpeta.views import escaneo
+
+urlpatterns = [
+    path("administracion/registrar_vuelta/", escaneo.registrar_vuelta_async, name="registrar_vuelta"),
+    path("administracion/registrar_vuelta_async/", escaneo.registrar_vuelta_async, name="registrar_vuelta_async"),
+    path("administracion/registrar_vueltas_lote/", escaneo.registrar_vueltas_lote, name="registrar_vueltas_lote"),
+]